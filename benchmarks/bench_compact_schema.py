@@ -0,0 +1,116 @@
+"""
+Benchmark: on-disk size and lookup speed of the legacy text schema against the compact schema, for the same URLs.
+The legacy database is built with the old layout, then converted with the migration tool; both files are
+vacuumed before they are measured. Lookups run with a 2 MiB page cache, as a large crawl's database no longer fits
+in its cache.
+
+    PYTHONPATH=src python benchmarks/bench_compact_schema.py
+"""
+import random
+import shutil
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+
+from webcrawler_arnoldkyeza.core.datastore import schema_migration
+from webcrawler_arnoldkyeza.core.datastore.database_manager import DatabaseManager
+from webcrawler_arnoldkyeza.core.utils import calculate_digest
+
+URLS = 1_000_000
+HOSTS = 2_000
+LOOKUPS = 20_000
+CACHE_KIB = 2 * 1024
+
+LEGACY_SCHEMA = """
+    CREATE TABLE urls
+    (
+        url_id           INTEGER PRIMARY KEY AUTOINCREMENT,
+        url              TEXT    NOT NULL,
+        normalized_url   TEXT    NOT NULL UNIQUE,
+        priority         INTEGER NOT NULL,
+        update_frequency INTEGER NOT NULL,
+        last_crawled_at  TEXT    NULL,
+        status           TEXT    NOT NULL DEFAULT 'pending',
+        parent_url_id    INTEGER NULL,
+        error_message    TEXT    NULL,
+        depth            INTEGER NOT NULL DEFAULT 0,
+        created_at       TEXT    NOT NULL DEFAULT (DATETIME('now')),
+        etag             TEXT    NULL,
+        last_modified    TEXT    NULL,
+        attempts         INTEGER NOT NULL DEFAULT 0,
+        lastmod          TEXT    NULL,
+        sitemap_priority REAL    NULL
+    );
+    CREATE INDEX idx_urls_url_id ON urls (url_id);
+    CREATE INDEX idx_urls_normalized_url ON urls (normalized_url);
+    CREATE INDEX idx_urls_parent_url_id ON urls (parent_url_id);
+"""
+
+
+def url(i: int) -> str:
+    return f"https://www.site{i % HOSTS}.example.com/section{i % 37}/2024/05/an-article-title-{i}?page={i % 5}"
+
+
+def build_legacy(path: Path) -> None:
+    conn = sqlite3.connect(path)
+    conn.executescript(LEGACY_SCHEMA)
+    conn.executemany(
+        "INSERT INTO urls (url, normalized_url, priority, update_frequency, last_crawled_at, status, parent_url_id, "
+        "depth) VALUES (?, ?, 1, 1, ?, ?, ?, 1)",
+        ((url(i), url(i), "2025-01-01T12:00:00.123456" if i % 10 else None, "completed" if i % 10 else "pending",
+          i // 50 + 1) for i in range(URLS)),
+    )
+    conn.commit()
+    conn.execute("VACUUM")
+    conn.close()
+
+
+def lookups(path: Path, query: str, keys: list) -> float:
+    conn = sqlite3.connect(path)
+    conn.execute(f"PRAGMA cache_size = -{CACHE_KIB}")
+    started_at = time.perf_counter()
+    for key in keys:
+        conn.execute(query, (key(),) if callable(key) else (key,)).fetchone()
+    elapsed = time.perf_counter() - started_at
+    conn.close()
+    return elapsed / len(keys) * 1e6
+
+
+def main() -> None:
+    rng = random.Random(0)
+    sample = [url(rng.randrange(URLS)) for _ in range(LOOKUPS)]
+
+    with tempfile.TemporaryDirectory() as directory:
+        legacy_path = Path(directory) / "legacy.sqlite"
+        compact_path = Path(directory) / "compact.sqlite"
+        build_legacy(legacy_path)
+        shutil.copy(legacy_path, compact_path)
+
+        started_at = time.perf_counter()
+        schema_migration.main([str(compact_path)])
+        print(f"conversion of {URLS} URLs: {time.perf_counter() - started_at:.1f} s")
+
+        for name, path in (("legacy", legacy_path), ("compact", compact_path)):
+            conn = sqlite3.connect(path)
+            sizes = dict(conn.execute("SELECT name, SUM(pgsize) FROM dbstat GROUP BY name").fetchall())
+            conn.close()
+            print(f"{name:<8} file: {path.stat().st_size / 2 ** 20:7.1f} MiB  "
+                  f"({path.stat().st_size / URLS:5.1f} bytes/URL, urls table {sizes['urls'] / 2 ** 20:.1f} MiB)")
+
+        legacy_us = lookups(legacy_path, "SELECT * FROM urls WHERE normalized_url = ?", sample)
+        compact_us = lookups(compact_path, "SELECT * FROM urls WHERE url_key = ?",
+                             [lambda key=key: calculate_digest(key) for key in sample])
+        print(f"row lookup by URL, {CACHE_KIB // 1024} MiB cache: legacy {legacy_us:.1f} µs  compact {compact_us:.1f} µs")
+
+        database = DatabaseManager(compact_path)
+        started_at = time.perf_counter()
+        for key in sample:
+            database.get_url(key)
+        print(f"DatabaseManager.get_url on the compact schema: "
+              f"{(time.perf_counter() - started_at) / LOOKUPS * 1e6:.1f} µs")
+        database.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""
+Microbenchmark: per-call cost of the `DatabaseManager` calls a worker makes for every page, on a table that already
+holds some URLs.
+
+    PYTHONPATH=src python benchmarks/bench_database.py
+"""
+import datetime
+import tempfile
+import time
+from pathlib import Path
+
+from webcrawler_arnoldkyeza.core.datastore.database_manager import DatabaseManager
+from webcrawler_arnoldkyeza.core.enums.url_status_type import UrlStatusType
+from webcrawler_arnoldkyeza.core.scheduler.models.url import Url
+
+ROWS = 20_000
+CALLS = 2_000
+
+
+def per_call(name: str, call, urls: list) -> None:
+    started_at = time.perf_counter()
+    for url in urls:
+        call(url)
+    print(f"{name:<22} {(time.perf_counter() - started_at) / len(urls) * 1e6:8.1f} µs/call")
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        database = DatabaseManager(Path(directory) / "crawler.sqlite")
+        urls = [f"https://example.com/articles/{i}" for i in range(ROWS)]
+        database.insert_urls([Url(url=url, normalized_url=url) for url in urls])
+        sample = urls[::ROWS // CALLS]
+        now = datetime.datetime.now()
+
+        per_call("get_url", database.get_url, sample)
+        per_call("url_exists", database.url_exists, sample)
+        per_call("update_url_status", lambda url: database.update_url_status(url, UrlStatusType.IN_PROGRESS), sample)
+        per_call("mark_url_as_crawled", lambda url: database.mark_url_as_crawled(url, now), sample)
+        per_call("insert_url", lambda url: database.insert_url(Url(url=f"{url}/new", normalized_url=f"{url}/new")),
+                 sample)
+        per_call("has_active_urls", lambda url: database.has_active_urls(), sample[:200])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Microbenchmark: per-URL cost of deduplicating a page's links on each dedup backend, as the seen set grows.
+
+The redis and sharded-redis backends run against fakeredis servers here, so their numbers include the emulation
+rather than network round-trips; against real servers a page costs one round-trip per server instead.
+
+    PYTHONPATH=src python benchmarks/bench_dedup_backends.py
+"""
+import time
+
+import fakeredis
+
+from webcrawler_arnoldkyeza.core.duplicate_eliminator.backends.memory_backend import MemoryDedupBackend
+from webcrawler_arnoldkyeza.core.duplicate_eliminator.backends.redis_backend import RedisDedupBackend
+from webcrawler_arnoldkyeza.core.duplicate_eliminator.backends.sharded_redis_backend import ShardedRedisDedupBackend
+from webcrawler_arnoldkyeza.core.duplicate_eliminator.duplicate_eliminator import DuplicateEliminator
+
+SEEN_SIZES = [0, 10_000, 100_000]
+PAGES = 20
+LINKS_PER_PAGE = 100
+
+
+def redis_node() -> RedisDedupBackend:
+    return RedisDedupBackend(client=fakeredis.FakeStrictRedis(server=fakeredis.FakeServer()))
+
+
+def backends() -> dict:
+    return {
+        "memory": MemoryDedupBackend(),
+        "fakeredis": redis_node(),
+        "sharded x3": ShardedRedisDedupBackend(nodes={f"node{i}": redis_node() for i in range(3)}),
+    }
+
+
+def main() -> None:
+    pages = [[f"https://example.com/pages/{page}/links/{link}" for link in range(LINKS_PER_PAGE)]
+             for page in range(PAGES)]
+
+    for seen in SEEN_SIZES:
+        results = []
+        for name, backend in backends().items():
+            duplicate_eliminator = DuplicateEliminator(backend=backend)
+            duplicate_eliminator.restore_seen_urls([[f"https://example.com/seen/{i}" for i in range(seen)]])
+
+            started_at = time.perf_counter()
+            for page in pages:
+                duplicate_eliminator.are_duplicate_urls(page)
+            elapsed = time.perf_counter() - started_at
+            results.append(f"{name}: {elapsed / (PAGES * LINKS_PER_PAGE) * 1e6:8.1f} µs/URL")
+        print(f"{seen:>7} seen  " + "  ".join(results))
+
+
+if __name__ == "__main__":
+    main()
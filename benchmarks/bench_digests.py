@@ -0,0 +1,47 @@
+"""
+Microbenchmark: dedup keys as 64-character hex SHA-256 checksums (before) against 16-byte BLAKE2b digests (after):
+hashing throughput and the memory of a Redis set holding them.
+
+The set's memory is that of a Python set of the encoded members, which is how fakeredis keeps them. Real Redis
+stores each member as a string of its own, so it saves the same 48 bytes per member.
+
+    PYTHONPATH=src python benchmarks/bench_digests.py
+"""
+import time
+import tracemalloc
+
+from webcrawler_arnoldkyeza.core.utils import calculate_digest, calculate_text_checksum
+
+URLS = 200_000
+PAGE = "Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 300
+
+
+def throughput(key, items: list) -> float:
+    started_at = time.perf_counter()
+    for item in items:
+        key(item)
+    return len(items) / (time.perf_counter() - started_at)
+
+
+def set_bytes_per_member(key, urls: list) -> float:
+    tracemalloc.start()
+    # redis-py sends str members UTF-8 encoded
+    members = {member.encode("utf-8") if isinstance(member, str) else member for member in map(key, urls)}
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size / len(members)
+
+
+def main() -> None:
+    urls = [f"https://example.com/articles/{i}/comments?page={i % 7}" for i in range(URLS)]
+    pages = [f"{PAGE}{i}" for i in range(2_000)]
+
+    for name, key in (("sha256 hex", calculate_text_checksum), ("blake2b-128", calculate_digest)):
+        url_rate = throughput(key, urls)
+        page_mb_s = throughput(key, pages) * len(PAGE) / 1e6
+        print(f"{name:<12} {len(key(urls[0])):3d} byte key  {url_rate / 1e6:5.2f} M URLs/s  {page_mb_s:7.1f} MB/s of "
+              f"page text  {set_bytes_per_member(key, urls):6.1f} bytes/member in Redis")
+
+
+if __name__ == "__main__":
+    main()
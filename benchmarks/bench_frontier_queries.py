@@ -0,0 +1,59 @@
+"""
+Benchmark: the frontier's database queries on a crawl where most URLs are already done, and the cost of
+bulk-inserting URLs with the indexes and status counters those queries rely on.
+
+    PYTHONPATH=src python benchmarks/bench_frontier_queries.py
+"""
+import datetime
+import tempfile
+import time
+from pathlib import Path
+
+from webcrawler_arnoldkyeza.core.datastore.database_manager import DatabaseManager
+from webcrawler_arnoldkyeza.core.enums.url_status_type import UrlStatusType
+from webcrawler_arnoldkyeza.core.scheduler.models.url import Url
+
+ROWS = 500_000
+ACTIVE_EVERY = 100  # one URL in a hundred is still pending
+CALLS = 200
+
+
+def per_call(name: str, call) -> None:
+    started_at = time.perf_counter()
+    for _ in range(CALLS):
+        call()
+    print(f"{name:<28} {(time.perf_counter() - started_at) / CALLS * 1e6:10.1f} µs/call")
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        database = DatabaseManager(Path(directory) / "crawler.sqlite")
+        started_at = time.perf_counter()
+        for first in range(0, ROWS, 50_000):
+            database.insert_urls([
+                Url(url=f"https://example.com/{i}", normalized_url=f"https://example.com/{i}",
+                    priority=i % 7, status=UrlStatusType.PENDING if i % ACTIVE_EVERY == 0 else UrlStatusType.COMPLETED,
+                    sitemap_priority=0.5 if i % ACTIVE_EVERY == 0 else None)
+                for i in range(first, first + 50_000)
+            ])
+        print(f"{'insert_urls':<28} {(time.perf_counter() - started_at) / ROWS * 1e6:10.1f} µs/URL")
+
+        end = database.get_max_url_id()
+        per_call("has_active_urls", database.has_active_urls)
+        per_call("get_pending_urls(100)", lambda: database.get_pending_urls(100))
+        per_call("get_pending_urls_between", lambda: database.get_pending_urls_between(end // 2, end, 100))
+        per_call("get_sitemap_urls", lambda: database.get_sitemap_urls(end // 2, 100))
+        per_call("reset_in_progress_urls", database.reset_in_progress_urls)
+
+        now = datetime.datetime.now()
+        started_at = time.perf_counter()
+        for i in range(0, ROWS, ACTIVE_EVERY):
+            database.claim_url(f"https://example.com/{i}")
+            database.commit_page(f"https://example.com/{i}", [], now)
+        pages = ROWS // ACTIVE_EVERY
+        print(f"{'claim_url + commit_page':<28} {(time.perf_counter() - started_at) / pages * 1e6:10.1f} µs/page")
+        database.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Benchmark: storing the links of crawled pages one `insert_url` call per link followed by `mark_url_as_crawled`,
+against a single `commit_page` transaction per page.
+
+    PYTHONPATH=src python benchmarks/bench_page_commit.py
+"""
+import datetime
+import tempfile
+import time
+from pathlib import Path
+
+from webcrawler_arnoldkyeza.core.datastore.database_manager import DatabaseManager
+from webcrawler_arnoldkyeza.core.scheduler.models.url import Url
+
+PAGES = 50
+LINKS_PER_PAGE = 200
+
+
+def pages(prefix: str) -> list:
+    return [
+        (f"https://example.com/{prefix}/{page}",
+         [Url(url=f"https://example.com/{prefix}/{page}/{link}",
+              normalized_url=f"https://example.com/{prefix}/{page}/{link}", depth=1)
+          for link in range(LINKS_PER_PAGE)])
+        for page in range(PAGES)
+    ]
+
+
+def per_link(database: DatabaseManager, crawled_pages: list) -> None:
+    now = datetime.datetime.now()
+    for parent, children in crawled_pages:
+        for child in children:
+            database.insert_url(child)
+        database.mark_url_as_crawled(parent, now)
+
+
+def per_page(database: DatabaseManager, crawled_pages: list) -> None:
+    now = datetime.datetime.now()
+    for parent, children in crawled_pages:
+        database.commit_page(parent, children, now)
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        database = DatabaseManager(Path(directory) / "crawler.sqlite")
+        for name, store in (("insert_url per link", per_link), ("commit_page per page", per_page)):
+            crawled_pages = pages(name.split()[0])
+            database.insert_urls([Url(url=parent, normalized_url=parent) for parent, _ in crawled_pages])
+
+            started_at = time.perf_counter()
+            store(database, crawled_pages)
+            elapsed = time.perf_counter() - started_at
+            print(f"{name:<21} {PAGES * LINKS_PER_PAGE / elapsed:10.0f} links/s  {elapsed / PAGES * 1e3:7.2f} ms/page")
+
+
+if __name__ == "__main__":
+    main()
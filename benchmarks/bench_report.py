@@ -0,0 +1,77 @@
+"""
+Benchmark: the crawl report built with one query per crawled page into a dict, as it used to be, against the
+single ordered join streamed into the printer's buffered writes. Reports time and peak Python memory.
+
+    PYTHONPATH=src python benchmarks/bench_report.py
+"""
+import os
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from webcrawler_arnoldkyeza.core.datastore.database_manager import DatabaseManager
+from webcrawler_arnoldkyeza.core.enums.url_status_type import UrlStatusType
+from webcrawler_arnoldkyeza.core.reporting.crawl_report_printer import CrawlReportPrinter
+from webcrawler_arnoldkyeza.core.scheduler.models.url import Url
+
+PAGE_COUNTS = [10_000, 50_000, 200_000]
+LINKS_PER_PAGE = 10
+
+
+def fill(database: DatabaseManager, pages: int) -> None:
+    database.insert_urls([Url(url=f"https://example.com/{page}", normalized_url=f"https://example.com/{page}",
+                              status=UrlStatusType.COMPLETED) for page in range(pages)])
+    for first in range(1, pages + 1, 10_000):
+        database.insert_urls([
+            Url(url=f"https://example.com/{page}/{link}", normalized_url=f"https://example.com/{page}/{link}",
+                parent_url_id=page, depth=1)
+            for page in range(first, min(first + 10_000, pages + 1)) for link in range(LINKS_PER_PAGE)
+        ])
+
+
+def query_per_page(database: DatabaseManager, stream) -> None:
+    report = {}
+    with database._connect() as conn:
+        parents = conn.execute("SELECT url_id, origin || path AS normalized_url FROM urls JOIN hosts USING (host_id) "
+                               "WHERE status = ? ORDER BY created_at", (UrlStatusType.COMPLETED.code,)).fetchall()
+        for parent in parents:
+            children = conn.execute("SELECT origin || path AS normalized_url FROM urls JOIN hosts USING (host_id) "
+                                    "WHERE parent_url_id = ? ORDER BY created_at", (parent["url_id"],)).fetchall()
+            report[parent["normalized_url"]] = [row["normalized_url"] for row in children]
+    for visited_url, extracted in report.items():
+        print(f"Visited: {visited_url}", file=stream)
+        print("Extracted:", file=stream)
+        for child in extracted:
+            print(f"- {child}", file=stream)
+        print("", file=stream)
+
+
+def streamed(database: DatabaseManager, stream) -> None:
+    CrawlReportPrinter(database_manager=database).print_report(stream=stream)
+
+
+def measure(report, database: DatabaseManager) -> tuple:
+    with open(os.devnull, "w") as stream:
+        tracemalloc.start()
+        started_at = time.perf_counter()
+        report(database, stream)
+        elapsed = time.perf_counter() - started_at
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return elapsed, peak
+
+
+def main() -> None:
+    for pages in PAGE_COUNTS:
+        with tempfile.TemporaryDirectory() as directory:
+            database = DatabaseManager(Path(directory) / "crawler.sqlite")
+            fill(database, pages)
+            for name, report in (("query per page", query_per_page), ("streamed join", streamed)):
+                elapsed, peak = measure(report, database)
+                print(f"{pages:>7} pages  {name:<15} {elapsed:6.2f} s  peak memory: {peak / 2 ** 20:7.1f} MiB")
+            database.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""
+Benchmark: time to restore the seen-URL set from the urls table when a crawl resumes, into an in-process set,
+a fakeredis set and the Bloom filter.
+
+    PYTHONPATH=src python benchmarks/bench_resume.py
+"""
+import tempfile
+import time
+from pathlib import Path
+
+from webcrawler_arnoldkyeza.core.datastore.database_manager import DatabaseManager
+from webcrawler_arnoldkyeza.core.duplicate_eliminator.backends.memory_backend import MemoryDedupBackend
+from webcrawler_arnoldkyeza.core.duplicate_eliminator.backends.redis_backend import FakeRedisDedupBackend
+from webcrawler_arnoldkyeza.core.duplicate_eliminator.bloom_filter import ScalableBloomFilter
+from webcrawler_arnoldkyeza.core.duplicate_eliminator.duplicate_eliminator import DuplicateEliminator
+from webcrawler_arnoldkyeza.core.enums.url_status_type import UrlStatusType
+from webcrawler_arnoldkyeza.core.scheduler.models.url import Url
+from webcrawler_arnoldkyeza.core.scheduler.scheduler import RESUME_BATCH_SIZE
+
+URLS = 2_000_000
+
+
+def fill(database: DatabaseManager) -> None:
+    for first in range(0, URLS, 100_000):
+        database.insert_urls([
+            Url(url=url, normalized_url=url, status=UrlStatusType.COMPLETED)
+            for url in (f"https://example.com/articles/{i}" for i in range(first, first + 100_000))
+        ])
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        database = DatabaseManager(Path(directory) / "crawler.sqlite")
+        fill(database)
+
+        backends = {
+            "memory set": DuplicateEliminator(backend=MemoryDedupBackend()),
+            "fakeredis set": DuplicateEliminator(backend=FakeRedisDedupBackend()),
+            "bloom filter": DuplicateEliminator(backend=FakeRedisDedupBackend(),
+                                                url_filter=ScalableBloomFilter(initial_capacity=URLS)),
+        }
+        for name, duplicate_eliminator in backends.items():
+            started_at = time.perf_counter()
+            restored = duplicate_eliminator.restore_seen_urls(database.iter_normalized_urls(RESUME_BATCH_SIZE))
+            print(f"{name:<13} {restored} URLs restored in {time.perf_counter() - started_at:5.1f}s")
+
+
+if __name__ == "__main__":
+    main()
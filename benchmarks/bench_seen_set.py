@@ -0,0 +1,50 @@
+"""
+Microbenchmark: memory per seen URL and cost per check of the Redis set of URL digests against the
+scalable Bloom filter.
+
+The memory of the Redis set is that of the same digests in a Python set, which is how fakeredis holds them.
+
+    PYTHONPATH=src python benchmarks/bench_seen_set.py
+"""
+import time
+import tracemalloc
+
+from webcrawler_arnoldkyeza.core.duplicate_eliminator.backends.redis_backend import FakeRedisDedupBackend
+from webcrawler_arnoldkyeza.core.duplicate_eliminator.bloom_filter import ScalableBloomFilter
+from webcrawler_arnoldkyeza.core.duplicate_eliminator.duplicate_eliminator import DuplicateEliminator
+from webcrawler_arnoldkyeza.core.utils import calculate_digest
+
+URLS = 200_000
+TIMED_URLS = 5_000
+
+
+def per_check(duplicate_eliminator: DuplicateEliminator, urls: list) -> float:
+    started_at = time.perf_counter()
+    for url in urls:
+        duplicate_eliminator.is_duplicate_url(url)
+    return (time.perf_counter() - started_at) / len(urls) * 1e6
+
+
+def main() -> None:
+    urls = [f"https://example.com/articles/{i}/comments?page={i % 7}" for i in range(URLS)]
+
+    tracemalloc.start()
+    digests = {calculate_digest(url) for url in urls}
+    set_bytes, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del digests
+
+    bloom = ScalableBloomFilter(initial_capacity=URLS // 10, error_rate=0.01)
+    for url in urls:
+        bloom.add(url)
+
+    redis_us = per_check(DuplicateEliminator(backend=FakeRedisDedupBackend()), urls[:TIMED_URLS])
+    bloom_us = per_check(
+        DuplicateEliminator(backend=FakeRedisDedupBackend(), url_filter=ScalableBloomFilter()), urls[:TIMED_URLS]
+    )
+    print(f"redis set     {set_bytes / URLS:7.1f} bytes/URL  {redis_us:6.1f} µs/check")
+    print(f"bloom filter  {bloom.size_in_bytes / URLS:7.1f} bytes/URL  {bloom_us:6.1f} µs/check")
+
+
+if __name__ == "__main__":
+    main()
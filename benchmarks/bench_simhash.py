@@ -0,0 +1,63 @@
+"""
+Microbenchmark: near-duplicate lookups in `SimHashIndex` as the index grows, against a linear Hamming-distance
+scan over the same fingerprints.
+
+    PYTHONPATH=src python benchmarks/bench_simhash.py
+"""
+import random
+import time
+
+from webcrawler_arnoldkyeza.core.duplicate_eliminator.simhash import SimHashIndex, simhash
+
+SIZES = [10_000, 100_000, 1_000_000, 2_000_000]
+LOOKUPS = 20_000
+SCAN_LOOKUPS = 20
+THRESHOLD = 3
+
+
+def near(fingerprint: int, rng: random.Random) -> int:
+    for bit in rng.sample(range(64), rng.randint(0, THRESHOLD)):
+        fingerprint ^= 1 << bit
+    return fingerprint
+
+
+def queries(indexed: list, rng: random.Random) -> list:
+    # half of the lookups are near-duplicates of an indexed page, half are new pages
+    return [near(rng.choice(indexed), rng) if i % 2 else rng.getrandbits(64) for i in range(LOOKUPS)]
+
+
+def per_lookup(run, items: list) -> float:
+    started_at = time.perf_counter()
+    for item in items:
+        run(item)
+    return (time.perf_counter() - started_at) / len(items) * 1e6
+
+
+def main() -> None:
+    rng = random.Random(0)
+    index = SimHashIndex(threshold=THRESHOLD)
+    indexed: list = []
+
+    page = " ".join(f"word{rng.randrange(5000)}" for _ in range(800))
+    started_at = time.perf_counter()
+    for _ in range(200):
+        simhash(page)
+    print(f"simhash of an 800 word page: {(time.perf_counter() - started_at) / 200 * 1e3:.2f} ms")
+
+    for size in SIZES:
+        while len(indexed) < size:
+            fingerprint = rng.getrandbits(64)
+            index.add(fingerprint)
+            indexed.append(fingerprint)
+
+        lookups = queries(indexed, rng)
+        indexed_us = per_lookup(index.find, lookups)
+        scan_us = per_lookup(
+            lambda fp: next((c for c in indexed if (c ^ fp).bit_count() <= THRESHOLD), None),
+            [rng.getrandbits(64) for _ in range(SCAN_LOOKUPS)],
+        )
+        print(f"{size:>9} pages  banded index: {indexed_us:6.2f} µs/lookup  linear scan: {scan_us:10.1f} µs/lookup")
+
+
+if __name__ == "__main__":
+    main()
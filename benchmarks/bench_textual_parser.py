@@ -0,0 +1,49 @@
+"""
+Microbenchmark: extracting the title, text and links of a page with the BeautifulSoup `TextualParser` vs the
+single-pass `FastTextualParser`, on a generated article page of about 100 KB with navigation, scripts, inline
+markup and entities.
+
+    PYTHONPATH=src python benchmarks/bench_textual_parser.py
+"""
+import timeit
+
+from webcrawler_arnoldkyeza.core.extractor.content_parser.fast_textual_parser import FastTextualParser
+from webcrawler_arnoldkyeza.core.extractor.content_parser.textual_parser import TextualParser
+
+NAVIGATION_LINKS = 60
+SECTIONS = 300
+
+
+def article_page() -> str:
+    head = (
+        "<head><meta charset='utf-8'><title>An Article &amp; Its Sections</title>"
+        "<link rel='stylesheet' href='/static/site.css'><style>body { margin: 0 }</style>"
+        "<script>window.dataLayer = [{'page': 'article', 'html': '<a href=/tracked>'}];</script></head>"
+    )
+    navigation = "".join(f'<li><a href="/category/{i}/">Category {i}</a></li>' for i in range(NAVIGATION_LINKS))
+    sections = []
+    for i in range(SECTIONS):
+        sections.append(
+            f'<section id="s{i}" class="article-section"><h2>Section {i}</h2>\n'
+            f'<p>Paragraph {i} with <em>emphasis</em>, <strong>strong text</strong> &amp; an entity &#8212; '
+            f'and <a href="/articles/{i}?ref=body&amp;page={i}">a link</a> to another article.</p>\n'
+            f'<p>More text for section {i}, enough to look like prose on a real page.</p>\n'
+        )
+        if i % 20 == 0:
+            sections.append('<script>track("section")</script><!-- advert slot --><img src="/ad.png" alt="">\n')
+        sections.append("</section>\n")
+    footer = "".join(f"<a href='https://example.com/footer/{i}'>Footer {i}</a> " for i in range(20))
+    return (f"<!DOCTYPE html>\n<html>{head}<body><nav><ul>{navigation}</ul></nav>"
+            f"<article>{''.join(sections)}</article><footer>{footer}</footer></body></html>")
+
+
+if __name__ == "__main__":
+    page = article_page()
+    assert FastTextualParser.parse(page) == TextualParser.parse(page)
+    print(f"page: {len(page.encode('utf-8')) / 1024:.0f} KB")
+    timings = {}
+    for name, parser in (("TextualParser (bs4)", TextualParser), ("FastTextualParser", FastTextualParser)):
+        seconds = min(timeit.repeat(lambda: parser.parse(page), number=5, repeat=5)) / 5
+        timings[name] = seconds
+        print(f"{name:22} {seconds * 1000:8.1f} ms/page")
+    print(f"speed-up: {timings['TextualParser (bs4)'] / timings['FastTextualParser']:.1f}x")
@@ -0,0 +1,49 @@
+"""
+Microbenchmark: normalizing the links of a site's pages one by one with `normalize_url` vs in batches with
+`UrlNormalizer.normalize_many`.
+
+    PYTHONPATH=src python benchmarks/bench_url_normalizer.py
+"""
+import random
+import timeit
+from urllib.parse import urljoin
+
+from webcrawler_arnoldkyeza.core.url_normalizer import UrlNormalizer
+from webcrawler_arnoldkyeza.core.utils import normalize_url
+
+PAGES = 200
+SHARED_LINKS = 80  # navigation and footer links repeated on every page
+PAGE_LINKS = 40
+
+
+def site_pages() -> list:
+    rng = random.Random(0)
+    shared = [f"https://example.com/section/{i}" for i in range(SHARED_LINKS // 2)]
+    shared += [f"/category/{i}/?sort=asc&page=1" for i in range(SHARED_LINKS // 2)]
+    pages = []
+    for page in range(PAGES):
+        links = list(shared)
+        links += [f"/articles/{page}-{i}/" if i % 2 else f"https://example.com/articles/{rng.random()}"
+                  for i in range(PAGE_LINKS)]
+        pages.append((f"https://example.com/articles/{page}/", links))
+    return pages
+
+
+def per_link(pages: list) -> None:
+    for base_url, links in pages:
+        for link in links:
+            normalize_url(urljoin(base_url, link))
+
+
+def batched(pages: list) -> None:
+    normalizer = UrlNormalizer()
+    for base_url, links in pages:
+        normalizer.normalize_many(links, base_url)
+
+
+if __name__ == "__main__":
+    pages = site_pages()
+    links = PAGES * (SHARED_LINKS + PAGE_LINKS)
+    for name, function in (("normalize_url per link", per_link), ("UrlNormalizer.normalize_many", batched)):
+        seconds = min(timeit.repeat(lambda: function(pages), number=1, repeat=5))
+        print(f"{name:32} {seconds * 1000:8.1f} ms  {seconds / links * 1e6:6.2f} us/link")
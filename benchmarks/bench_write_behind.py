@@ -0,0 +1,89 @@
+"""
+Benchmark: crawler workers writing to SQLite on the event loop, against handing their writes to a
+`WriteBehindWriter`. Reports pages stored per second and the longest the event loop was kept from running a
+ticker task, which is how long every fetch in flight was stalled.
+
+    PYTHONPATH=src python benchmarks/bench_write_behind.py
+"""
+import asyncio
+import datetime
+import tempfile
+import time
+from pathlib import Path
+
+from webcrawler_arnoldkyeza.core.datastore.database_manager import DatabaseManager
+from webcrawler_arnoldkyeza.core.datastore.write_behind_writer import WriteBehindWriter
+from webcrawler_arnoldkyeza.core.scheduler.models.url import Url
+
+WORKERS = 32
+PAGES_PER_WORKER = 100
+LINKS_PER_PAGE = 20
+TICK = 0.001
+
+
+async def write(writer, call, *args, wait=True):
+    if writer is None:
+        return call(*args)
+    if wait:
+        return await writer.write(call, *args)
+    await writer.write_later(call, *args)
+
+
+async def worker(database: DatabaseManager, writer, worker_id: int) -> None:
+    for page in range(PAGES_PER_WORKER):
+        parent = f"https://example.com/{worker_id}/{page}"
+        await write(writer, database.claim_url, parent)
+        await asyncio.sleep(0)  # the fetch
+        children = [Url(url=f"{parent}/{link}", normalized_url=f"{parent}/{link}", depth=1)
+                    for link in range(LINKS_PER_PAGE)]
+        if page % 10:
+            await write(writer, database.commit_page, parent, children, datetime.datetime.now())
+        else:
+            await write(writer, database.update_url_on_failed, parent, "Timed out", wait=False)
+
+
+async def ticker(stalls: list, done: asyncio.Event) -> None:
+    while not done.is_set():
+        started_at = time.perf_counter()
+        await asyncio.sleep(TICK)
+        stalls.append(time.perf_counter() - started_at - TICK)
+
+
+async def run(database: DatabaseManager, writer) -> tuple:
+    if writer is not None:
+        writer.start()
+    stalls: list = []
+    done = asyncio.Event()
+    ticking = asyncio.create_task(ticker(stalls, done))
+
+    started_at = time.perf_counter()
+    await asyncio.gather(*(worker(database, writer, worker_id) for worker_id in range(WORKERS)))
+    if writer is not None:
+        await writer.close()
+    elapsed = time.perf_counter() - started_at
+
+    done.set()
+    await ticking
+    return elapsed, max(stalls)
+
+
+def main() -> None:
+    for name in ("on the event loop", "write-behind"):
+        with tempfile.TemporaryDirectory() as directory:
+            database = DatabaseManager(Path(directory) / "crawler.sqlite")
+            parents = [f"https://example.com/{worker_id}/{page}"
+                       for worker_id in range(WORKERS) for page in range(PAGES_PER_WORKER)]
+            database.insert_urls([Url(url=parent, normalized_url=parent) for parent in parents])
+            writer = WriteBehindWriter(database_manager=database) if name == "write-behind" else None
+            elapsed, stall = asyncio.run(run(database, writer))
+            database.close()
+
+        pages_per_second = WORKERS * PAGES_PER_WORKER / elapsed
+        message = f"{name:<18} {pages_per_second:8.0f} pages/s  longest stall: {stall * 1e3:6.2f} ms"
+        if writer is not None:
+            message += f"  ({writer.writes_applied} writes in {writer.batches_written} transactions)"
+        print(message)
+
+
+if __name__ == "__main__":
+    main()
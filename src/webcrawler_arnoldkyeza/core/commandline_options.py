@@ -1,11 +1,16 @@
 import argparse
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
+
+from webcrawler_arnoldkyeza.core.html_fetcher.protocol_handlers.protocol_handler import DEFAULT_USER_AGENT
 
 PROJECT_ROOT = Path(__file__).parent.parent.parent.parent
 DEFAULT_DATABASE_PATH = PROJECT_ROOT / "crawler.sqlite"
 DEFAULT_BLOB_STORAGE_PATH = PROJECT_ROOT / "src/webcrawler_arnoldkyeza/core/datastore/blobs"
+HTTP_CLIENTS = ["aiohttp", "requests"]
+CONTENT_PARSER_NAMES = ["bs4", "fast"]
+DEDUP_BACKEND_NAMES = ["memory", "fakeredis", "redis", "sharded-redis"]
 
 @dataclass
 class CrawlerConfig:
@@ -15,6 +20,45 @@ class CrawlerConfig:
     log_level: Optional[str] = field(default="INFO")
     database: Optional[Path] = field(default=DEFAULT_DATABASE_PATH)
     blob_storage_path: Optional[Path] = field(default=DEFAULT_BLOB_STORAGE_PATH)
+    http_client: Optional[str] = field(default="aiohttp")
+    max_connections: Optional[int] = field(default=1000)
+    max_connections_per_host: Optional[int] = field(default=100)
+    connect_timeout: Optional[float] = field(default=10.0)
+    read_timeout: Optional[float] = field(default=30.0)
+    max_body_size: Optional[int] = field(default=10 * 1024 * 1024)
+    dns_cache_ttl: Optional[float] = field(default=300.0)
+    user_agent: Optional[str] = field(default=DEFAULT_USER_AGENT)
+    respect_robots_txt: Optional[bool] = field(default=True)
+    host_requests_per_second: Optional[float] = field(default=4.0)
+    host_burst: Optional[int] = field(default=4)
+    max_in_flight_per_host: Optional[int] = field(default=4)
+    max_attempts: Optional[int] = field(default=3)
+    retry_base_delay: Optional[float] = field(default=1.0)
+    circuit_failure_threshold: Optional[int] = field(default=5)
+    circuit_cool_down: Optional[float] = field(default=30.0)
+    adaptive_concurrency: Optional[bool] = field(default=False)
+    min_concurrency: Optional[int] = field(default=1)
+    max_concurrency: Optional[int] = field(default=64)
+    warc_record: Optional[Path] = field(default=None)
+    warc_replay: Optional[List[Path]] = field(default=None)
+    replay_latency: Optional[float] = field(default=0.0)
+    replay_latency_jitter: Optional[float] = field(default=0.0)
+    parser: Optional[str] = field(default="bs4")
+    parse_workers: Optional[int] = field(default=0)
+    parse_batch_size: Optional[int] = field(default=8)
+    parse_batch_delay: Optional[float] = field(default=0.005)
+    sitemaps: Optional[bool] = field(default=False)
+    sitemap_batch_size: Optional[int] = field(default=1000)
+    max_sitemaps: Optional[int] = field(default=1000)
+    near_duplicate_threshold: Optional[int] = field(default=None)
+    bloom_filter: Optional[bool] = field(default=False)
+    bloom_capacity: Optional[int] = field(default=1_000_000)
+    bloom_error_rate: Optional[float] = field(default=0.01)
+    bloom_filter_path: Optional[Path] = field(default=None)
+    dedup_backend: Optional[str] = field(default="memory")
+    redis_urls: Optional[List[str]] = field(default=None)
+    write_batch_size: Optional[int] = field(default=500)
+    write_flush_interval: Optional[float] = field(default=0.005)
 
 
 def parse_command_line_options(argv: Optional[list[str]] = None) -> CrawlerConfig:
@@ -50,6 +94,250 @@ def parse_command_line_options(argv: Optional[list[str]] = None) -> CrawlerConfi
         default=DEFAULT_BLOB_STORAGE_PATH,
         help="Blob storage path (default: core/datastore/blobs)"
     )
+    parser.add_argument(
+        "--http-client",
+        type=str,
+        choices=HTTP_CLIENTS,
+        default="aiohttp",
+        help="HTTP client used to fetch pages (default: aiohttp)",
+    )
+    parser.add_argument(
+        "--max-connections",
+        type=int,
+        default=1000,
+        help="Maximum number of pooled HTTP connections in total (default: 1000)",
+    )
+    parser.add_argument(
+        "--max-connections-per-host",
+        type=int,
+        default=100,
+        help="Maximum number of pooled HTTP connections per host (default: 100)",
+    )
+    parser.add_argument(
+        "--connect-timeout",
+        type=float,
+        default=10.0,
+        help="HTTP connect timeout in seconds (default: 10)",
+    )
+    parser.add_argument(
+        "--read-timeout",
+        type=float,
+        default=30.0,
+        help="HTTP socket read timeout in seconds (default: 30)",
+    )
+    parser.add_argument(
+        "--max-body-size",
+        type=int,
+        default=10 * 1024 * 1024,
+        help="Maximum size in bytes of a downloaded page body (default: 10485760)",
+    )
+    parser.add_argument(
+        "--dns-cache-ttl",
+        type=float,
+        default=300.0,
+        help="Seconds a resolved host is cached by the aiohttp client, 0 disables the cache (default: 300)",
+    )
+    parser.add_argument(
+        "--user-agent",
+        type=str,
+        default=DEFAULT_USER_AGENT,
+        help=f"User-Agent sent with requests and matched against robots.txt (default: {DEFAULT_USER_AGENT})",
+    )
+    parser.add_argument(
+        "--ignore-robots-txt",
+        action="store_true",
+        help="Crawl URLs even when robots.txt disallows them",
+    )
+    parser.add_argument(
+        "--host-requests-per-second",
+        type=float,
+        default=4.0,
+        help="Sustained request rate allowed per host, 0 disables rate limiting (default: 4)",
+    )
+    parser.add_argument(
+        "--host-burst",
+        type=int,
+        default=4,
+        help="Number of requests a host may receive in a burst (default: 4)",
+    )
+    parser.add_argument(
+        "--max-in-flight-per-host",
+        type=int,
+        default=4,
+        help="Maximum concurrent fetches per host, 0 disables the cap (default: 4)",
+    )
+    parser.add_argument(
+        "--max-attempts",
+        type=int,
+        default=3,
+        help="Maximum number of fetch attempts for a URL that fails with a transient error (default: 3)",
+    )
+    parser.add_argument(
+        "--retry-base-delay",
+        type=float,
+        default=1.0,
+        help="Base delay in seconds of the exponential backoff between attempts (default: 1)",
+    )
+    parser.add_argument(
+        "--circuit-failure-threshold",
+        type=int,
+        default=5,
+        help="Consecutive transient failures after which a host is paused (default: 5)",
+    )
+    parser.add_argument(
+        "--circuit-cool-down",
+        type=float,
+        default=30.0,
+        help="Seconds a failing host is paused for, doubled on every repeated trip (default: 30)",
+    )
+    parser.add_argument(
+        "--adaptive-concurrency",
+        action="store_true",
+        help="Adjust the number of concurrent fetches to latency and errors, starting at --number-of-workers",
+    )
+    parser.add_argument(
+        "--min-concurrency",
+        type=int,
+        default=1,
+        help="Lower bound of concurrent fetches in adaptive mode (default: 1)",
+    )
+    parser.add_argument(
+        "--max-concurrency",
+        type=int,
+        default=64,
+        help="Upper bound of concurrent fetches in adaptive mode (default: 64)",
+    )
+    parser.add_argument(
+        "--warc-record",
+        type=Path,
+        default=None,
+        help="Append every fetched response to this WARC file",
+    )
+    parser.add_argument(
+        "--warc-replay",
+        type=Path,
+        nargs="+",
+        default=None,
+        help="Serve responses from these WARC files instead of the network",
+    )
+    parser.add_argument(
+        "--replay-latency",
+        type=float,
+        default=0.0,
+        help="Seconds added to every replayed response (default: 0)",
+    )
+    parser.add_argument(
+        "--replay-latency-jitter",
+        type=float,
+        default=0.0,
+        help="Random extra seconds, up to this value, added to every replayed response (default: 0)",
+    )
+    parser.add_argument(
+        "--parser",
+        type=str,
+        choices=CONTENT_PARSER_NAMES,
+        default="bs4",
+        help="HTML parser backend: bs4 (BeautifulSoup) or fast (single-pass, no DOM) (default: bs4)",
+    )
+    parser.add_argument(
+        "--parse-workers",
+        type=int,
+        default=0,
+        help="Number of processes parsing pages off the event loop, 0 parses on the loop (default: 0)",
+    )
+    parser.add_argument(
+        "--parse-batch-size",
+        type=int,
+        default=8,
+        help="Maximum number of pages sent to a parse process at once (default: 8)",
+    )
+    parser.add_argument(
+        "--parse-batch-delay",
+        type=float,
+        default=0.005,
+        help="Seconds to wait for a parse batch to fill up before sending it (default: 0.005)",
+    )
+
+    parser.add_argument(
+        "--sitemaps",
+        action="store_true",
+        help="Seed the crawl with the URLs of the site's sitemaps (from robots.txt and /sitemap.xml)",
+    )
+    parser.add_argument(
+        "--sitemap-batch-size",
+        type=int,
+        default=1000,
+        help="Number of sitemap URLs inserted into the database at once (default: 1000)",
+    )
+    parser.add_argument(
+        "--max-sitemaps",
+        type=int,
+        default=1000,
+        help="Maximum number of sitemaps and sitemap indexes read per crawl (default: 1000)",
+    )
+
+    parser.add_argument(
+        "--near-duplicate-threshold",
+        type=int,
+        default=None,
+        help="Skip storing and following the links of pages whose SimHash is within this many bits of a page "
+             "already crawled (default: disabled)",
+    )
+
+    parser.add_argument(
+        "--bloom-filter",
+        action="store_true",
+        help="Remember seen URLs in a Bloom filter (about 2 bytes per URL) instead of a Redis set",
+    )
+    parser.add_argument(
+        "--bloom-capacity",
+        type=int,
+        default=1_000_000,
+        help="Number of URLs the Bloom filter is sized for before it grows (default: 1000000)",
+    )
+    parser.add_argument(
+        "--bloom-error-rate",
+        type=float,
+        default=0.01,
+        help="False-positive rate of the Bloom filter, confirmed against the database (default: 0.01)",
+    )
+    parser.add_argument(
+        "--bloom-filter-path",
+        type=Path,
+        default=None,
+        help="Memory-map the Bloom filter to this file so that it is kept between crawls",
+    )
+
+    parser.add_argument(
+        "--dedup-backend",
+        type=str,
+        choices=DEDUP_BACKEND_NAMES,
+        default="memory",
+        help="Where seen URLs and page texts are kept: memory (in-process sets), fakeredis (in-process Redis "
+             "emulation), redis (one Redis server) or sharded-redis (several, by consistent hashing) (default: memory)",
+    )
+    parser.add_argument(
+        "--redis-url",
+        dest="redis_urls",
+        action="append",
+        default=None,
+        help="Redis server of the redis and sharded-redis backends, e.g. redis://localhost:6379/0; repeat the "
+             "option for each shard",
+    )
+
+    parser.add_argument(
+        "--write-batch-size",
+        type=int,
+        default=500,
+        help="Maximum number of database writes committed in one transaction by the write-behind writer, 0 writes "
+             "from the workers directly (default: 500)",
+    )
+    parser.add_argument(
+        "--write-flush-interval",
+        type=float,
+        default=0.005,
+        help="Seconds the write-behind writer waits for a batch of writes to fill up (default: 0.005)",
+    )
 
     args, _ = parser.parse_known_args(argv)
 
@@ -63,5 +351,44 @@ def parse_command_line_options(argv: Optional[list[str]] = None) -> CrawlerConfi
         max_depth=args.max_depth,
         log_level=args.log_level,
         database=database_path,
+        http_client=args.http_client,
+        max_connections=args.max_connections,
+        max_connections_per_host=args.max_connections_per_host,
+        connect_timeout=args.connect_timeout,
+        read_timeout=args.read_timeout,
+        max_body_size=args.max_body_size,
+        dns_cache_ttl=args.dns_cache_ttl,
+        user_agent=args.user_agent,
+        respect_robots_txt=not args.ignore_robots_txt,
+        host_requests_per_second=args.host_requests_per_second,
+        host_burst=args.host_burst,
+        max_in_flight_per_host=args.max_in_flight_per_host,
+        max_attempts=args.max_attempts,
+        retry_base_delay=args.retry_base_delay,
+        circuit_failure_threshold=args.circuit_failure_threshold,
+        circuit_cool_down=args.circuit_cool_down,
+        adaptive_concurrency=args.adaptive_concurrency,
+        min_concurrency=args.min_concurrency,
+        max_concurrency=args.max_concurrency,
+        warc_record=args.warc_record,
+        warc_replay=args.warc_replay,
+        replay_latency=args.replay_latency,
+        replay_latency_jitter=args.replay_latency_jitter,
+        parser=args.parser,
+        parse_workers=args.parse_workers,
+        parse_batch_size=args.parse_batch_size,
+        parse_batch_delay=args.parse_batch_delay,
+        sitemaps=args.sitemaps,
+        sitemap_batch_size=args.sitemap_batch_size,
+        max_sitemaps=args.max_sitemaps,
+        near_duplicate_threshold=args.near_duplicate_threshold,
+        bloom_filter=args.bloom_filter or args.bloom_filter_path is not None,
+        bloom_capacity=args.bloom_capacity,
+        bloom_error_rate=args.bloom_error_rate,
+        bloom_filter_path=args.bloom_filter_path,
+        dedup_backend=args.dedup_backend,
+        redis_urls=args.redis_urls,
+        write_batch_size=args.write_batch_size,
+        write_flush_interval=args.write_flush_interval,
     )
 
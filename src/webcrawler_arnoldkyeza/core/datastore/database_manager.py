@@ -1,148 +1,346 @@
 import datetime
 import logging
 import sqlite3
+import threading
 from contextlib import contextmanager
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from itertools import groupby
+from operator import itemgetter
 from pathlib import Path
-from typing import Generator, Optional, Dict, List
+from typing import Generator, Iterator, Optional, List, Tuple
 
-from webcrawler_arnoldkyeza.core.datastore.schemas import create_tables
+from webcrawler_arnoldkyeza.core.datastore.schema_migration import convert_legacy_database, is_legacy_database
+from webcrawler_arnoldkyeza.core.datastore.schemas import create_tables, status_count_statements
 from webcrawler_arnoldkyeza.core.enums.url_status_type import UrlStatusType
 from webcrawler_arnoldkyeza.core.scheduler.models.url import Url
+from webcrawler_arnoldkyeza.core.utils import calculate_digest, split_origin, to_epoch
 
 logger = logging.getLogger(__name__)
 
 
+# prepared statements kept per connection; the manager issues a few dozen distinct ones
+STATEMENT_CACHE_SIZE = 256
+# a URL's `update_frequency` counts days, see `schemas.create_url_table`
+UPDATE_FREQUENCY_SECONDS = 24 * 60 * 60
+
+# the columns `Url.from_row` reads, besides `normalized_url`
+URL_COLUMNS = ("url_id", "url", "priority", "update_frequency", "last_crawled_at", "status", "parent_url_id",
+               "error_message", "depth", "created_at", "etag", "last_modified", "attempts", "lastmod",
+               "sitemap_priority")
+SELECT_URLS_QUERY = f"""
+    SELECT hosts.origin || urls.path AS normalized_url, {", ".join(f"urls.{column}" for column in URL_COLUMNS)}
+    FROM urls
+    JOIN hosts ON hosts.host_id = urls.host_id
+    """
+INSERT_HOST_QUERY = "INSERT OR IGNORE INTO hosts (origin) VALUES (?)"
+INSERT_URL_QUERY = """
+    INSERT OR IGNORE INTO urls (url_key, host_id, path, url, priority, update_frequency, last_crawled_at, status,
+                                parent_url_id, error_message, depth, lastmod, sitemap_priority)
+    VALUES (?, (SELECT host_id FROM hosts WHERE origin = ?), ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """
+MARK_CRAWLED_QUERY = """
+    UPDATE urls
+    SET last_crawled_at = ?, status = ?, etag = ?, last_modified = ?, attempts = 0
+    WHERE url_key = ?
+    """
+
+
 @dataclass
 class DatabaseManager:
+    """
+    Access to the crawl database.
+
+    A single connection is kept open for the manager's lifetime, so a call pays neither for opening the file nor
+    for compiling its statement again, since sqlite3 caches the prepared statements of a connection. Each call runs
+    in an explicit transaction on it under a lock, as the resume pass and the write-behind writer call in from other
+    threads. Long scans use a reader connection of their own, which WAL lets run alongside the writer.
+
+    The lookups the event loop makes while the write-behind writer holds the connection for a batch, such as
+    `url_exists` and `has_active_urls`, go through a second long-lived connection with a lock of its own. WAL lets
+    them read the last committed state without waiting for the batch; they do not see writes not committed yet.
+
+    URLs are stored in the compact layout of `schemas.create_url_table` and looked up by the digest of their
+    normalized URL; `Url.from_row` maps a row back to a `Url`.
+    """
     path: Path
+    _connection: Optional[sqlite3.Connection] = field(default=None, init=False, repr=False, compare=False)
+    _lock: threading.RLock = field(default_factory=threading.RLock, init=False, repr=False, compare=False)
+    _read_connection: Optional[sqlite3.Connection] = field(default=None, init=False, repr=False, compare=False)
+    _read_lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False, compare=False)
 
     def __post_init__(self):
         if not self.path.exists():
             self.path.touch()
 
         try:
+            self._connection = self._open()
+            self._connection.execute("PRAGMA journal_mode = WAL")
+            # with WAL a commit only has to reach the log; a power loss may drop the last commits, never corrupt
+            self._connection.execute("PRAGMA synchronous = NORMAL")
             with self._connect() as conn:
-                conn.executescript(create_tables())
+                self._migrate(conn)
+            self._read_connection = self._open()
         except sqlite3.OperationalError as e:
             logger.error(f"Failed to initialize database at {self.path}: {e}")
             raise
 
+    def _open(self) -> sqlite3.Connection:
+        # transactions are begun and committed explicitly rather than by the sqlite3 module
+        conn = sqlite3.connect(
+            self.path.as_posix(),
+            isolation_level=None,
+            check_same_thread=False,
+            cached_statements=STATEMENT_CACHE_SIZE,
+        )
+        conn.row_factory = sqlite3.Row
+        return conn
+
     @contextmanager
     def _connect(self) -> Generator[sqlite3.Connection, None, None]:
-            conn = sqlite3.connect(
-                self.path.as_posix(),
-            )
-            conn.row_factory = self.dict_factory
+        with self._lock:
+            conn = self._connection
+            if conn.in_transaction:
+                # called inside `transaction()`: the enclosing scope commits or rolls back
+                yield conn
+                return
+            conn.execute("BEGIN")
             try:
                 yield conn
-            finally:
-                conn.commit()
-                conn.close()
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    def transaction(self):
+        """Run several calls as one transaction: the calls made inside the `with` block join it."""
+        return self._connect()
+
+    @contextmanager
+    def _read(self) -> Generator[sqlite3.Connection, None, None]:
+        with self._read_lock:
+            yield self._read_connection
+
+    @contextmanager
+    def _reader(self) -> Generator[sqlite3.Connection, None, None]:
+        conn = self._open()
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def close(self) -> None:
+        with self._read_lock:
+            if self._read_connection is not None:
+                self._read_connection.close()
+                self._read_connection = None
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    @staticmethod
+    def _migrate(conn: sqlite3.Connection) -> None:
+        if is_legacy_database(conn):
+            logger.info("Migrating urls table: converting to the compact schema")
+            converted = convert_legacy_database(conn)
+            logger.info(f"Migrating urls table: converted {converted} URLs")
+
+        for statement in create_tables():
+            conn.execute(statement)
+
+        has_status_counts = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'url_status_counts'"
+        ).fetchone()
+        if not has_status_counts:
+            logger.info("Migrating urls table: counting URLs per status")
+            for statement in status_count_statements():
+                conn.execute(statement)
 
     def insert_url(self, url: Url) -> None:
         """
         Insert a new URL row. If the URL (by normalized URL checksum/unique constraint) already exists,
         ignore the insertion.
         """
-        last_crawled_at = getattr(url, "last_crawled_at", None)
-        last_crawled_at_str = last_crawled_at.isoformat() if isinstance(last_crawled_at, datetime.datetime) else None
+        self.insert_urls([url])
+
+    def insert_urls(self, urls: List[Url]) -> None:
+        """
+        Insert many URL rows in a single transaction, ignoring the ones that already exist, so that bulk sources
+        such as sitemaps do not pay a connection and a commit per URL.
+        """
+        with self._connect() as conn:
+            self._insert(conn, urls)
+
+    def _insert(self, conn: sqlite3.Connection, urls: List[Url]) -> None:
+        rows = [self._insertion_row(url) for url in urls]
+        # a new host is stored first, so that the URL rows can look its id up
+        conn.executemany(INSERT_HOST_QUERY, ((origin,) for origin in {row[1] for row in rows}))
+        conn.executemany(INSERT_URL_QUERY, rows)
+
+    @staticmethod
+    def _insertion_row(url: Url) -> tuple:
+        origin, path = split_origin(url.normalized_url)
         status_obj = getattr(url, "status", UrlStatusType.PENDING)
-        status_str = status_obj.value if isinstance(status_obj, UrlStatusType) else str(status_obj)
-        parent_url_id = getattr(url, "parent_url_id", None)
-        error_message = getattr(url, "error_message", None)
-
-        insertion_query = """
-                INSERT OR IGNORE INTO urls (url, normalized_url, priority, update_frequency, last_crawled_at,
-                                            status, parent_url_id,
-                                            error_message, depth)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """
+        status = status_obj if isinstance(status_obj, UrlStatusType) else UrlStatusType(status_obj)
+
+        return (
+            calculate_digest(url.normalized_url),
+            origin,
+            path,
+            url.url if url.url != url.normalized_url else None,
+            url.priority,
+            url.update_frequency,
+            to_epoch(getattr(url, "last_crawled_at", None)),
+            status.code,
+            getattr(url, "parent_url_id", None),
+            getattr(url, "error_message", None),
+            getattr(url, "depth", 0),
+            getattr(url, "lastmod", None),
+            getattr(url, "sitemap_priority", None),
+        )
 
+    def get_pending_urls(self, limit: int) -> list[Url]:
         with self._connect() as conn:
-            conn.execute(
-                insertion_query,
-                (
-                    url.url,
-                    url.normalized_url,
-                    url.priority,
-                    url.update_frequency,
-                    last_crawled_at_str,
-                    status_str,
-                    parent_url_id,
-                    error_message,
-                    url.depth,
-                ),
+            cur = conn.execute(
+                f"""
+                {SELECT_URLS_QUERY}
+                WHERE urls.status = ?
+                ORDER BY urls.priority, urls.created_at
+                LIMIT ?
+                """,
+                (UrlStatusType.PENDING.code, limit),
             )
+            return [Url.from_row(row) for row in cur.fetchall()]
 
-    def get_pending_urls(self, limit: int) -> list[Url]:
-        results: list[Url] = []
-        fetch_pending_query = """
-                SELECT url_id,
-                       url,
-                       normalized_url,
-                       priority,
-                       update_frequency,
-                       last_crawled_at,
-                       status,
-                       parent_url_id,
-                       error_message,
-                       depth,
-                       created_at
-                FROM urls
-                WHERE status = ?
-                ORDER BY priority, created_at
+    def get_sitemap_urls(self, after_url_id: int, limit: int) -> List[Url]:
+        """Pending URLs loaded from sitemaps, in insertion order, starting after `after_url_id`."""
+        with self._read() as conn:
+            cur = conn.execute(
+                f"""
+                {SELECT_URLS_QUERY}
+                WHERE urls.url_id > ? AND urls.status = ? AND urls.sitemap_priority IS NOT NULL
+                ORDER BY urls.url_id
                 LIMIT ?
-                """
+                """,
+                (after_url_id, UrlStatusType.PENDING.code, limit),
+            )
+            return [Url.from_row(row) for row in cur.fetchall()]
+
+    def get_pending_urls_between(self, after_url_id: int, up_to_url_id: int, limit: int) -> List[Url]:
+        """Pending URLs with `after_url_id < url_id <= up_to_url_id`, in insertion order."""
+        with self._read() as conn:
+            cur = conn.execute(
+                f"""
+                {SELECT_URLS_QUERY}
+                WHERE urls.url_id > ? AND urls.url_id <= ? AND urls.status = ?
+                ORDER BY urls.url_id
+                LIMIT ?
+                """,
+                (after_url_id, up_to_url_id, UrlStatusType.PENDING.code, limit),
+            )
+            return [Url.from_row(row) for row in cur.fetchall()]
 
+    def iter_normalized_urls(self, batch_size: int = 10_000) -> Iterator[List[str]]:
+        """Every stored normalized URL, streamed in lists of up to `batch_size` from a single query."""
+        with self._reader() as conn:
+            cur = conn.execute("SELECT hosts.origin || urls.path FROM urls JOIN hosts ON hosts.host_id = urls.host_id")
+            cur.row_factory = None  # plain tuples, cheaper than rows over a scan of millions
+            while True:
+                rows = cur.fetchmany(batch_size)
+                if not rows:
+                    return
+                yield [row[0] for row in rows]
+
+    def reset_in_progress_urls(self) -> int:
+        """Put URLs left in progress by an interrupted crawl back to pending; returns how many there were."""
         with self._connect() as conn:
-            cur = conn.execute(fetch_pending_query, (UrlStatusType.PENDING.value, limit))
-            rows = cur.fetchall()
+            cur = conn.execute(
+                "UPDATE urls SET status = ? WHERE status = ?",
+                (UrlStatusType.PENDING.code, UrlStatusType.IN_PROGRESS.code),
+            )
+            return cur.rowcount
 
-            for row in rows:
-                results.append(
-                    Url(**row)
-                )
+    def reset_urls_due_for_recrawl(self, now: datetime.datetime) -> int:
+        """
+        Put crawled URLs whose `update_frequency` has passed since their last crawl back to pending; returns how many
+        there were. Their stored validators let the recrawl skip the unchanged ones.
+        """
+        with self._connect() as conn:
+            cur = conn.execute(
+                "UPDATE urls SET status = ? "
+                "WHERE status = ? AND last_crawled_at + update_frequency * ? <= ?",
+                (UrlStatusType.PENDING.code, UrlStatusType.COMPLETED.code, UPDATE_FREQUENCY_SECONDS, to_epoch(now)),
+            )
+            return cur.rowcount
+
+    def get_max_url_id(self) -> int:
+        with self._read() as conn:
+            row = conn.execute("SELECT COALESCE(MAX(url_id), 0) AS max_url_id FROM urls").fetchone()
+            return row["max_url_id"]
 
-        return results
+    def claim_url(self, normalized_url: str) -> Optional[Url]:
+        """Mark the URL as in progress and return its row, or None when it is not stored, in one statement."""
+        with self._connect() as conn:
+            cur = conn.execute(
+                f"UPDATE urls SET status = ? WHERE url_key = ? RETURNING {', '.join(URL_COLUMNS)}",
+                (UrlStatusType.IN_PROGRESS.code, calculate_digest(normalized_url)),
+            )
+            # fetch to the end: the UPDATE has to have finished before the commit
+            rows = cur.fetchall()
+            return Url.from_row(rows[0], normalized_url=normalized_url) if rows else None
 
     def get_url(self, normalized_url: str) -> Optional[Url]:
         with self._connect() as conn:
             cur = conn.execute(
-                "SELECT * FROM urls WHERE normalized_url = ? LIMIT 1",
-                (normalized_url,),
+                f"SELECT {', '.join(URL_COLUMNS)} FROM urls WHERE url_key = ? LIMIT 1",
+                (calculate_digest(normalized_url),),
             )
             row = cur.fetchone()
             if row is None:
                 return None
 
-            return Url(**row)
+            return Url.from_row(row, normalized_url=normalized_url)
 
     def url_exists(self, url: str) -> bool:
-        with self._connect() as conn:
+        with self._read() as conn:
             cur = conn.execute(
-                "SELECT 1 FROM urls WHERE normalized_url = ? LIMIT 1",
-                (url,),
+                "SELECT 1 FROM urls WHERE url_key = ? LIMIT 1",
+                (calculate_digest(url),),
             )
             return cur.fetchone() is not None
 
     def update_url_status(self, normalized_url: str, status: UrlStatusType):
         with self._connect() as conn:
             conn.execute(
-                "UPDATE urls SET status = ? WHERE normalized_url = ?",
-                (status.value, normalized_url),
+                "UPDATE urls SET status = ? WHERE url_key = ?",
+                (status.code, calculate_digest(normalized_url)),
             )
 
-    def mark_url_as_crawled(self, normalized_url, last_crawled_at: datetime.datetime):
+    def mark_url_as_crawled(self, normalized_url, last_crawled_at: datetime.datetime,
+                            etag: Optional[str] = None, last_modified: Optional[str] = None):
+        """
+        Mark the URL as completed and store the response validators used to revalidate it on the next crawl.
+        """
         with self._connect() as conn:
             conn.execute(
-                "UPDATE urls SET last_crawled_at = ?, status = ? WHERE normalized_url = ?",
-                (last_crawled_at.isoformat(), UrlStatusType.COMPLETED.value, normalized_url),
+                MARK_CRAWLED_QUERY,
+                (to_epoch(last_crawled_at), UrlStatusType.COMPLETED.code, etag, last_modified,
+                 calculate_digest(normalized_url)),
             )
 
-    @staticmethod
-    def dict_factory(cursor, row):
-        return {col[0]: row[idx] for idx, col in enumerate(cursor.description)}
+    def commit_page(self, normalized_url: str, children: List[Url], last_crawled_at: datetime.datetime,
+                    etag: Optional[str] = None, last_modified: Optional[str] = None) -> None:
+        """
+        Store the new links found on a crawled page and mark the page as crawled, in a single transaction: a page
+        costs one commit however many links it has, and a crash cannot leave it crawled without its links.
+        """
+        with self._connect() as conn:
+            self._insert(conn, children)
+            conn.execute(
+                MARK_CRAWLED_QUERY,
+                (to_epoch(last_crawled_at), UrlStatusType.COMPLETED.code, etag, last_modified,
+                 calculate_digest(normalized_url)),
+            )
 
     def update_url_on_failed(self, normalized_url: str, error_message: str):
         with self._connect() as conn:
@@ -150,50 +348,62 @@ class DatabaseManager:
                 """
                 UPDATE urls
                 SET status = ?, error_message = ?
-                WHERE normalized_url = ?
+                WHERE url_key = ?
                 """,
-                (UrlStatusType.FAILED.value, error_message, normalized_url),
+                (UrlStatusType.FAILED.code, error_message, calculate_digest(normalized_url)),
             )
 
-    def get_crawled_urls_with_extracted(self) -> Dict[str, List[str]]:
-        result: Dict[str, List[str]] = {}
+    def record_failed_attempt(self, normalized_url: str, error_message: str) -> int:
+        """
+        Count a failed fetch of the URL and put it back to pending so that it can be retried.
+        Returns the number of failed attempts so far.
+        """
         with self._connect() as conn:
-            parent_cur = conn.execute(
+            cur = conn.execute(
+                """
+                UPDATE urls
+                SET attempts = attempts + 1, status = ?, error_message = ?
+                WHERE url_key = ?
+                RETURNING attempts
+                """,
+                (UrlStatusType.PENDING.code, error_message, calculate_digest(normalized_url)),
+            )
+            rows = cur.fetchall()
+            return rows[0]["attempts"] if rows else 0
+
+    def get_crawled_urls_with_extracted(self) -> Iterator[Tuple[str, List[str]]]:
+        """
+        Every crawled URL with the URLs first found on it, as (parent, children) pairs in the order they were found.
+
+        One ordered join streamed from a reader connection: only the current parent's children are held in
+        memory, however large the crawl.
+        """
+        with self._reader() as conn:
+            cur = conn.execute(
                 """
-                SELECT url_id, normalized_url
-                FROM urls
-                WHERE status = ?
-                ORDER BY created_at
+                SELECT parent_host.origin || parent.path, child_host.origin || child.path
+                FROM urls AS parent
+                JOIN hosts AS parent_host ON parent_host.host_id = parent.host_id
+                LEFT JOIN urls AS child ON child.parent_url_id = parent.url_id
+                LEFT JOIN hosts AS child_host ON child_host.host_id = child.host_id
+                WHERE parent.status = ?
+                ORDER BY parent.url_id, child.url_id
                 """,
-                (UrlStatusType.COMPLETED.value,)
+                (UrlStatusType.COMPLETED.code,)
             )
-            parents = parent_cur.fetchall()
-            for parent in parents:
-                parent_id = parent["url_id"]
-                parent_norm = parent["normalized_url"]
-                child_cur = conn.execute(
-                    """
-                    SELECT normalized_url
-                    FROM urls
-                    WHERE parent_url_id = ?
-                    ORDER BY created_at
-                    """,
-                    (parent_id,)
-                )
-                children_rows = child_cur.fetchall()
-                result[parent_norm] = [row["normalized_url"] for row in children_rows]
-        return result
+            cur.row_factory = None
+            for parent_norm, rows in groupby(cur, key=itemgetter(0)):
+                yield parent_norm, [child_norm for _, child_norm in rows if child_norm is not None]
 
     def has_active_urls(self) -> bool:
-        with self._connect() as conn:
+        with self._read() as conn:
             cur = conn.execute(
                 """
-                SELECT COUNT(1) AS cnt
-                FROM urls
+                SELECT COALESCE(SUM(url_count), 0) AS cnt
+                FROM url_status_counts
                 WHERE status IN (?, ?)
                 """,
-                (UrlStatusType.PENDING.value, UrlStatusType.IN_PROGRESS.value),
+                (UrlStatusType.PENDING.code, UrlStatusType.IN_PROGRESS.code),
             )
             row = cur.fetchone()
-            return bool(row and row.get("cnt", 0) > 0)
-
+            return bool(row and row["cnt"] > 0)
@@ -0,0 +1,131 @@
+"""
+Schema migration:
+    Converts a database written by an older version, which stored URLs as text, to the compact schema.
+
+`DatabaseManager` converts an old database when it opens it, in one transaction, keeping every URL's id. Run this
+module to convert a database ahead of a crawl; it also rewrites the file without the pages freed by the old table,
+which the conversion alone does not give back:
+
+    PYTHONPATH=src python -m webcrawler_arnoldkyeza.core.datastore.schema_migration crawler.sqlite
+"""
+import argparse
+import datetime
+import logging
+import sqlite3
+import sys
+from pathlib import Path
+from typing import Optional
+
+from webcrawler_arnoldkyeza.core.crawler_logging import setup_logging
+from webcrawler_arnoldkyeza.core.datastore.schemas import create_tables, legacy_url_table_added_columns
+from webcrawler_arnoldkyeza.core.enums.url_status_type import UrlStatusType
+from webcrawler_arnoldkyeza.core.utils import calculate_digest, split_origin, to_epoch
+
+logger = logging.getLogger(__name__)
+
+LEGACY_TABLE = "legacy_urls"
+
+
+def is_legacy_database(conn: sqlite3.Connection) -> bool:
+    """Whether the database holds a URL table in the old text layout."""
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(urls)").fetchall()}
+    return "normalized_url" in columns
+
+
+def convert_legacy_database(conn: sqlite3.Connection) -> int:
+    """
+    Rewrite the old URL table into the host and compact URL tables; returns the number of URLs converted.
+    Must run inside a transaction, so that a failure leaves the old table as it was.
+    """
+    existing_columns = {row[1] for row in conn.execute("PRAGMA table_info(urls)").fetchall()}
+    for column, statement in legacy_url_table_added_columns().items():
+        if column not in existing_columns:
+            conn.execute(statement)
+
+    conn.execute(f"ALTER TABLE urls RENAME TO {LEGACY_TABLE}")
+    # the old indexes follow the table; dropping them frees their names for the new ones
+    legacy_indexes = conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL",
+        (LEGACY_TABLE,),
+    ).fetchall()
+    for (index,) in legacy_indexes:
+        conn.execute(f"DROP INDEX {index}")
+    # counted by text status; recounted by code once the URLs are converted
+    conn.execute("DROP TABLE IF EXISTS url_status_counts")
+
+    for statement in create_tables():
+        conn.execute(statement)
+
+    conn.create_function("url_origin", 1, lambda url: split_origin(url)[0], deterministic=True)
+    conn.create_function("url_path", 1, lambda url: split_origin(url)[1], deterministic=True)
+    conn.create_function("url_key", 1, calculate_digest, deterministic=True)
+    conn.create_function("status_code", 1, lambda status: UrlStatusType(status).code, deterministic=True)
+    conn.create_function("local_epoch", 1, _local_epoch, deterministic=True)
+
+    conn.execute(f"INSERT OR IGNORE INTO hosts (origin) SELECT DISTINCT url_origin(normalized_url) FROM {LEGACY_TABLE}")
+    cur = conn.execute(
+        f"""
+        INSERT INTO urls (url_id, url_key, host_id, path, url, priority, update_frequency, last_crawled_at, status,
+                          parent_url_id, error_message, depth, created_at, etag, last_modified, attempts, lastmod,
+                          sitemap_priority)
+        SELECT legacy.url_id,
+               url_key(legacy.normalized_url),
+               hosts.host_id,
+               url_path(legacy.normalized_url),
+               NULLIF(legacy.url, legacy.normalized_url),
+               legacy.priority,
+               legacy.update_frequency,
+               local_epoch(legacy.last_crawled_at),
+               status_code(legacy.status),
+               legacy.parent_url_id,
+               legacy.error_message,
+               legacy.depth,
+               COALESCE(CAST(STRFTIME('%s', legacy.created_at) AS INTEGER), CAST(STRFTIME('%s', 'now') AS INTEGER)),
+               legacy.etag,
+               legacy.last_modified,
+               legacy.attempts,
+               legacy.lastmod,
+               legacy.sitemap_priority
+        FROM {LEGACY_TABLE} AS legacy
+        JOIN hosts ON hosts.origin = url_origin(legacy.normalized_url)
+        ORDER BY legacy.url_id
+        """
+    )
+    converted = cur.rowcount
+    conn.execute(f"DROP TABLE {LEGACY_TABLE}")
+    return converted
+
+
+def _local_epoch(moment: Optional[str]) -> Optional[int]:
+    # written with `datetime.isoformat()` from the crawler's local `datetime.now()`
+    return to_epoch(datetime.datetime.fromisoformat(moment)) if moment else None
+
+
+def main(argv: list[str]) -> None:
+    parser = argparse.ArgumentParser(description="Convert a crawl database to the compact schema")
+    parser.add_argument("database", type=Path, help="Path of the SQLite database to convert in place")
+    args = parser.parse_args(argv)
+    setup_logging("INFO")
+
+    if not args.database.exists():
+        logger.error(f"No database at {args.database}")
+        sys.exit(1)
+
+    # imported here: the manager itself converts old databases with this module
+    from webcrawler_arnoldkyeza.core.datastore.database_manager import DatabaseManager
+
+    size_before = args.database.stat().st_size
+    DatabaseManager(args.database).close()
+    conn = sqlite3.connect(args.database)
+    try:
+        conn.execute("VACUUM")
+        # in WAL mode the rewritten pages only reach the file, and the file only shrinks, at a checkpoint
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    finally:
+        conn.close()
+    size_after = args.database.stat().st_size
+    logger.info(f"{args.database}: {size_before / 2 ** 20:.1f} MiB -> {size_after / 2 ** 20:.1f} MiB")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -1,36 +1,128 @@
-def create_url_table() -> str:
+from webcrawler_arnoldkyeza.core.enums.url_status_type import UrlStatusType
+
+
+def create_host_table() -> str:
+    """
+    Every origin (scheme and authority, e.g. https://example.com) stored once, so that a URL row only holds its
+    integer id.
+    """
     return """
+           CREATE TABLE IF NOT EXISTS hosts
+           (
+               host_id INTEGER PRIMARY KEY,
+               origin  TEXT    NOT NULL UNIQUE
+           )
+           """
+
+
+def create_url_table() -> str:
+    """
+    URLs in compact form. A URL is found by `url_key`, the 16-byte digest of its normalized URL, and stored as its
+    host's id and the path and query relative to that host. `url` is only stored when the URL as found differs from
+    the normalized one. Timestamps are seconds since the epoch and `status` is the status' `code`.
+    `update_frequency` is the number of days after its last crawl that a URL is due for a recrawl.
+    """
+    return f"""
            CREATE TABLE IF NOT EXISTS urls
            (
                url_id           INTEGER PRIMARY KEY AUTOINCREMENT,
-               url              TEXT    NOT NULL,
-               normalized_url   TEXT    NOT NULL UNIQUE,
+               url_key          BLOB    NOT NULL UNIQUE,
+               host_id          INTEGER NOT NULL,
+               path             TEXT    NOT NULL,
+               url              TEXT    NULL,
                priority         INTEGER NOT NULL,
                update_frequency INTEGER NOT NULL,
-               last_crawled_at  TEXT    NULL,
-               status           TEXT    NOT NULL DEFAULT 'pending',
+               last_crawled_at  INTEGER NULL,
+               status           INTEGER NOT NULL DEFAULT {UrlStatusType.PENDING.code},
                parent_url_id    INTEGER NULL,
                error_message    TEXT    NULL,
                depth            INTEGER NOT NULL DEFAULT 0,
-               created_at       TEXT    NOT NULL DEFAULT (DATETIME('now'))
-           );
+               created_at       INTEGER NOT NULL DEFAULT (CAST(STRFTIME('%s', 'now') AS INTEGER)),
+               etag             TEXT    NULL,
+               last_modified    TEXT    NULL,
+               attempts         INTEGER NOT NULL DEFAULT 0,
+               lastmod          TEXT    NULL,
+               sitemap_priority REAL    NULL
+           )
            """
 
 
-def create_tables() -> str:
+def legacy_url_table_added_columns() -> dict[str, str]:
+    """
+    Columns added to the legacy (text) URL table after its first release, keyed by name, so that databases created
+    by an older version can be brought up to date with `ALTER TABLE ... ADD COLUMN` before they are converted.
+    """
+    return {
+        "etag": "ALTER TABLE urls ADD COLUMN etag TEXT NULL",
+        "last_modified": "ALTER TABLE urls ADD COLUMN last_modified TEXT NULL",
+        "attempts": "ALTER TABLE urls ADD COLUMN attempts INTEGER NOT NULL DEFAULT 0",
+        "lastmod": "ALTER TABLE urls ADD COLUMN lastmod TEXT NULL",
+        "sitemap_priority": "ALTER TABLE urls ADD COLUMN sitemap_priority REAL NULL",
+    }
+
+
+def create_url_indexes() -> list[str]:
     """
-    Create the URL table schema.
+    Indexes serving the frontier's queries. The partial indexes only hold the rows still pending or in progress, so
+    they stay small however many URLs have been crawled, and the queries filtering on those statuses never scan the
+    table.
     """
+    pending = UrlStatusType.PENDING.code
+    in_progress = UrlStatusType.IN_PROGRESS.code
+    return [
+        "CREATE INDEX IF NOT EXISTS idx_urls_parent_url_id ON urls (parent_url_id)",
+        f"CREATE INDEX IF NOT EXISTS idx_urls_pending_priority ON urls (priority, created_at) WHERE status = {pending}",
+        f"CREATE INDEX IF NOT EXISTS idx_urls_pending ON urls (url_id) WHERE status = {pending}",
+        f"CREATE INDEX IF NOT EXISTS idx_urls_in_progress ON urls (url_id) WHERE status = {in_progress}",
+    ]
 
-    schema = f"""
-    PRAGMA journal_mode = WAL;
-    PRAGMA foreign_keys = ON;
-    
-    {create_url_table()}
-    
-    CREATE INDEX IF NOT EXISTS idx_urls_url_id ON urls (url_id);
-    CREATE INDEX IF NOT EXISTS idx_urls_normalized_url ON urls (normalized_url);
-    CREATE INDEX IF NOT EXISTS idx_urls_parent_url_id ON urls (parent_url_id);
+
+def status_count_statements() -> list[str]:
+    """
+    The number of URLs in each status, kept up to date by triggers so that the crawler can tell whether work is
+    left by reading two rows instead of counting the table. Run in order, in one transaction, on a database that
+    does not have the table yet: the last statement counts the URLs already stored.
     """
+    return [
+        """
+        CREATE TABLE url_status_counts
+        (
+            status    INTEGER NOT NULL PRIMARY KEY,
+            url_count INTEGER NOT NULL
+        ) WITHOUT ROWID
+        """,
+        """
+        CREATE TRIGGER url_status_count_insert AFTER INSERT ON urls
+        BEGIN
+            INSERT INTO url_status_counts (status, url_count) VALUES (NEW.status, 1)
+            ON CONFLICT (status) DO UPDATE SET url_count = url_count + 1;
+        END
+        """,
+        """
+        CREATE TRIGGER url_status_count_update AFTER UPDATE OF status ON urls
+        WHEN OLD.status IS NOT NEW.status
+        BEGIN
+            UPDATE url_status_counts SET url_count = url_count - 1 WHERE status = OLD.status;
+            INSERT INTO url_status_counts (status, url_count) VALUES (NEW.status, 1)
+            ON CONFLICT (status) DO UPDATE SET url_count = url_count + 1;
+        END
+        """,
+        """
+        CREATE TRIGGER url_status_count_delete AFTER DELETE ON urls
+        BEGIN
+            UPDATE url_status_counts SET url_count = url_count - 1 WHERE status = OLD.status;
+        END
+        """,
+        """
+        INSERT INTO url_status_counts (status, url_count)
+        SELECT status, COUNT(1) FROM urls GROUP BY status
+        """,
+    ]
+
 
-    return schema
+def create_tables() -> list[str]:
+    """
+    Create the host and URL tables and their indexes, statement by statement so that they can run in a
+    transaction.
+    """
+    return [create_host_table(), create_url_table(), *create_url_indexes()]
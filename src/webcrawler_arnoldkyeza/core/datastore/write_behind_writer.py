@@ -0,0 +1,136 @@
+import asyncio
+import functools
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Callable, List, Optional, Tuple
+
+from webcrawler_arnoldkyeza.core.datastore.database_manager import DatabaseManager
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _Write:
+    call: Optional[Callable[[], Any]]  # None for a flush barrier
+    future: Optional[asyncio.Future]  # None when nobody waits for the outcome
+
+    @property
+    def is_barrier(self) -> bool:
+        return self.call is None
+
+
+@dataclass
+class WriteBehindWriter:
+    """
+    Single writer applying the workers' database writes off the event loop.
+
+    Writes are queued, up to `max_pending` of them, and a single task applies them in a thread, many per
+    transaction: a batch is written once it holds `batch_size` writes or `flush_interval` seconds after its first
+    write, whether or not someone waits for its writes, so the workers waiting within an interval share a commit.
+    Writes queued while a batch is on disk join the next one. SQLite only ever sees one writer, and a slow disk
+    holds up the writer task instead of every worker.
+
+    `flush()` waits until every write queued so far is stored, `close()` flushes and stops the writer.
+    """
+    database_manager: DatabaseManager
+    batch_size: int = field(default=500)
+    flush_interval: float = field(default=0.005)
+    max_pending: int = field(default=10_000)
+    batches_written: int = field(default=0, init=False)
+    writes_applied: int = field(default=0, init=False)
+    _queue: Optional[asyncio.Queue] = field(default=None, init=False, repr=False)
+    _task: Optional[asyncio.Task] = field(default=None, init=False, repr=False)
+
+    def start(self) -> None:
+        self._queue = asyncio.Queue(maxsize=self.max_pending)
+        self._task = asyncio.create_task(self._run())
+
+    async def write(self, call: Callable[..., Any], *args, **kwargs) -> Any:
+        """Queue `call(*args, **kwargs)` and return its result once it is stored."""
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put(_Write(functools.partial(call, *args, **kwargs), future))
+        return await future
+
+    async def write_later(self, call: Callable[..., Any], *args, **kwargs) -> None:
+        """Queue `call(*args, **kwargs)` without waiting for it; a failure is logged."""
+        await self._queue.put(_Write(functools.partial(call, *args, **kwargs), None))
+
+    async def flush(self) -> None:
+        if self._queue is not None:
+            # the barrier closes the batch being collected instead of letting it wait for the interval
+            await self._queue.put(_Write(None, None))
+            await self._queue.join()
+
+    async def close(self) -> None:
+        if self._task is None:
+            return
+        await self.flush()
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._next_batch()
+            try:
+                outcomes = await asyncio.to_thread(self._apply, batch)
+            except Exception as e:
+                outcomes = [(None, e)] * len(batch)
+            for write, (result, error) in zip(batch, outcomes):
+                self._settle(write, result, error)
+                self._queue.task_done()
+            writes = sum(write.call is not None for write in batch)
+            if writes:
+                self.batches_written += 1
+                self.writes_applied += writes
+
+    async def _next_batch(self) -> List[_Write]:
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self.flush_interval
+        while len(batch) < self.batch_size and not batch[-1].is_barrier:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+        # whatever is already waiting rides along for free
+        while len(batch) < self.batch_size and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        return batch
+
+    def _apply(self, batch: List[_Write]) -> List[Tuple[Any, Optional[Exception]]]:
+        try:
+            with self.database_manager.transaction():
+                return [(self._call(write), None) for write in batch]
+        except Exception:
+            # the transaction was rolled back: apply the writes one by one so that a bad one only fails itself
+            pass
+
+        outcomes: List[Tuple[Any, Optional[Exception]]] = []
+        for write in batch:
+            try:
+                with self.database_manager.transaction():
+                    outcomes.append((self._call(write), None))
+            except Exception as e:
+                outcomes.append((None, e))
+        return outcomes
+
+    @staticmethod
+    def _call(write: _Write) -> Any:
+        return write.call() if write.call is not None else None
+
+    @staticmethod
+    def _settle(write: _Write, result: Any, error: Optional[Exception]) -> None:
+        if write.future is None:
+            if error is not None:
+                logger.error(f"Deferred database write failed: {error}")
+            return
+        if write.future.done():  # the waiting worker was cancelled
+            return
+        if error is not None:
+            write.future.set_exception(error)
+        else:
+            write.future.set_result(result)
@@ -0,0 +1,28 @@
+from abc import ABC, abstractmethod
+from typing import List
+
+
+class AbstractDedupBackend(ABC):
+    """
+    Named sets of digests, the storage behind `DuplicateEliminator`. Adding a member and learning whether it was
+    new is a single atomic step, so that two workers can never both claim the same URL.
+    """
+
+    @classmethod
+    @abstractmethod
+    def from_urls(cls, urls: List[str]) -> "AbstractDedupBackend":
+        """Build the backend from the server URLs given on the command line; in-process backends ignore them."""
+
+    @abstractmethod
+    def add_many(self, key: str, members: List[bytes]) -> List[bool]:
+        """Add the members to the set `key`; for each one, True when it was not in the set before."""
+
+    def add(self, key: str, member: bytes) -> bool:
+        return self.add_many(key, [member])[0]
+
+    def update(self, key: str, members: List[bytes]) -> None:
+        """Add the members without reporting which ones were new, for bulk loads."""
+        self.add_many(key, members)
+
+    def close(self) -> None:
+        pass
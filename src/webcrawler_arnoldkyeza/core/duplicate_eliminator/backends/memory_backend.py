@@ -0,0 +1,26 @@
+from dataclasses import dataclass, field
+from typing import Dict, List, Set
+
+from webcrawler_arnoldkyeza.core.duplicate_eliminator.backends.dedup_backend import AbstractDedupBackend
+
+
+@dataclass
+class MemoryDedupBackend(AbstractDedupBackend):
+    """Plain Python sets, for a crawl running in a single process."""
+    sets: Dict[str, Set[bytes]] = field(default_factory=dict)
+
+    @classmethod
+    def from_urls(cls, urls: List[str]) -> "MemoryDedupBackend":
+        return cls()
+
+    def add(self, key: str, member: bytes) -> bool:
+        members = self.sets.setdefault(key, set())
+        size = len(members)
+        members.add(member)
+        return len(members) != size
+
+    def add_many(self, key: str, members: List[bytes]) -> List[bool]:
+        return [self.add(key, member) for member in members]
+
+    def update(self, key: str, members: List[bytes]) -> None:
+        self.sets.setdefault(key, set()).update(members)
@@ -0,0 +1,52 @@
+from dataclasses import dataclass, field
+from typing import List
+
+import fakeredis
+import redis
+
+from webcrawler_arnoldkyeza.core.duplicate_eliminator.backends.dedup_backend import AbstractDedupBackend
+
+DEFAULT_REDIS_URL = "redis://localhost:6379/0"
+# members per SADD of a bulk load, which keeps a single command from blocking the server for long
+UPDATE_CHUNK_SIZE = 100_000
+
+
+@dataclass
+class RedisDedupBackend(AbstractDedupBackend):
+    """
+    Redis sets. The reply of SADD tells whether the member was added, so checking and remembering a member is one
+    atomic command, and the members of a page go out in one pipelined round-trip.
+    """
+    client: redis.Redis
+
+    @classmethod
+    def from_urls(cls, urls: List[str]) -> "RedisDedupBackend":
+        return cls(client=redis.Redis.from_url(urls[0] if urls else DEFAULT_REDIS_URL))
+
+    def add(self, key: str, member: bytes) -> bool:
+        return bool(self.client.sadd(key, member))
+
+    def add_many(self, key: str, members: List[bytes]) -> List[bool]:
+        if not members:
+            return []
+        pipeline = self.client.pipeline(transaction=False)
+        for member in members:
+            pipeline.sadd(key, member)
+        return [bool(added) for added in pipeline.execute()]
+
+    def update(self, key: str, members: List[bytes]) -> None:
+        for offset in range(0, len(members), UPDATE_CHUNK_SIZE):
+            self.client.sadd(key, *members[offset:offset + UPDATE_CHUNK_SIZE])
+
+    def close(self) -> None:
+        self.client.close()
+
+
+@dataclass
+class FakeRedisDedupBackend(RedisDedupBackend):
+    """`RedisDedupBackend` on an in-process fakeredis server, which needs no Redis to be running."""
+    client: redis.Redis = field(default_factory=fakeredis.FakeStrictRedis)
+
+    @classmethod
+    def from_urls(cls, urls: List[str]) -> "FakeRedisDedupBackend":
+        return cls()
@@ -0,0 +1,77 @@
+import bisect
+import hashlib
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+
+import redis
+
+from webcrawler_arnoldkyeza.core.duplicate_eliminator.backends.dedup_backend import AbstractDedupBackend
+from webcrawler_arnoldkyeza.core.duplicate_eliminator.backends.redis_backend import RedisDedupBackend
+
+# points per node on the hash ring; more points spread the members more evenly across the nodes
+VIRTUAL_NODES = 160
+
+
+@dataclass
+class ShardedRedisDedupBackend(AbstractDedupBackend):
+    """
+    Redis sets spread over several Redis servers with consistent hashing, for crawls running on several machines.
+
+    Each node is placed on a 64-bit hash ring at `VIRTUAL_NODES` points derived from its name, and a member belongs
+    to the node owning the next point clockwise. Members are digests, so their first 8 bytes already are a uniform
+    ring position. Adding or removing a node only moves the members between it and its ring neighbours. A batch is
+    split by node and costs one pipelined round-trip per node it touches.
+    """
+    nodes: Dict[str, RedisDedupBackend]
+    _points: List[int] = field(default_factory=list, init=False, repr=False)
+    _owners: List[str] = field(default_factory=list, init=False, repr=False)
+
+    def __post_init__(self):
+        if not self.nodes:
+            raise ValueError("Sharded Redis backend needs at least one node")
+
+        ring: List[Tuple[int, str]] = []
+        for name in self.nodes:
+            for replica in range(VIRTUAL_NODES):
+                digest = hashlib.blake2b(f"{name}#{replica}".encode("utf-8"), digest_size=8).digest()
+                ring.append((int.from_bytes(digest, "big"), name))
+        ring.sort()
+        self._points = [point for point, _ in ring]
+        self._owners = [name for _, name in ring]
+
+    @classmethod
+    def from_urls(cls, urls: List[str]) -> "ShardedRedisDedupBackend":
+        if not urls:
+            raise ValueError("Sharded Redis backend needs at least one --redis-url")
+        return cls(nodes={url: RedisDedupBackend(client=redis.Redis.from_url(url)) for url in urls})
+
+    def node_for(self, member: bytes) -> str:
+        """Name of the node owning the member."""
+        index = bisect.bisect_left(self._points, int.from_bytes(member[:8], "big"))
+        return self._owners[index % len(self._owners)]
+
+    def add(self, key: str, member: bytes) -> bool:
+        return self.nodes[self.node_for(member)].add(key, member)
+
+    def add_many(self, key: str, members: List[bytes]) -> List[bool]:
+        positions: Dict[str, List[int]] = {}
+        for position, member in enumerate(members):
+            positions.setdefault(self.node_for(member), []).append(position)
+
+        added = [False] * len(members)
+        for name, node_positions in positions.items():
+            replies = self.nodes[name].add_many(key, [members[position] for position in node_positions])
+            for position, was_added in zip(node_positions, replies):
+                added[position] = was_added
+        return added
+
+    def update(self, key: str, members: List[bytes]) -> None:
+        batches: Dict[str, List[bytes]] = {}
+        for member in members:
+            batches.setdefault(self.node_for(member), []).append(member)
+        for name, batch in batches.items():
+            self.nodes[name].update(key, batch)
+
+    def close(self) -> None:
+        for node in self.nodes.values():
+            node.close()
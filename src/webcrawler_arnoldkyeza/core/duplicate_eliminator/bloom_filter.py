@@ -0,0 +1,190 @@
+"""
+Bloom filter:
+    Scalable Bloom filter used as a compact "seen URL" set.
+
+A Bloom filter answers "was this key added?" with no false negatives and a bounded false-positive rate, using about
+1.2 bytes per key at 1%. A scalable filter chains slices of doubling capacity and halving error rate, so it does not
+need to know the number of URLs up front and its overall false-positive rate stays below `error_rate`.
+
+Layout (identical in memory and on disk, integers little-endian):
+    - header: magic, format version, error rate, initial capacity and number of slices
+    - slices, one after the other: capacity, size of the bit array in bits, number of hash functions, number of
+      keys added, then the bit array padded to 8 bytes
+
+When the filter has a path, the file is memory-mapped and updated in place: it survives the process and can be
+reopened by the next crawl. Without a path the same bytes live in a bytearray.
+"""
+import math
+import mmap
+import struct
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Optional, Union
+
+from webcrawler_arnoldkyeza.core.utils import calculate_digest
+
+MAGIC = b"SBF1"
+_HEADER = struct.Struct("<4sIdQI4x")
+_SLICE_HEADER = struct.Struct("<QQI4xQ")
+GROWTH_FACTOR = 2
+TIGHTENING_RATIO = 0.5
+
+
+class BloomFilterFormatError(Exception):
+    def __init__(self, path: Path, message: str):
+        super().__init__(f"Invalid Bloom filter file {path}: {message}")
+
+
+@dataclass
+class _Slice:
+    offset: int  # of the slice header
+    capacity: int
+    bit_count: int
+    hash_count: int
+    count: int
+
+    @property
+    def bits_offset(self) -> int:
+        return self.offset + _SLICE_HEADER.size
+
+    @property
+    def end(self) -> int:
+        return self.bits_offset + (self.bit_count + 63) // 64 * 8
+
+
+@dataclass
+class ScalableBloomFilter:
+    initial_capacity: int = field(default=1_000_000)
+    error_rate: float = field(default=0.01)
+    path: Optional[Path] = field(default=None)
+    _data: Union[bytearray, mmap.mmap] = field(default_factory=bytearray, init=False, repr=False)
+    _slices: List[_Slice] = field(default_factory=list, init=False, repr=False)
+
+    def __post_init__(self):
+        if not 0 < self.error_rate < 1:
+            raise ValueError("Bloom filter error rate must be between 0 and 1")
+        if self.initial_capacity < 1:
+            raise ValueError("Bloom filter capacity must be positive")
+
+        if self.path is not None and Path(self.path).exists() and Path(self.path).stat().st_size > 0:
+            self._open(Path(self.path))
+            return
+
+        self._data = bytearray(_HEADER.pack(MAGIC, 1, self.error_rate, self.initial_capacity, 0))
+        if self.path is not None:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            Path(self.path).write_bytes(self._data)
+            self._map(Path(self.path))
+        self._add_slice()
+
+    def __len__(self) -> int:
+        return sum(bloom_slice.count for bloom_slice in self._slices)
+
+    def __contains__(self, key: str) -> bool:
+        h1, h2 = self._hashes(key)
+        return any(self._has_bits(bloom_slice, h1, h2) for bloom_slice in self._slices)
+
+    @property
+    def size_in_bytes(self) -> int:
+        return len(self._data)
+
+    def add(self, key: str) -> bool:
+        """Add the key; True when it was certainly not there before, False when it (probably) was."""
+        h1, h2 = self._hashes(key)
+        if any(self._has_bits(bloom_slice, h1, h2) for bloom_slice in self._slices):
+            return False
+
+        bloom_slice = self._slices[-1]
+        if bloom_slice.count >= bloom_slice.capacity:
+            bloom_slice = self._add_slice()
+
+        data = self._data
+        base = bloom_slice.bits_offset
+        for i in range(bloom_slice.hash_count):
+            bit = (h1 + i * h2) % bloom_slice.bit_count
+            data[base + (bit >> 3)] |= 1 << (bit & 7)
+        bloom_slice.count += 1
+        _SLICE_HEADER.pack_into(data, bloom_slice.offset, bloom_slice.capacity, bloom_slice.bit_count,
+                                bloom_slice.hash_count, bloom_slice.count)
+        return True
+
+    def flush(self) -> None:
+        if isinstance(self._data, mmap.mmap):
+            self._data.flush()
+
+    def close(self) -> None:
+        """Write a memory-mapped filter back to its file and release it; the filter cannot be used afterwards."""
+        if isinstance(self._data, mmap.mmap) and not self._data.closed:
+            self._data.flush()
+            self._data.close()
+
+    @staticmethod
+    def _hashes(key: str):
+        digest = calculate_digest(key)
+        # double hashing: the k bit positions are h1 + i * h2, with an odd h2 so that they all differ
+        return int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+
+    def _has_bits(self, bloom_slice: _Slice, h1: int, h2: int) -> bool:
+        data = self._data
+        base = bloom_slice.bits_offset
+        for i in range(bloom_slice.hash_count):
+            bit = (h1 + i * h2) % bloom_slice.bit_count
+            if not data[base + (bit >> 3)] & (1 << (bit & 7)):
+                return False
+        return True
+
+    def _add_slice(self) -> _Slice:
+        index = len(self._slices)
+        capacity = self.initial_capacity * GROWTH_FACTOR ** index
+        # the slices' error rates form a geometric series that sums to at most `error_rate`
+        error_rate = self.error_rate * (1 - TIGHTENING_RATIO) * TIGHTENING_RATIO ** index
+        bit_count = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        hash_count = max(1, round(-math.log2(error_rate)))
+
+        offset = self._slices[-1].end if self._slices else _HEADER.size
+        bloom_slice = _Slice(offset=offset, capacity=capacity, bit_count=bit_count, hash_count=hash_count, count=0)
+        self._resize(bloom_slice.end)
+        _SLICE_HEADER.pack_into(self._data, offset, capacity, bit_count, hash_count, 0)
+        self._slices.append(bloom_slice)
+        _HEADER.pack_into(self._data, 0, MAGIC, 1, self.error_rate, self.initial_capacity, len(self._slices))
+        return bloom_slice
+
+    def _resize(self, size: int) -> None:
+        if isinstance(self._data, bytearray):
+            self._data.extend(bytes(size - len(self._data)))
+            return
+        self._data.flush()
+        self._data.close()
+        with open(self.path, "r+b") as file:
+            file.truncate(size)
+        self._map(Path(self.path))
+
+    def _map(self, path: Path) -> None:
+        with open(path, "r+b") as file:
+            self._data = mmap.mmap(file.fileno(), 0)
+
+    def _open(self, path: Path) -> None:
+        self._map(path)
+        data = self._data
+        if len(data) < _HEADER.size:
+            raise BloomFilterFormatError(path, "truncated header")
+        magic, version, error_rate, initial_capacity, slice_count = _HEADER.unpack_from(data, 0)
+        if magic != MAGIC or version != 1:
+            raise BloomFilterFormatError(path, "not a Bloom filter file")
+        # the file's parameters win, otherwise the slices would not line up with the ones already written
+        self.error_rate = error_rate
+        self.initial_capacity = initial_capacity
+
+        offset = _HEADER.size
+        for _ in range(slice_count):
+            if offset + _SLICE_HEADER.size > len(data):
+                raise BloomFilterFormatError(path, "truncated slice")
+            capacity, bit_count, hash_count, count = _SLICE_HEADER.unpack_from(data, offset)
+            bloom_slice = _Slice(offset=offset, capacity=capacity, bit_count=bit_count, hash_count=hash_count,
+                                 count=count)
+            if bloom_slice.end > len(data):
+                raise BloomFilterFormatError(path, "truncated slice")
+            self._slices.append(bloom_slice)
+            offset = bloom_slice.end
+        if not self._slices:
+            self._add_slice()
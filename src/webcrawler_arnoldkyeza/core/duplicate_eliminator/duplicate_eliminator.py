@@ -1,42 +1,153 @@
 from dataclasses import dataclass, field
-from typing import List
-
-import fakeredis
+from typing import Dict, Iterable, List, Optional, Set, Type
 
+from webcrawler_arnoldkyeza.core.datastore.database_manager import DatabaseManager
+from webcrawler_arnoldkyeza.core.duplicate_eliminator.backends.dedup_backend import AbstractDedupBackend
+from webcrawler_arnoldkyeza.core.duplicate_eliminator.backends.memory_backend import MemoryDedupBackend
+from webcrawler_arnoldkyeza.core.duplicate_eliminator.backends.redis_backend import (
+    FakeRedisDedupBackend,
+    RedisDedupBackend,
+)
+from webcrawler_arnoldkyeza.core.duplicate_eliminator.backends.sharded_redis_backend import ShardedRedisDedupBackend
+from webcrawler_arnoldkyeza.core.duplicate_eliminator.bloom_filter import ScalableBloomFilter
+from webcrawler_arnoldkyeza.core.duplicate_eliminator.simhash import SimHashIndex, simhash
 from webcrawler_arnoldkyeza.core.scheduler.models.url import Url
-from webcrawler_arnoldkyeza.core.utils import normalize_url, calculate_text_checksum
+from webcrawler_arnoldkyeza.core.url_normalizer import UrlNormalizer
+from webcrawler_arnoldkyeza.core.utils import calculate_digest
+
+DEDUP_BACKENDS: Dict[str, Type[AbstractDedupBackend]] = {
+    "memory": MemoryDedupBackend,
+    "fakeredis": FakeRedisDedupBackend,
+    "redis": RedisDedupBackend,
+    "sharded-redis": ShardedRedisDedupBackend,
+}
 
 
 @dataclass
 class DuplicateEliminator:
-    redis: fakeredis.FakeStrictRedis
-    _redis_url_set_key: str = field(default="crawler:visited_urls", init=False)
-    _redis_content_set_key: str = field(default="crawler:seen_content", init=False)
+    """
+    Remembers the URLs and page texts seen so far.
+
+    Seen URLs and page texts are kept as 16-byte digests in the sets of `backend`, one of the `DEDUP_BACKENDS`.
+    When `url_filter` is given, seen URLs are kept in a Bloom filter instead, taking about two bytes per URL. The
+    filter never misses a URL it has seen but may claim to have seen a new one, so its hits are confirmed against
+    the urls table of `database_manager` when there is one. A URL first seen by this run may not be in that table
+    yet: until `mark_urls_decided` reports it stored or dropped by the scheduler, its digest is held in memory and a
+    hit on it is a duplicate. Only the links of the pages being processed are held.
+    """
+    backend: AbstractDedupBackend
+    url_normalizer: UrlNormalizer = field(default_factory=UrlNormalizer)
+    near_duplicates: Optional[SimHashIndex] = field(default=None)
+    url_filter: Optional[ScalableBloomFilter] = field(default=None)
+    database_manager: Optional[DatabaseManager] = field(default=None)
+    _url_set_key: str = field(default="crawler:visited_urls", init=False)
+    _content_set_key: str = field(default="crawler:seen_content", init=False)
+    _unstored_urls: Set[bytes] = field(default_factory=set, init=False)
 
-    def _is_duplicate(self, checksum: str, key: str) -> bool:
-        is_duplicate =  bool(self.redis.sismember(key, checksum))
-        if not is_duplicate:
-            self.redis.sadd(key, checksum)
+    @classmethod
+    def for_backend(cls, name: str, urls: Optional[List[str]] = None, **kwargs) -> "DuplicateEliminator":
+        """Build a duplicate eliminator on one of the `DEDUP_BACKENDS`, reached at `urls` if it is a server."""
+        try:
+            backend_type = DEDUP_BACKENDS[name]
+        except KeyError:
+            raise ValueError(f"Unknown dedup backend: {name}")
+        return cls(backend=backend_type.from_urls(urls or []), **kwargs)
 
-        return is_duplicate
+    def _is_duplicate(self, digest: bytes, key: str) -> bool:
+        return not self.backend.add(key, digest)
 
     def is_duplicate_url(self, normalized_url) -> bool:
-        url_checksum = calculate_text_checksum(normalized_url)
-        return self._is_duplicate(url_checksum, self._redis_url_set_key)
+        if self.url_filter is not None:
+            return self._is_duplicate_in_filter(normalized_url)
+        return self._is_duplicate(calculate_digest(normalized_url), self._url_set_key)
+
+    def are_duplicate_urls(self, normalized_urls: List[str]) -> List[bool]:
+        """
+        `is_duplicate_url` for a whole list, in one pipelined round-trip per Redis server. A URL repeated in the list
+        is a duplicate from its second occurrence on.
+        """
+        if self.url_filter is not None:
+            return [self._is_duplicate_in_filter(normalized_url) for normalized_url in normalized_urls]
+        digests = [calculate_digest(normalized_url) for normalized_url in normalized_urls]
+        return [not added for added in self.backend.add_many(self._url_set_key, digests)]
+
+    def _is_duplicate_in_filter(self, normalized_url: str) -> bool:
+        if self.database_manager is None:
+            return not self.url_filter.add(normalized_url)
+
+        digest = calculate_digest(normalized_url)
+        if self.url_filter.add(normalized_url):
+            self._unstored_urls.add(digest)
+            return False
+        if digest in self._unstored_urls:
+            return True
+        # a possible false positive: the unique URL key in the database has the final word
+        return self.database_manager.url_exists(normalized_url)
+
+    def mark_urls_decided(self, normalized_urls: Iterable[str]) -> None:
+        """
+        Stop holding URLs this run has seen once the scheduler has stored them or dropped them; a later filter hit on
+        one of them is confirmed against the urls table.
+        """
+        if self.url_filter is None or not self._unstored_urls:
+            return
+        for normalized_url in normalized_urls:
+            self._unstored_urls.discard(calculate_digest(normalized_url))
 
     def is_duplicate_content(self, content: str) -> bool:
-        content_checksum = calculate_text_checksum(content)
-        return self._is_duplicate(content_checksum, self._redis_content_set_key)
-
-    def filter_extracted_urls(self, extracted_urls: List[str], parent_url_id: int, depth: int)  -> List[Url]:
-        filtered_urls: List[Url] = []
-        for url in extracted_urls:
-            normalized_url = normalize_url(url)
-            if normalized_url is None:
-                continue
-            if self.is_duplicate_url(normalized_url):
+        return self._is_duplicate(calculate_digest(content), self._content_set_key)
+
+    def is_near_duplicate_content(self, content: str) -> bool:
+        """
+        Whether the text is within the SimHash threshold of a page seen before; new text is remembered.
+        Always False when no near-duplicate index is configured.
+        """
+        if self.near_duplicates is None:
+            return False
+        fingerprint = simhash(content)
+        if fingerprint is None:
+            return False
+        return not self.near_duplicates.add_if_new(fingerprint)
+
+    def restore_seen_urls(self, batches: Iterable[List[str]]) -> int:
+        """
+        Mark stored URLs as seen, e.g. the urls table of an earlier run, so that a resumed crawl does not discover
+        them again. Each batch is a single bulk add. Returns the number of URLs restored.
+        """
+        if self.url_filter is not None and len(self.url_filter):
+            # a filter reopened from its file still remembers them
+            return 0
+
+        restored = 0
+        for normalized_urls in batches:
+            if not normalized_urls:
                 continue
+            if self.url_filter is not None:
+                for normalized_url in normalized_urls:
+                    self.url_filter.add(normalized_url)
+            else:
+                self.backend.update(self._url_set_key, [calculate_digest(url) for url in normalized_urls])
+            restored += len(normalized_urls)
+        return restored
+
+    def close(self) -> None:
+        if self.url_filter is not None:
+            self.url_filter.close()
+        self.backend.close()
 
-            filtered_urls.append(Url(url=url, normalized_url=normalized_url, parent_url_id=parent_url_id, depth=depth))
+    def filter_extracted_urls(self, extracted_urls: List[str], parent_url_id: int, depth: int,
+                              base_url: Optional[str] = None) -> List[Url]:
+        """Keep the new crawlable links of a page; relative links are resolved against `base_url`."""
+        # the first spelling of each link is kept, repeats within the page are dropped before asking Redis
+        page_urls: Dict[str, str] = {}
+        normalized_urls = self.url_normalizer.normalize_many(extracted_urls, base_url)
+        for url, normalized_url in zip(extracted_urls, normalized_urls):
+            if normalized_url is not None and normalized_url not in page_urls:
+                page_urls[normalized_url] = url
 
-        return filtered_urls
\ No newline at end of file
+        duplicates = self.are_duplicate_urls(list(page_urls))
+        return [
+            Url(url=url, normalized_url=normalized_url, parent_url_id=parent_url_id, depth=depth)
+            for (normalized_url, url), is_duplicate in zip(page_urls.items(), duplicates)
+            if not is_duplicate
+        ]
\ No newline at end of file
@@ -0,0 +1,113 @@
+import hashlib
+import re
+from dataclasses import dataclass, field
+from itertools import combinations
+from typing import Dict, List, Optional, Union
+
+FINGERPRINT_BITS = 64
+SHINGLE_SIZE = 3
+_WORD = re.compile(r"\w+")
+
+
+# Each of the 64 fingerprint bits gets a 32-bit lane in one big integer, so that adding a shingle's hash to the
+# tally updates all 64 bit counters at once. _SPREAD[position][value] holds the lanes of byte `value` at `position`.
+_LANE_BITS = 32
+_LANE_MASK = (1 << _LANE_BITS) - 1
+_SPREAD = [
+    [sum(((value >> bit) & 1) << (_LANE_BITS * (8 * position + bit)) for bit in range(8)) for value in range(256)]
+    for position in range(FINGERPRINT_BITS // 8)
+]
+
+
+def simhash(text: str, shingle_size: int = SHINGLE_SIZE) -> Optional[int]:
+    """
+    64-bit SimHash of the text's lower-cased word shingles, or None when the text has no words.
+
+    Pages that differ in a few words (a timestamp, a session token) only change the few shingles containing them,
+    so their fingerprints differ in only a few bits.
+    """
+    words = _WORD.findall(text.lower())
+    if not words:
+        return None
+    if len(words) < shingle_size:
+        shingles = [" ".join(words)]
+    else:
+        shingles = [" ".join(words[i:i + shingle_size]) for i in range(len(words) - shingle_size + 1)]
+
+    tally = 0
+    for shingle in shingles:
+        digest = hashlib.blake2b(shingle.encode("utf-8"), digest_size=FINGERPRINT_BITS // 8).digest()
+        for spread, value in zip(_SPREAD, digest):
+            tally += spread[value]
+
+    fingerprint = 0
+    for bit in range(FINGERPRINT_BITS):
+        # a bit is set when more shingles vote for 1 than for 0
+        if 2 * ((tally >> (_LANE_BITS * bit)) & _LANE_MASK) > len(shingles):
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+@dataclass
+class SimHashIndex:
+    """
+    Index of 64-bit fingerprints answering "is there one within `threshold` bits of this one?" without a scan.
+
+    The fingerprint is cut into `threshold + 2` blocks. Two fingerprints at most `threshold` bits apart differ in
+    at most `threshold` blocks, so at least two blocks are identical. There is one table for every pair of
+    blocks, keyed by the fingerprint bits of that pair. A lookup probes each table once and compares only
+    the fingerprints found there. Each key is about 25 bits wide, so buckets stay nearly empty up to tens of
+    millions of pages and the lookup cost does not grow with the index.
+    """
+    threshold: int = field(default=3)
+    size: int = field(default=0, init=False)
+    _masks: List[int] = field(default_factory=list, init=False, repr=False)
+    _tables: List[Dict[int, Union[int, List[int]]]] = field(default_factory=list, init=False, repr=False)
+
+    def __post_init__(self):
+        if not 0 <= self.threshold < FINGERPRINT_BITS // 2:
+            raise ValueError(f"Threshold must be between 0 and {FINGERPRINT_BITS // 2 - 1} bits")
+
+        block_count = self.threshold + 2
+        bounds = [FINGERPRINT_BITS * i // block_count for i in range(block_count + 1)]
+        blocks = [((1 << (end - start)) - 1) << start for start, end in zip(bounds, bounds[1:])]
+        self._masks = [a | b for a, b in combinations(blocks, 2)]
+        self._tables = [{} for _ in self._masks]
+
+    def __len__(self) -> int:
+        return self.size
+
+    def find(self, fingerprint: int) -> Optional[int]:
+        """Return an indexed fingerprint within `threshold` bits of `fingerprint`, or None."""
+        for mask, table in zip(self._masks, self._tables):
+            bucket = table.get(fingerprint & mask)
+            if bucket is None:
+                continue
+            for candidate in (bucket,) if isinstance(bucket, int) else bucket:
+                if (candidate ^ fingerprint).bit_count() <= self.threshold:
+                    return candidate
+        return None
+
+    def add(self, fingerprint: int) -> None:
+        for mask, table in zip(self._masks, self._tables):
+            key = fingerprint & mask
+            bucket = table.get(key)
+            # almost every bucket holds one fingerprint, which is stored as is rather than in a list
+            if bucket is None:
+                table[key] = fingerprint
+            elif isinstance(bucket, int):
+                table[key] = [bucket, fingerprint]
+            else:
+                bucket.append(fingerprint)
+        self.size += 1
+
+    def add_if_new(self, fingerprint: int) -> bool:
+        """Index the fingerprint unless a near-duplicate is already indexed; True when it was added."""
+        if self.find(fingerprint) is not None:
+            return False
+        self.add(fingerprint)
+        return True
@@ -5,4 +5,23 @@ class UrlStatusType(StrEnum):
     PENDING = "pending"
     IN_PROGRESS = "in_progress"
     COMPLETED = "completed"
-    FAILED = "failed"
\ No newline at end of file
+    FAILED = "failed"
+
+    @property
+    def code(self) -> int:
+        """The small integer stored in the database in place of the name."""
+        return _CODES[self]
+
+    @classmethod
+    def from_code(cls, code: int) -> "UrlStatusType":
+        return _STATUSES[code]
+
+
+# stored in databases: never renumber a status, only add new ones
+_CODES = {
+    UrlStatusType.PENDING: 0,
+    UrlStatusType.IN_PROGRESS: 1,
+    UrlStatusType.COMPLETED: 2,
+    UrlStatusType.FAILED: 3,
+}
+_STATUSES = {code: status for status, code in _CODES.items()}
@@ -0,0 +1,140 @@
+import html
+import logging
+import re
+from typing import List, Optional
+
+from webcrawler_arnoldkyeza.core.extractor.content_parser.content_parser import ContentParser
+from webcrawler_arnoldkyeza.core.extractor.content_parser.parser_result import ParserResult
+
+logger = logging.getLogger(__name__)
+
+# One alternative per markup construct; whatever lies between two matches is text. Possessive quantifiers keep an
+# unterminated tag from backtracking over the rest of the page.
+_TOKEN = re.compile(
+    r"<!--.*?(?:-->|\Z)"
+    r"|<!\[CDATA\[(?P<cdata>.*?)\]\]>"
+    r"|<[!?][^>]*+>"
+    r"|</(?P<end>[a-zA-Z][^\s/>]*+)[^>]*+>"
+    r"|<(?P<start>[a-zA-Z][^\s/>]*+)(?P<attrs>(?:[^>\"']++|\"[^\"]*+\"|'[^']*+')*+)>",
+    re.S,
+)
+_ATTR = re.compile(r"""([^\s/>=][^\s/=>]*)(?:\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]*)))?""")
+# script and style bodies are raw text: nothing inside them is markup, and none of it is visible text
+_RAW_TEXT_END = {
+    "script": re.compile(r"</\s*script\s*>", re.I),
+    "style": re.compile(r"</\s*style\s*>", re.I),
+}
+_PRESERVE_WHITESPACE = {"pre", "textarea"}
+_ASCII_SPACES = "\x20\x0a\x09\x0c\x0d"
+
+
+def _href(attrs: str) -> Optional[str]:
+    if "href" not in attrs.lower():
+        return None
+    href = None
+    # the last of duplicated attributes wins, a valueless one is an empty string
+    for name, double_quoted, single_quoted, unquoted in _ATTR.findall(attrs):
+        if name.lower() == "href":
+            href = html.unescape(double_quoted or single_quoted or unquoted)
+    return href
+
+
+class FastTextualParser(ContentParser):
+    """
+    Single-pass alternative to `TextualParser` that extracts the title, visible text and hrefs without building a
+    DOM, by scanning the page once with a tokenizing regular expression.
+
+    The result matches what BeautifulSoup's `html.parser` tree gives `TextualParser`: script, style and template
+    contents are left out of the text, whitespace-only strings outside pre/textarea are collapsed to one newline or
+    space, hrefs come in document order with None for anchors without one, and the first `<base href>` is kept.
+    A page without a plain-text title gets an empty title instead of failing.
+    """
+
+    @staticmethod
+    def parse(html_doc: str) -> Optional[ParserResult]:
+        parts: List[str] = []
+        hrefs: List[Optional[str]] = []
+        base_url: Optional[str] = None
+        template_depth = 0
+        preserve_depth = 0
+        title: Optional[str] = None
+        title_parts: Optional[List[str]] = None  # set while inside the first title element
+        title_done = False
+        title_has_children = False
+
+        position = 0
+        length = len(html_doc)
+        while position < length:
+            match = _TOKEN.search(html_doc, position)
+            text_end = match.start() if match else length
+
+            if text_end > position:
+                text = html_doc[position:text_end]
+                if "&" in text:
+                    text = html.unescape(text)
+                if not preserve_depth and not text.strip(_ASCII_SPACES):
+                    text = "\n" if "\n" in text else " "
+                if not template_depth:
+                    parts.append(text)
+                if title_parts is not None:
+                    title_parts.append(text)
+
+            if match is None:
+                break
+            position = match.end()
+
+            start = match.group("start")
+            if start is not None:
+                tag = start.lower()
+                self_closing = match.group("attrs").endswith("/")
+                if tag == "a":
+                    hrefs.append(_href(match.group("attrs")))
+                elif tag == "base" and base_url is None:
+                    base_url = _href(match.group("attrs"))
+                elif tag in _RAW_TEXT_END:
+                    if not self_closing:
+                        close = _RAW_TEXT_END[tag].search(html_doc, position)
+                        position = close.end() if close else length
+                    continue
+                elif tag == "template" and not self_closing:
+                    template_depth += 1
+                elif tag in _PRESERVE_WHITESPACE and not self_closing:
+                    preserve_depth += 1
+                elif tag == "title" and not title_done and not self_closing:
+                    title_parts = []
+                    continue
+
+                if title_parts is not None:
+                    title_has_children = True
+                continue
+
+            end = match.group("end")
+            if end is not None:
+                tag = end.lower()
+                if tag == "template":
+                    template_depth = max(0, template_depth - 1)
+                elif tag in _PRESERVE_WHITESPACE:
+                    preserve_depth = max(0, preserve_depth - 1)
+                elif tag == "title" and title_parts is not None:
+                    if len(title_parts) == 1 and not title_has_children:
+                        title = title_parts[0]
+                    title_parts = None
+                    title_done = True
+                continue
+
+            cdata = match.group("cdata")
+            if cdata is not None:
+                if not template_depth:
+                    parts.append(cdata)
+                if title_parts is not None:
+                    title_parts.append(cdata)
+            elif title_parts is not None:
+                # a comment inside the title splits it into several strings
+                title_has_children = True
+
+        return ParserResult(
+            title=title.rstrip().lower().replace(" ", "_") if title is not None else "",
+            content="".join(parts),
+            extracted_urls=hrefs,
+            base_url=base_url,
+        )
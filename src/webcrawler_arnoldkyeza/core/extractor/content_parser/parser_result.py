@@ -1,9 +1,10 @@
 from dataclasses import dataclass, field
-from typing import Any, List
+from typing import Any, List, Optional
 
 
 @dataclass
 class ParserResult:
     title: str
     content: str
-    extracted_urls: List[str] = field(default_factory=list)
\ No newline at end of file
+    extracted_urls: List[str] = field(default_factory=list)
+    base_url: Optional[str] = field(default=None)
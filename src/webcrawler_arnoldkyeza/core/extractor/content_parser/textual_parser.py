@@ -15,8 +15,10 @@ class TextualParser(ContentParser):
     def parse(html_doc: str) -> Optional[ParserResult]:
         soup = BeautifulSoup(html_doc, 'html.parser')
         hrefs = [link.get("href") for link in soup.find_all('a')]
+        base = soup.find('base', href=True)
         return ParserResult(
             title=soup.title.string.rstrip().lower().replace(" ", "_"),
             content=soup.get_text(),
-            extracted_urls=hrefs
+            extracted_urls=hrefs,
+            base_url=base.get("href") if base else None
         )
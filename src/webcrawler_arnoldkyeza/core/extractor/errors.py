@@ -0,0 +1,5 @@
+class ContentParseError(Exception):
+    """Exception raised when a page could not be parsed by a parser running in another process."""
+
+    def __init__(self, message):
+        super().__init__(message)
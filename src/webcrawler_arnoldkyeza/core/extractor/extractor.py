@@ -1,14 +1,29 @@
 import logging
 from dataclasses import dataclass
-from typing import Optional, Any
+from typing import Dict, Optional, Any, Type
 
 from webcrawler_arnoldkyeza.core.extractor.content_parser.content_parser import ContentParser
+from webcrawler_arnoldkyeza.core.extractor.content_parser.fast_textual_parser import FastTextualParser
+from webcrawler_arnoldkyeza.core.extractor.content_parser.textual_parser import TextualParser
 
 logger = logging.getLogger(__name__)
 
+CONTENT_PARSERS: Dict[str, Type[ContentParser]] = {
+    "bs4": TextualParser,
+    "fast": FastTextualParser,
+}
+
 @dataclass
 class Extractor:
     parser: ContentParser
 
+    @classmethod
+    def for_parser(cls, name: str) -> "Extractor":
+        """Build an extractor around one of the `CONTENT_PARSERS` backends."""
+        try:
+            return cls(CONTENT_PARSERS[name]())
+        except KeyError:
+            raise ValueError(f"Unknown content parser: {name}")
+
     def extract(self, content: Any) -> Optional[Any]:
         return self.parser.parse(content)
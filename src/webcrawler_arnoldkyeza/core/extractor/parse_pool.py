@@ -0,0 +1,112 @@
+import asyncio
+import functools
+import logging
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import List, Optional, Set, Tuple
+
+from webcrawler_arnoldkyeza.core.extractor.content_parser.parser_result import ParserResult
+from webcrawler_arnoldkyeza.core.extractor.errors import ContentParseError
+from webcrawler_arnoldkyeza.core.extractor.extractor import CONTENT_PARSERS
+
+logger = logging.getLogger(__name__)
+
+# (title, content, extracted_urls, base_url) on success, or the error message
+ParsedFields = Tuple[str, str, List[Optional[str]], Optional[str]]
+BatchResult = List[Tuple[Optional[ParsedFields], Optional[str]]]
+
+
+def _parse_batch(parser_name: str, documents: List[str]) -> BatchResult:
+    """Runs in a pool process: parse every document, returning plain tuples that are cheap to pickle back."""
+    parser = CONTENT_PARSERS[parser_name]()
+    results: BatchResult = []
+    for document in documents:
+        try:
+            result = parser.parse(document)
+            results.append(((result.title, result.content, result.extracted_urls, result.base_url), None))
+        except Exception as e:
+            # exceptions are sent back as text since not all of them can be pickled
+            results.append((None, f"{type(e).__name__}: {e}"))
+    return results
+
+
+@dataclass
+class ParsePool:
+    """
+    Parses pages in a pool of processes so that parsing never blocks the event loop.
+
+    Documents handed to `parse` are grouped into batches of up to `batch_size`, a batch being sent as soon as it is
+    full or `batch_delay` seconds after its first document, and several batches can be in flight at once. The pool
+    is started on first use; `executor` can be given to run the batches elsewhere (e.g. in threads).
+    """
+    max_workers: Optional[int] = field(default=None)
+    parser_name: str = field(default="bs4")
+    batch_size: int = field(default=8)
+    batch_delay: float = field(default=0.005)
+    executor: Optional[Executor] = field(default=None, repr=False)
+    _pending: List[Tuple[str, asyncio.Future]] = field(default_factory=list, init=False, repr=False)
+    _flush_handle: Optional[asyncio.TimerHandle] = field(default=None, init=False, repr=False)
+    _batches: Set[asyncio.Future] = field(default_factory=set, init=False, repr=False)
+
+    def __post_init__(self):
+        if self.parser_name not in CONTENT_PARSERS:
+            raise ValueError(f"Unknown content parser: {self.parser_name}")
+
+    async def parse(self, html_doc: str) -> ParserResult:
+        loop = asyncio.get_running_loop()
+        result = loop.create_future()
+        self._pending.append((html_doc, result))
+        if len(self._pending) >= self.batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.batch_delay, self._flush)
+        return await result
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not self._pending:
+            return
+
+        batch, self._pending = self._pending, []
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            logger.info(f"Started parse pool with {self.max_workers or os.cpu_count()} processes")
+
+        documents = [document for document, _ in batch]
+        task = asyncio.get_running_loop().run_in_executor(self.executor, _parse_batch, self.parser_name, documents)
+        self._batches.add(task)
+        task.add_done_callback(functools.partial(self._batch_done, batch))
+
+    def _batch_done(self, batch: List[Tuple[str, asyncio.Future]], task: asyncio.Future) -> None:
+        self._batches.discard(task)
+        if task.cancelled():
+            for _, result in batch:
+                result.cancel()
+            return
+
+        error = task.exception()
+        if error is not None:
+            # the batch as a whole failed, e.g. a pool process died
+            for _, result in batch:
+                if not result.done():
+                    result.set_exception(ContentParseError(f"Parse batch failed: {error}"))
+            return
+
+        for (_, result), (fields, message) in zip(batch, task.result()):
+            if result.done():
+                continue  # the worker waiting for it was cancelled
+            if message is not None:
+                result.set_exception(ContentParseError(message))
+            else:
+                result.set_result(ParserResult(*fields))
+
+    async def close(self) -> None:
+        self._flush()
+        if self._batches:
+            await asyncio.gather(*self._batches, return_exceptions=True)
+        if self.executor is not None:
+            self.executor.shutdown(wait=True, cancel_futures=True)
+            self.executor = None
@@ -0,0 +1,138 @@
+import asyncio
+import logging
+import socket
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from aiohttp.abc import AbstractResolver, ResolveResult
+from aiohttp.resolver import DefaultResolver
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+CacheKey = Tuple[str, int, int]
+
+
+@dataclass
+class DNSCacheEntry:
+    expires_at: float
+    addresses: Optional[List[ResolveResult]] = field(default=None)
+    error: Optional[OSError] = field(default=None)
+
+
+@dataclass
+class DNSCache(AbstractResolver):
+    """
+    In-process DNS cache used as the resolver of the aiohttp connector.
+
+    Successful lookups are kept for `ttl` seconds and failures for `negative_ttl` seconds, bounded to `max_size`
+    entries in LRU order. Concurrent lookups of the same host share a single resolver call, and `prefetch` lets
+    the scheduler warm the cache as soon as a host is discovered so that fetches never wait on the resolver.
+    """
+    ttl: float = field(default=300.0)
+    negative_ttl: float = field(default=5.0)
+    max_size: int = field(default=10000)
+    family: int = field(default=socket.AF_UNSPEC)
+    resolver: Optional[AbstractResolver] = field(default=None, repr=False)
+    clock: Callable[[], float] = field(default=time.monotonic, repr=False)
+    hits: int = field(default=0, init=False)
+    misses: int = field(default=0, init=False)
+    prefetches: int = field(default=0, init=False)
+    _entries: "OrderedDict[CacheKey, DNSCacheEntry]" = field(default_factory=OrderedDict, init=False, repr=False)
+    _pending: Dict[CacheKey, asyncio.Future] = field(default_factory=dict, init=False, repr=False)
+    _prefetch_tasks: Set[asyncio.Future] = field(default_factory=set, init=False, repr=False)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "prefetches": self.prefetches,
+            "entries": len(self._entries),
+        }
+
+    async def resolve(self, host: str, port: int = 0, family: socket.AddressFamily = socket.AF_INET
+                      ) -> List[ResolveResult]:
+        key = (host, port, int(family))
+        entry = self._fresh_entry(key)
+        if entry is not None:
+            self.hits += 1
+            return self._unpack(entry)
+
+        lookup = self._pending.get(key)
+        if lookup is None:
+            self.misses += 1
+            lookup = self._start_lookup(key)
+        else:
+            # a lookup for this host is already in flight (often a prefetch), so no extra resolver call is made
+            self.hits += 1
+
+        return list(await asyncio.shield(lookup))
+
+    def prefetch(self, host: str, port: int) -> None:
+        """Resolve `host` in the background unless it is already cached or being resolved."""
+        key = (host, port, self.family)
+        if self._fresh_entry(key) is not None or key in self._pending:
+            return
+
+        self.prefetches += 1
+        lookup = self._start_lookup(key)
+        self._prefetch_tasks.add(lookup)
+        lookup.add_done_callback(self._prefetch_done)
+
+    async def close(self) -> None:
+        for lookup in list(self._pending.values()):
+            lookup.cancel()
+        self._pending.clear()
+        if self.resolver is not None:
+            await self.resolver.close()
+        logger.info(f"DNS cache closed: {self.stats()}")
+
+    def _fresh_entry(self, key: CacheKey) -> Optional[DNSCacheEntry]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= self.clock():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    @staticmethod
+    def _unpack(entry: DNSCacheEntry) -> List[ResolveResult]:
+        if entry.error is not None:
+            raise entry.error
+        return list(entry.addresses)
+
+    def _start_lookup(self, key: CacheKey) -> asyncio.Future:
+        lookup = asyncio.ensure_future(self._lookup(key))
+        self._pending[key] = lookup
+        return lookup
+
+    async def _lookup(self, key: CacheKey) -> List[ResolveResult]:
+        host, port, family = key
+        if self.resolver is None:
+            self.resolver = DefaultResolver()
+        try:
+            addresses = await self.resolver.resolve(host, port, family=socket.AddressFamily(family))
+        except OSError as e:
+            self._store(key, DNSCacheEntry(expires_at=self.clock() + self.negative_ttl, error=e))
+            raise
+        else:
+            self._store(key, DNSCacheEntry(expires_at=self.clock() + self.ttl, addresses=addresses))
+            return addresses
+        finally:
+            self._pending.pop(key, None)
+
+    def _store(self, key: CacheKey, entry: DNSCacheEntry) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def _prefetch_done(self, lookup: asyncio.Future) -> None:
+        self._prefetch_tasks.discard(lookup)
+        if not lookup.cancelled() and lookup.exception() is not None:
+            logger.debug(f"DNS prefetch failed: {lookup.exception()}")
@@ -0,0 +1,66 @@
+import datetime
+from dataclasses import dataclass, field
+from email.utils import parsedate_to_datetime
+from typing import Mapping, Optional
+
+NOT_MODIFIED = 304
+TOO_MANY_REQUESTS = 429
+
+
+def is_retryable_status(status_code: int) -> bool:
+    return status_code == TOO_MANY_REQUESTS or status_code >= 500
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait according to a Retry-After header given either as delay-seconds or as an HTTP-date."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=datetime.timezone.utc)
+    return max(0.0, (retry_at - datetime.datetime.now(datetime.timezone.utc)).total_seconds())
+
+
+@dataclass
+class CacheValidators:
+    """Response validators a server sent for a page, replayed on the next crawl of the same URL."""
+    etag: Optional[str] = field(default=None)
+    last_modified: Optional[str] = field(default=None)
+
+    def __bool__(self) -> bool:
+        return bool(self.etag or self.last_modified)
+
+    def to_request_headers(self) -> dict[str, str]:
+        headers: dict[str, str] = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+    @classmethod
+    def from_response_headers(cls, headers: Mapping[str, str],
+                              fallback: Optional["CacheValidators"] = None) -> "CacheValidators":
+        # a 304 may omit validators that are still valid, so keep the ones that were sent
+        fallback = fallback or cls()
+        return cls(
+            etag=headers.get("ETag") or fallback.etag,
+            last_modified=headers.get("Last-Modified") or fallback.last_modified,
+        )
+
+
+@dataclass
+class FetchResponse:
+    content: Optional[str]
+    status_code: int = field(default=200)
+    validators: CacheValidators = field(default_factory=CacheValidators)
+
+    @property
+    def not_modified(self) -> bool:
+        return self.status_code == NOT_MODIFIED
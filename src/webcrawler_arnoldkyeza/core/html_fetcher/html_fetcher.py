@@ -1,5 +1,5 @@
 from dataclasses import dataclass
-from typing import Any
+from typing import Any, AsyncIterator, Optional
 
 from webcrawler_arnoldkyeza.core.html_fetcher.protocol_handlers.protocol_handler import ProtocolHandler
 
@@ -8,5 +8,15 @@ from webcrawler_arnoldkyeza.core.html_fetcher.protocol_handlers.protocol_handler
 class HTMLFetcher:
     handler: ProtocolHandler
 
-    async def fetch(self, data: Any) -> Any:
-        return await self.handler.get_content(data)
+    async def fetch(self, data: Any, *args, **kwargs) -> Any:
+        return await self.handler.get_content(data, *args, **kwargs)
+
+    async def fetch_robots_txt(self, url: str) -> Optional[str]:
+        return await self.handler.get_robots_txt(url)
+
+    async def stream(self, url: str) -> AsyncIterator[bytes]:
+        async for chunk in self.handler.stream_resource(url):
+            yield chunk
+
+    async def close(self) -> None:
+        await self.handler.close()
@@ -0,0 +1,163 @@
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Optional
+from urllib.parse import urlparse
+
+import aiohttp
+
+from webcrawler_arnoldkyeza.core.html_fetcher.dns_cache import DNSCache
+from webcrawler_arnoldkyeza.core.html_fetcher.fetch_response import (
+    CacheValidators,
+    FetchResponse,
+    NOT_MODIFIED,
+    is_retryable_status,
+    parse_retry_after,
+)
+from webcrawler_arnoldkyeza.core.html_fetcher.protocol_handlers.protocol_handler import (
+    DEFAULT_USER_AGENT,
+    MAX_ROBOTS_TXT_SIZE,
+    ProtocolHandler,
+)
+from webcrawler_arnoldkyeza.core.html_fetcher.protocol_handlers.body_reader import (
+    DEFAULT_CHUNK_SIZE,
+    DEFAULT_MAX_BODY_SIZE,
+    StreamingBodyDecoder,
+    check_response_headers,
+    content_charset,
+)
+from webcrawler_arnoldkyeza.core.html_fetcher.protocol_handlers.errors import TransientFetchError
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class AsyncHTTPProtocolHandler(ProtocolHandler):
+    """
+    Fully asynchronous HTTP handler backed by a single long-lived aiohttp session.
+
+    The session owns a keep-alive connection pool, so repeated fetches against the same host reuse
+    TCP/TLS connections instead of paying a handshake per page, and no executor thread is tied up
+    per in-flight request. The session is created lazily on first use so that it binds to the
+    running event loop, and must be released with `close()` once crawling is done.
+
+    Bodies are streamed: the headers are checked before anything else is read, so non-HTML or oversized
+    responses are dropped without being downloaded, and the body is decoded chunk by chunk up to
+    `max_body_size` bytes.
+
+    When a `dns_cache` is given it replaces aiohttp's own resolver cache, so host lookups can be shared with
+    (and prefetched by) the scheduler.
+    """
+    max_connections: int = field(default=1000)
+    max_connections_per_host: int = field(default=100)
+    connect_timeout: float = field(default=10.0)
+    read_timeout: float = field(default=30.0)
+    keepalive_timeout: float = field(default=30.0)
+    max_body_size: Optional[int] = field(default=DEFAULT_MAX_BODY_SIZE)
+    dns_cache: Optional[DNSCache] = field(default=None)
+    user_agent: str = field(default=DEFAULT_USER_AGENT)
+    _session: Optional[aiohttp.ClientSession] = field(default=None, init=False, repr=False)
+
+    async def get_content(self, url, validators: Optional[CacheValidators] = None) -> Optional[FetchResponse]:
+        schema = urlparse(url).scheme
+        if not schema in ["http", "https"]:
+            return None
+
+        session = self._get_session()
+        headers = validators.to_request_headers() if validators else None
+        try:
+            async with session.get(url, headers=headers) as response:
+                response.raise_for_status()
+
+                if response.status == NOT_MODIFIED:
+                    logger.debug(f"Content not modified at {url}")
+                    return FetchResponse(
+                        content=None,
+                        status_code=NOT_MODIFIED,
+                        validators=CacheValidators.from_response_headers(response.headers, validators),
+                    )
+
+                content_type = check_response_headers(response.headers, self.max_body_size)
+
+                decoder = StreamingBodyDecoder(content_charset(content_type), self.max_body_size)
+                async for chunk in response.content.iter_chunked(DEFAULT_CHUNK_SIZE):
+                    decoder.feed(chunk)
+
+                logger.debug(f"Fetched content from {url}")
+
+                return FetchResponse(
+                    content=decoder.finish(),
+                    status_code=response.status,
+                    validators=CacheValidators.from_response_headers(response.headers),
+                )
+        except aiohttp.ClientResponseError as e:
+            if is_retryable_status(e.status):
+                retry_after = parse_retry_after(e.headers.get("Retry-After")) if e.headers else None
+                raise TransientFetchError(f"Error fetching content from {url}: {e}", e.status, retry_after)
+            raise ValueError(f"Error fetching content from {url}: {e}")
+        except aiohttp.ClientConnectionError as e:
+            raise TransientFetchError(f"Network error while fetching content from {url}: {e}")
+        except aiohttp.ClientError as e:
+            raise ValueError(f"Error fetching content from {url}: {e}")
+        except asyncio.TimeoutError:
+            raise TransientFetchError(f"Timed out while fetching content from {url}")
+
+    async def get_robots_txt(self, url: str) -> Optional[str]:
+        session = self._get_session()
+        try:
+            async with session.get(url) as response:
+                if 400 <= response.status < 500:
+                    return None
+                response.raise_for_status()
+
+                body = bytearray()
+                async for chunk in response.content.iter_chunked(DEFAULT_CHUNK_SIZE):
+                    body.extend(chunk)
+                    if len(body) >= MAX_ROBOTS_TXT_SIZE:
+                        break
+                # rules past the size limit are ignored
+                return bytes(body[:MAX_ROBOTS_TXT_SIZE]).decode("utf-8", errors="replace")
+        except aiohttp.ClientError as e:
+            raise ValueError(f"Error fetching robots.txt from {url}: {e}")
+        except asyncio.TimeoutError:
+            raise ValueError(f"Timed out while fetching robots.txt from {url}")
+
+    async def stream_resource(self, url: str) -> AsyncIterator[bytes]:
+        session = self._get_session()
+        try:
+            async with session.get(url) as response:
+                response.raise_for_status()
+                async for chunk in response.content.iter_chunked(DEFAULT_CHUNK_SIZE):
+                    yield chunk
+        except aiohttp.ClientError as e:
+            raise ValueError(f"Error fetching {url}: {e}")
+        except asyncio.TimeoutError:
+            raise ValueError(f"Timed out while fetching {url}")
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.max_connections,
+                limit_per_host=self.max_connections_per_host,
+                keepalive_timeout=self.keepalive_timeout,
+                resolver=self.dns_cache,
+                use_dns_cache=self.dns_cache is None,
+            )
+            timeout = aiohttp.ClientTimeout(
+                total=None,
+                sock_connect=self.connect_timeout,
+                sock_read=self.read_timeout,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=timeout,
+                headers={"User-Agent": self.user_agent},
+            )
+        return self._session
+
+    async def close(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        if self.dns_cache is not None:
+            await self.dns_cache.close()
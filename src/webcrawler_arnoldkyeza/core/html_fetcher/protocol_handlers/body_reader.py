@@ -0,0 +1,64 @@
+import codecs
+from dataclasses import dataclass, field
+from typing import List, Mapping, Optional
+
+from webcrawler_arnoldkyeza.core.html_fetcher.protocol_handlers.errors import (
+    ContentTooLargeError,
+    UnsupportedContentTypeError,
+)
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+DEFAULT_MAX_BODY_SIZE = 10 * 1024 * 1024
+DEFAULT_ENCODING = "utf-8"
+
+
+def content_charset(content_type: str) -> str:
+    """Return the charset declared in a Content-Type header, falling back to UTF-8 when missing or unknown."""
+    for param in content_type.split(";")[1:]:
+        name, _, value = param.partition("=")
+        if name.strip().lower() == "charset":
+            charset = value.strip().strip('"\'')
+            try:
+                return codecs.lookup(charset).name
+            except LookupError:
+                break
+    return DEFAULT_ENCODING
+
+
+def check_response_headers(headers: Mapping[str, str], max_body_size: Optional[int]) -> str:
+    """
+    Validate a response from its headers alone, before any of the body is read, and return its Content-Type.
+    """
+    content_type = headers.get('Content-Type', '')
+    if 'text/html' not in content_type:
+        raise UnsupportedContentTypeError(content_type)
+
+    content_length = headers.get('Content-Length')
+    if max_body_size is not None and content_length and content_length.isdigit():
+        if int(content_length) > max_body_size:
+            raise ContentTooLargeError(max_body_size)
+
+    return content_type
+
+
+@dataclass
+class StreamingBodyDecoder:
+    """Decodes a body chunk by chunk, failing as soon as more than `max_body_size` bytes have been received."""
+    encoding: str = field(default=DEFAULT_ENCODING)
+    max_body_size: Optional[int] = field(default=DEFAULT_MAX_BODY_SIZE)
+    received: int = field(default=0, init=False)
+    _parts: List[str] = field(default_factory=list, init=False, repr=False)
+    _decoder: codecs.IncrementalDecoder = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self._decoder = codecs.getincrementaldecoder(self.encoding)(errors="replace")
+
+    def feed(self, chunk: bytes) -> None:
+        self.received += len(chunk)
+        if self.max_body_size is not None and self.received > self.max_body_size:
+            raise ContentTooLargeError(self.max_body_size)
+        self._parts.append(self._decoder.decode(chunk))
+
+    def finish(self) -> str:
+        self._parts.append(self._decoder.decode(b"", final=True))
+        return "".join(self._parts)
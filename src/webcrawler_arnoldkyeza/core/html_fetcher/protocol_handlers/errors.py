@@ -3,4 +3,28 @@ class UnsupportedContentTypeError(Exception):
 
     def __init__(self, content_type):
         self.content_type = content_type
-        super().__init__(f"Unsupported content type: {content_type}")
\ No newline at end of file
+        super().__init__(f"Unsupported content type: {content_type}")
+
+class ContentTooLargeError(Exception):
+    """Exception raised when the fetched content exceeds the configured maximum body size."""
+
+    def __init__(self, max_body_size):
+        self.max_body_size = max_body_size
+        super().__init__(f"Content exceeds maximum body size of {max_body_size} bytes")
+
+
+class TransientFetchError(ValueError):
+    """Exception raised when a fetch failed for a reason that may go away (timeouts, 5xx, 429), so it can be retried."""
+
+    def __init__(self, message, status_code=None, retry_after=None):
+        self.status_code = status_code
+        self.retry_after = retry_after
+        super().__init__(message)
+
+
+class UnsupportedSchemeError(Exception):
+    """Exception raised when the URL's scheme is not one the protocol handlers fetch."""
+
+    def __init__(self, scheme):
+        self.scheme = scheme
+        super().__init__(f"Unsupported URL scheme: {scheme}")
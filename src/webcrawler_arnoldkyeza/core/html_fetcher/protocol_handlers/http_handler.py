@@ -1,28 +1,48 @@
 import asyncio
 import logging
-from dataclasses import dataclass
-from typing import Optional
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Optional
 from urllib.error import HTTPError, URLError
 from urllib.parse import urlparse
 
 import requests
 
-from webcrawler_arnoldkyeza.core.html_fetcher.protocol_handlers.protocol_handler import ProtocolHandler
-from webcrawler_arnoldkyeza.core.html_fetcher.protocol_handlers.errors import UnsupportedContentTypeError
+from webcrawler_arnoldkyeza.core.html_fetcher.fetch_response import (
+    CacheValidators,
+    FetchResponse,
+    NOT_MODIFIED,
+    is_retryable_status,
+    parse_retry_after,
+)
+from webcrawler_arnoldkyeza.core.html_fetcher.protocol_handlers.protocol_handler import (
+    DEFAULT_USER_AGENT,
+    MAX_ROBOTS_TXT_SIZE,
+    ProtocolHandler,
+)
+from webcrawler_arnoldkyeza.core.html_fetcher.protocol_handlers.body_reader import (
+    DEFAULT_CHUNK_SIZE,
+    DEFAULT_MAX_BODY_SIZE,
+    StreamingBodyDecoder,
+    check_response_headers,
+    content_charset,
+)
+from webcrawler_arnoldkyeza.core.html_fetcher.protocol_handlers.errors import TransientFetchError
 
 logger = logging.getLogger(__name__)
 
 
 @dataclass
 class HTTPProtocolHandler(ProtocolHandler):
+    max_body_size: Optional[int] = field(default=DEFAULT_MAX_BODY_SIZE)
+    user_agent: str = field(default=DEFAULT_USER_AGENT)
 
-    async def get_content(self, url) -> Optional[str]:
+    async def get_content(self, url, validators: Optional[CacheValidators] = None) -> Optional[FetchResponse]:
         schema = urlparse(url).scheme
         if not schema in ["http", "https"]:
             return None
 
         try:
-            return await asyncio.to_thread(self._fetch_content, url)
+            return await asyncio.to_thread(self._fetch_content, url, validators)
         except HTTPError as e:
             raise ValueError(f"Error fetching content from {url}: {e}")
         except URLError as e:
@@ -30,20 +50,96 @@ class HTTPProtocolHandler(ProtocolHandler):
         except Exception as e:
             raise e
 
-    @staticmethod
-    def _fetch_content(url) -> str:
+    def _fetch_content(self, url, validators: Optional[CacheValidators] = None) -> FetchResponse:
         try:
-            response = requests.get(url, timeout=60)
-            response.raise_for_status()  # Raise error for bad status codes
-            content_type = response.headers.get('Content-Type', '')
+            headers = {"User-Agent": self.user_agent}
+            if validators:
+                headers.update(validators.to_request_headers())
+            # stream so that headers can be checked before any of the body is downloaded
+            response = requests.get(url, headers=headers, timeout=60, stream=True)
+            try:
+                response.raise_for_status()  # Raise error for bad status codes
 
-            if 'text/html' not in content_type:
-                raise UnsupportedContentTypeError(content_type)
+                if response.status_code == NOT_MODIFIED:
+                    logger.debug(f"Content not modified at {url}")
+                    return FetchResponse(
+                        content=None,
+                        status_code=NOT_MODIFIED,
+                        validators=CacheValidators.from_response_headers(response.headers, validators),
+                    )
 
-            logger.debug(f"Fetched content from {url}")
+                content_type = check_response_headers(response.headers, self.max_body_size)
 
-            return response.text  # For textual content like HTML
+                decoder = StreamingBodyDecoder(content_charset(content_type), self.max_body_size)
+                for chunk in response.iter_content(chunk_size=DEFAULT_CHUNK_SIZE):
+                    decoder.feed(chunk)
+
+                logger.debug(f"Fetched content from {url}")
+
+                return FetchResponse(
+                    content=decoder.finish(),  # For textual content like HTML
+                    status_code=response.status_code,
+                    validators=CacheValidators.from_response_headers(response.headers),
+                )
+            finally:
+                response.close()
+        except requests.HTTPError as e:
+            status_code = e.response.status_code if e.response is not None else None
+            if status_code is not None and is_retryable_status(status_code):
+                retry_after = parse_retry_after(e.response.headers.get("Retry-After"))
+                raise TransientFetchError(f"Error fetching content from {url}: {e}", status_code, retry_after)
+            raise ValueError(f"Error fetching content from {url}: {e}")
+        except (requests.Timeout, requests.ConnectionError) as e:
+            raise TransientFetchError(f"Network error while fetching content from {url}: {e}")
         except requests.RequestException as e:
             raise ValueError(f"Error fetching content from {url}: {e}")
 
+    async def get_robots_txt(self, url: str) -> Optional[str]:
+        return await asyncio.to_thread(self._fetch_robots_txt, url)
+
+    def _fetch_robots_txt(self, url: str) -> Optional[str]:
+        try:
+            response = requests.get(url, headers={"User-Agent": self.user_agent}, timeout=60, stream=True)
+            try:
+                if 400 <= response.status_code < 500:
+                    return None
+                response.raise_for_status()
+
+                body = bytearray()
+                for chunk in response.iter_content(chunk_size=DEFAULT_CHUNK_SIZE):
+                    body.extend(chunk)
+                    if len(body) >= MAX_ROBOTS_TXT_SIZE:
+                        break
+                # rules past the size limit are ignored
+                return bytes(body[:MAX_ROBOTS_TXT_SIZE]).decode("utf-8", errors="replace")
+            finally:
+                response.close()
+        except requests.RequestException as e:
+            raise ValueError(f"Error fetching robots.txt from {url}: {e}")
 
+    async def stream_resource(self, url: str) -> AsyncIterator[bytes]:
+        response = await asyncio.to_thread(self._open_stream, url)
+        try:
+            chunks = response.iter_content(chunk_size=DEFAULT_CHUNK_SIZE)
+            while True:
+                # every chunk is read in a thread so that a slow body does not block the event loop
+                chunk = await asyncio.to_thread(next, chunks, None)
+                if chunk is None:
+                    break
+                yield chunk
+        except requests.RequestException as e:
+            raise ValueError(f"Error fetching {url}: {e}")
+        finally:
+            response.close()
+
+    def _open_stream(self, url: str) -> requests.Response:
+        try:
+            response = requests.get(url, headers={"User-Agent": self.user_agent}, timeout=60, stream=True)
+        except requests.RequestException as e:
+            raise ValueError(f"Error fetching {url}: {e}")
+        try:
+            response.raise_for_status()
+        except requests.HTTPError as e:
+            response.close()
+            raise ValueError(f"Error fetching {url}: {e}")
+        return response
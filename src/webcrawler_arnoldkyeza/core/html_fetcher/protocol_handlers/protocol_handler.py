@@ -1,6 +1,9 @@
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
-from typing import Optional, Any
+from typing import Any, AsyncIterator, Optional
+
+DEFAULT_USER_AGENT = "WebCrawler/0.0.1"
+MAX_ROBOTS_TXT_SIZE = 500 * 1024
 
 
 class AbstractProtocolHandler(ABC):
@@ -9,6 +12,25 @@ class AbstractProtocolHandler(ABC):
     async def get_content(self, *args, **kwargs) -> Optional[Any]:
         pass
 
+    async def get_robots_txt(self, url: str) -> Optional[str]:
+        """
+        Return the body of the robots.txt at `url`, or None when the server has none (4xx).
+        Handlers without a notion of robots.txt allow everything.
+        """
+        return None
+
+    async def stream_resource(self, url: str) -> AsyncIterator[bytes]:
+        """
+        Yield the raw body of `url` (undecoded, possibly compressed) chunk by chunk, for resources such as sitemaps
+        that are read incrementally instead of as a page. Handlers that cannot stream yield nothing.
+        """
+        return
+        yield
+
+    async def close(self) -> None:
+        """Release any resources (connections, files) held by the handler."""
+        pass
+
 
 @dataclass
 class ProtocolHandler(AbstractProtocolHandler):
@@ -0,0 +1,205 @@
+import asyncio
+import random
+from dataclasses import dataclass, field
+from typing import AsyncIterator, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from webcrawler_arnoldkyeza.core.html_fetcher.fetch_response import CacheValidators, FetchResponse, NOT_MODIFIED
+from webcrawler_arnoldkyeza.core.html_fetcher.protocol_handlers.body_reader import (
+    DEFAULT_CHUNK_SIZE,
+    DEFAULT_MAX_BODY_SIZE,
+    StreamingBodyDecoder,
+    check_response_headers,
+    content_charset,
+)
+from webcrawler_arnoldkyeza.core.html_fetcher.protocol_handlers.errors import TransientFetchError
+from webcrawler_arnoldkyeza.core.html_fetcher.protocol_handlers.protocol_handler import ProtocolHandler
+from webcrawler_arnoldkyeza.core.html_fetcher.warc_archive import METADATA, WARCArchive, WARCWriter
+
+TRANSIENT_ERROR = "transient"
+PERMANENT_ERROR = "permanent"
+NOT_FOUND = 404
+
+
+def _response_headers(content_type: str, validators: CacheValidators) -> List[Tuple[str, str]]:
+    headers = [("Content-Type", content_type)]
+    if validators.etag:
+        headers.append(("ETag", validators.etag))
+    if validators.last_modified:
+        headers.append(("Last-Modified", validators.last_modified))
+    return headers
+
+
+@dataclass
+class WARCRecordingHandler(ProtocolHandler):
+    """
+    Wraps another handler and writes everything it returns to a WARC file: pages (already decoded, re-encoded as
+    UTF-8 together with their validators), robots.txt files (a missing one as a 404) and errors, so that
+    `WARCReplayHandler` can serve the same crawl again offline.
+    """
+    handler: ProtocolHandler
+    writer: WARCWriter
+
+    async def get_content(self, url, validators: Optional[CacheValidators] = None) -> Optional[FetchResponse]:
+        try:
+            response = await self.handler.get_content(url, validators=validators)
+        except Exception as e:
+            self._write_error(url, e)
+            raise
+
+        if response is not None:
+            body = response.content.encode("utf-8") if response.content is not None else b""
+            reason = "Not Modified" if response.not_modified else "OK"
+            headers = _response_headers("text/html; charset=utf-8", response.validators)
+            self.writer.write_response(url, response.status_code, reason, headers, body)
+        return response
+
+    async def get_robots_txt(self, url: str) -> Optional[str]:
+        try:
+            robots_txt = await self.handler.get_robots_txt(url)
+        except Exception as e:
+            self._write_error(url, e)
+            raise
+
+        headers = [("Content-Type", "text/plain; charset=utf-8")]
+        if robots_txt is None:
+            self.writer.write_response(url, NOT_FOUND, "Not Found", headers, b"")
+        else:
+            self.writer.write_response(url, 200, "OK", headers, robots_txt.encode("utf-8"))
+        return robots_txt
+
+    async def stream_resource(self, url: str) -> AsyncIterator[bytes]:
+        body = bytearray()
+        try:
+            async for chunk in self.handler.stream_resource(url):
+                body.extend(chunk)
+                yield chunk
+        except Exception as e:
+            self._write_error(url, e)
+            raise
+        self.writer.write_response(url, 200, "OK", [("Content-Type", "application/octet-stream")], bytes(body))
+
+    def _write_error(self, url: str, error: Exception) -> None:
+        fields = {"error": TRANSIENT_ERROR if isinstance(error, TransientFetchError) else PERMANENT_ERROR}
+        if isinstance(error, TransientFetchError):
+            if error.status_code is not None:
+                fields["status"] = str(error.status_code)
+            if error.retry_after is not None:
+                fields["retry-after"] = str(error.retry_after)
+        fields["message"] = " ".join(str(error).split())
+        self.writer.write_metadata(url, fields)
+
+    async def close(self) -> None:
+        try:
+            await self.handler.close()
+        finally:
+            self.writer.close()
+
+
+@dataclass
+class WARCReplayHandler(ProtocolHandler):
+    """
+    Serves pages, robots.txt files and streamed resources from recorded WARC archives instead of the network.
+
+    Conditional requests are answered from the recorded validators, recorded errors are raised again, and URLs that
+    were never recorded fail like a missing page. `latency` (plus up to `latency_jitter`, drawn from a generator
+    seeded with `seed`) is awaited before every response to simulate network time reproducibly.
+    """
+    archive: WARCArchive
+    latency: float = field(default=0.0)
+    latency_jitter: float = field(default=0.0)
+    seed: int = field(default=0)
+    max_body_size: Optional[int] = field(default=DEFAULT_MAX_BODY_SIZE)
+    _random: random.Random = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self._random = random.Random(self.seed)
+
+    async def get_content(self, url, validators: Optional[CacheValidators] = None) -> Optional[FetchResponse]:
+        schema = urlparse(url).scheme
+        if not schema in ["http", "https"]:
+            return None
+
+        await self._simulate_latency()
+        record = self.archive.get(url)
+        if record is None:
+            raise ValueError(f"Error fetching content from {url}: not in the WARC archive")
+        if record.record_type == METADATA:
+            self._raise_error(url, record.fields())
+
+        http = record.http_response()
+        if http.status_code >= 400:
+            raise ValueError(f"Error fetching content from {url}: {http.status_code}")
+
+        recorded = CacheValidators.from_response_headers(
+            {"ETag": http.headers.get("etag"), "Last-Modified": http.headers.get("last-modified")}
+        )
+        if http.status_code == NOT_MODIFIED or self._is_fresh(validators, recorded):
+            return FetchResponse(content=None, status_code=NOT_MODIFIED, validators=recorded)
+
+        content_type = check_response_headers(
+            {"Content-Type": http.headers.get("content-type", ""), "Content-Length": str(len(http.body))},
+            self.max_body_size,
+        )
+        decoder = StreamingBodyDecoder(content_charset(content_type), self.max_body_size)
+        decoder.feed(http.body)
+        return FetchResponse(content=decoder.finish(), status_code=http.status_code, validators=recorded)
+
+    async def get_robots_txt(self, url: str) -> Optional[str]:
+        await self._simulate_latency()
+        record = self.archive.get(url)
+        if record is None:
+            return None
+        if record.record_type == METADATA:
+            fields = record.fields()
+            raise ValueError(f"Error fetching robots.txt from {url}: {fields.get('message', '')}")
+
+        http = record.http_response()
+        if 400 <= http.status_code < 500:
+            return None
+        return http.body.decode("utf-8", errors="replace")
+
+    async def stream_resource(self, url: str) -> AsyncIterator[bytes]:
+        await self._simulate_latency()
+        record = self.archive.get(url)
+        if record is None:
+            raise ValueError(f"Error fetching {url}: not in the WARC archive")
+        if record.record_type == METADATA:
+            self._raise_error(url, record.fields())
+
+        http = record.http_response()
+        if http.status_code >= 400:
+            raise ValueError(f"Error fetching {url}: {http.status_code}")
+        for offset in range(0, len(http.body), DEFAULT_CHUNK_SIZE):
+            yield http.body[offset:offset + DEFAULT_CHUNK_SIZE]
+
+    @staticmethod
+    def _is_fresh(validators: Optional[CacheValidators], recorded: CacheValidators) -> bool:
+        if not validators:
+            return False
+        if validators.etag:
+            return validators.etag == recorded.etag
+        return validators.last_modified is not None and validators.last_modified == recorded.last_modified
+
+    @staticmethod
+    def _raise_error(url: str, fields: dict) -> None:
+        message = fields.get("message") or f"Error fetching content from {url}"
+        if fields.get("error") == TRANSIENT_ERROR:
+            status = fields.get("status")
+            retry_after = fields.get("retry-after")
+            raise TransientFetchError(
+                message,
+                int(status) if status else None,
+                float(retry_after) if retry_after else None,
+            )
+        raise ValueError(message)
+
+    async def _simulate_latency(self) -> None:
+        delay = self.latency
+        if self.latency_jitter:
+            delay += self._random.uniform(0, self.latency_jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def close(self) -> None:
+        self.archive.close()
@@ -0,0 +1,206 @@
+"""
+WARC archive:
+    Minimal WARC/1.1 writer and reader used to record crawls and replay them without touching the network.
+
+Records written:
+    - response: an `application/http;msgtype=response` block holding the status line, headers and body the crawler
+                received for the target URI.
+    - metadata: an `application/warc-fields` block describing a failed fetch (error kind, status, Retry-After and
+                message) so that failures replay exactly like successes.
+
+The reader memory-maps each file and indexes it by scanning the WARC headers only, skipping over blocks by their
+Content-Length, so opening a large archive does not read the bodies and a lookup only touches the bytes of one record.
+"""
+import datetime
+import logging
+import mmap
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import BinaryIO, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+WARC_VERSION = b"WARC/1.1"
+CRLF = b"\r\n"
+RESPONSE = "response"
+METADATA = "metadata"
+HTTP_RESPONSE_CONTENT_TYPE = "application/http;msgtype=response"
+WARC_FIELDS_CONTENT_TYPE = "application/warc-fields"
+
+
+class WARCFormatError(Exception):
+    def __init__(self, path: Path, offset: int, message: str):
+        super().__init__(f"Invalid WARC record in {path} at offset {offset}: {message}")
+
+
+def _parse_header_lines(block: bytes) -> Dict[str, str]:
+    headers: Dict[str, str] = {}
+    for line in block.split(CRLF):
+        name, sep, value = line.decode("utf-8", errors="replace").partition(":")
+        if sep:
+            headers[name.strip().lower()] = value.strip()
+    return headers
+
+
+@dataclass
+class HTTPRecord:
+    status_code: int
+    headers: Dict[str, str]
+    body: bytes
+
+
+@dataclass
+class WARCRecord:
+    record_type: str
+    target_uri: str
+    block: bytes
+
+    def http_response(self) -> HTTPRecord:
+        """Split a response record into its status code, (lower-cased) headers and body."""
+        head, _, body = self.block.partition(CRLF + CRLF)
+        status_line, _, header_lines = head.partition(CRLF)
+        parts = status_line.split()
+        status_code = int(parts[1]) if len(parts) > 1 and parts[1].isdigit() else 0
+        return HTTPRecord(status_code=status_code, headers=_parse_header_lines(header_lines), body=body)
+
+    def fields(self) -> Dict[str, str]:
+        return _parse_header_lines(self.block)
+
+
+@dataclass
+class WARCWriter:
+    path: Path
+    _file: Optional[BinaryIO] = field(default=None, init=False, repr=False)
+
+    def write_response(self, url: str, status_code: int, reason: str, headers: Sequence[Tuple[str, str]],
+                       body: bytes) -> None:
+        head = [f"HTTP/1.1 {status_code} {reason}".encode("utf-8")]
+        head.extend(f"{name}: {value}".encode("utf-8") for name, value in headers)
+        block = CRLF.join(head) + CRLF + CRLF + body
+        self._write(RESPONSE, url, HTTP_RESPONSE_CONTENT_TYPE, block)
+
+    def write_metadata(self, url: str, fields: Dict[str, str]) -> None:
+        block = b"".join(f"{name}: {value}".encode("utf-8") + CRLF for name, value in fields.items())
+        self._write(METADATA, url, WARC_FIELDS_CONTENT_TYPE, block)
+
+    def _write(self, record_type: str, url: str, content_type: str, block: bytes) -> None:
+        if self._file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.path, "ab")
+
+        date = datetime.datetime.now(datetime.timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        header = CRLF.join([
+            WARC_VERSION,
+            f"WARC-Type: {record_type}".encode("utf-8"),
+            f"WARC-Record-ID: <urn:uuid:{uuid.uuid4()}>".encode("utf-8"),
+            f"WARC-Date: {date}".encode("utf-8"),
+            f"WARC-Target-URI: {url}".encode("utf-8"),
+            f"Content-Type: {content_type}".encode("utf-8"),
+            f"Content-Length: {len(block)}".encode("utf-8"),
+        ])
+        self._file.write(header + CRLF + CRLF + block + CRLF + CRLF)
+        # flushed per record so that an interrupted crawl still leaves a readable archive
+        self._file.flush()
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+@dataclass
+class WARCIndexEntry:
+    file_index: int
+    offset: int
+    length: int
+    record_type: str
+    status_code: Optional[int] = field(default=None)
+
+
+@dataclass
+class WARCArchive:
+    """
+    Read-only view over one or more WARC files, indexed by target URI. When a URI was recorded several times the
+    last record wins, except that a 304 never hides a full response recorded before it.
+    """
+    paths: List[Path]
+    _maps: List[mmap.mmap] = field(default_factory=list, init=False, repr=False)
+    _index: Dict[str, WARCIndexEntry] = field(default_factory=dict, init=False, repr=False)
+
+    def __post_init__(self):
+        for path in self.paths:
+            self._add_file(Path(path))
+        logger.info(f"Indexed {len(self._index)} URLs from {len(self.paths)} WARC file(s)")
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, url: str) -> bool:
+        return url in self._index
+
+    def get(self, url: str) -> Optional[WARCRecord]:
+        entry = self._index.get(url)
+        if entry is None:
+            return None
+        data = self._maps[entry.file_index]
+        return WARCRecord(
+            record_type=entry.record_type,
+            target_uri=url,
+            block=bytes(data[entry.offset:entry.offset + entry.length]),
+        )
+
+    def close(self) -> None:
+        for data in self._maps:
+            data.close()
+        self._maps.clear()
+        self._index.clear()
+
+    def _add_file(self, path: Path) -> None:
+        with open(path, "rb") as file:
+            if path.stat().st_size == 0:
+                return
+            data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        file_index = len(self._maps)
+        self._maps.append(data)
+
+        offset = 0
+        size = len(data)
+        while offset < size:
+            header_end = data.find(CRLF + CRLF, offset)
+            if header_end < 0:
+                raise WARCFormatError(path, offset, "truncated record header")
+            if not data[offset:offset + len(WARC_VERSION)].startswith(b"WARC/"):
+                raise WARCFormatError(path, offset, "missing WARC version line")
+
+            headers = _parse_header_lines(data[offset:header_end])
+            try:
+                length = int(headers["content-length"])
+            except (KeyError, ValueError):
+                raise WARCFormatError(path, offset, "missing Content-Length")
+
+            block_offset = header_end + 4
+            record_type = headers.get("warc-type", "")
+            url = headers.get("warc-target-uri")
+            if url and record_type in (RESPONSE, METADATA):
+                self._add_entry(url, WARCIndexEntry(
+                    file_index=file_index,
+                    offset=block_offset,
+                    length=length,
+                    record_type=record_type,
+                    status_code=self._status_code(data, block_offset) if record_type == RESPONSE else None,
+                ))
+
+            offset = block_offset + length + 4  # the block is followed by two CRLFs
+
+    def _add_entry(self, url: str, entry: WARCIndexEntry) -> None:
+        previous = self._index.get(url)
+        if entry.status_code == 304 and previous is not None and previous.record_type == RESPONSE:
+            return
+        self._index[url] = entry
+
+    @staticmethod
+    def _status_code(data: mmap.mmap, offset: int) -> Optional[int]:
+        status_line = data[offset:data.find(CRLF, offset)].split()
+        return int(status_line[1]) if len(status_line) > 1 and status_line[1].isdigit() else None
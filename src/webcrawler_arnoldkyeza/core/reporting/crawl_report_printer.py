@@ -1,17 +1,20 @@
 import sys
 from dataclasses import dataclass
-from typing import Dict, List, TextIO
+from typing import Iterator, List, TextIO, Tuple
 
 from webcrawler_arnoldkyeza.core.datastore.database_manager import DatabaseManager
 
+# the report is written in chunks of about this many characters rather than a line at a time
+WRITE_BUFFER_SIZE = 64 * 1024
+
 
 @dataclass
 class CrawlReportPrinter:
     database_manager: DatabaseManager
 
-    def build_report(self) -> Dict[str, List[str]]:
+    def build_report(self) -> Iterator[Tuple[str, List[str]]]:
         """
-        Build a mapping of visited (crawled) page URL -> list of links extracted on that page.
+        Stream the visited (crawled) page URLs, each with the list of links extracted on that page.
         """
         return self.database_manager.get_crawled_urls_with_extracted()
 
@@ -27,13 +30,20 @@ class CrawlReportPrinter:
         if stream is None:
             stream = sys.stdout
 
-        report = self.build_report()
-        for visited_url, extracted in report.items():
-            print(f"Visited: {visited_url}", file=stream)
-            print("Extracted:", file=stream)
+        pending: List[str] = []
+        pending_size = 0
+        for visited_url, extracted in self.build_report():
+            lines = [f"Visited: {visited_url}", "Extracted:"]
             if not extracted:
-                print("- (none)", file=stream)
+                lines.append("- (none)")
             else:
-                for child in extracted:
-                    print(f"- {child}", file=stream)
-            print("", file=stream)
+                lines.extend(f"- {child}" for child in extracted)
+            group = "\n".join(lines) + "\n\n"
+            pending.append(group)
+            pending_size += len(group)
+            if pending_size >= WRITE_BUFFER_SIZE:
+                stream.write("".join(pending))
+                pending.clear()
+                pending_size = 0
+        stream.write("".join(pending))
+        stream.flush()
@@ -0,0 +1,65 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+from webcrawler_arnoldkyeza.core.html_fetcher.html_fetcher import HTMLFetcher
+from webcrawler_arnoldkyeza.core.html_fetcher.protocol_handlers.protocol_handler import DEFAULT_USER_AGENT
+from webcrawler_arnoldkyeza.core.robots.robots_rules import ROBOTS_TXT_PATH, RobotsRules, parse_robots_txt
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RobotsCache:
+    """
+    Fetches robots.txt once per origin and keeps the compiled rules for `ttl` seconds.
+
+    A missing robots.txt (4xx) allows everything. When robots.txt cannot be fetched (5xx or network error) the
+    origin is allowed as well, but only for `error_ttl` seconds so that the file is retried soon; discovered URLs
+    are dropped for good when disallowed, so a transient outage should not cost the whole site.
+    """
+    fetcher: HTMLFetcher
+    user_agent: str = field(default=DEFAULT_USER_AGENT)
+    ttl: float = field(default=24 * 60 * 60)
+    error_ttl: float = field(default=5 * 60)
+    clock: Callable[[], float] = field(default=time.monotonic, repr=False)
+    _entries: Dict[str, Tuple[float, RobotsRules]] = field(default_factory=dict, init=False, repr=False)
+    _pending: Dict[str, asyncio.Future] = field(default_factory=dict, init=False, repr=False)
+
+    async def is_allowed(self, url: str) -> bool:
+        rules = await self.rules_for(url)
+        return rules.is_allowed(url)
+
+    async def rules_for(self, url: str) -> RobotsRules:
+        parsed_url = urlparse(url)
+        origin = f"{parsed_url.scheme}://{parsed_url.netloc}"
+
+        entry = self._entries.get(origin)
+        if entry is not None and entry[0] > self.clock():
+            return entry[1]
+
+        lookup = self._pending.get(origin)
+        if lookup is None:
+            lookup = asyncio.ensure_future(self._load(origin))
+            self._pending[origin] = lookup
+        return await asyncio.shield(lookup)
+
+    async def _load(self, origin: str) -> RobotsRules:
+        robots_url = f"{origin}{ROBOTS_TXT_PATH}"
+        try:
+            text = await self.fetcher.fetch_robots_txt(robots_url)
+            rules = RobotsRules.allow_all() if text is None else parse_robots_txt(text, self.user_agent)
+            expires_at = self.clock() + self.ttl
+            logger.debug(f"Loaded robots.txt from {robots_url}: {len(rules.rules)} rules")
+        except Exception as e:
+            logger.warning(f"Could not fetch {robots_url}, allowing crawl for now: {e}")
+            rules = RobotsRules.allow_all()
+            expires_at = self.clock() + self.error_ttl
+        finally:
+            self._pending.pop(origin, None)
+
+        self._entries[origin] = (expires_at, rules)
+        return rules
@@ -0,0 +1,145 @@
+"""
+Robots rules:
+    Parses a robots.txt file (RFC 9309) into the group that applies to the crawler and compiles its
+    Allow/Disallow lines into a matcher that is evaluated once per discovered URL.
+
+Matching follows the RFC: the rule with the longest pattern wins, Allow wins a tie, and a path matched by no rule
+is allowed. Patterns without `*` or `$` are plain prefix checks; the others are compiled to regular expressions.
+"""
+import re
+from dataclasses import dataclass, field
+from typing import List, Optional, Pattern
+from urllib.parse import urlparse
+
+ROBOTS_TXT_PATH = "/robots.txt"
+
+
+@dataclass
+class RobotsRule:
+    pattern: str
+    allow: bool
+    _prefix: Optional[str] = field(default=None, init=False, repr=False)
+    _regex: Optional[Pattern[str]] = field(default=None, init=False, repr=False)
+
+    def __post_init__(self):
+        if "*" in self.pattern or self.pattern.endswith("$"):
+            anchored = self.pattern.endswith("$")
+            body = self.pattern[:-1] if anchored else self.pattern
+            expression = ".*".join(re.escape(part) for part in body.split("*"))
+            self._regex = re.compile(expression + ("$" if anchored else ""))
+        else:
+            self._prefix = self.pattern
+
+    def matches(self, path: str) -> bool:
+        if self._prefix is not None:
+            return path.startswith(self._prefix)
+        return self._regex.match(path) is not None
+
+
+@dataclass
+class RobotsRules:
+    rules: List[RobotsRule] = field(default_factory=list)
+    crawl_delay: Optional[float] = field(default=None)
+    sitemaps: List[str] = field(default_factory=list)
+
+    def __post_init__(self):
+        # most specific first, Allow before Disallow on equal length, so the first match decides
+        self.rules.sort(key=lambda rule: (-len(rule.pattern), not rule.allow))
+
+    @classmethod
+    def allow_all(cls) -> "RobotsRules":
+        return cls()
+
+    @classmethod
+    def disallow_all(cls) -> "RobotsRules":
+        return cls(rules=[RobotsRule(pattern="/", allow=False)])
+
+    def is_allowed(self, url: str) -> bool:
+        if not self.rules:
+            return True
+
+        parsed_url = urlparse(url)
+        path = parsed_url.path or "/"
+        if path == ROBOTS_TXT_PATH:
+            return True
+        if parsed_url.query:
+            path = f"{path}?{parsed_url.query}"
+
+        for rule in self.rules:
+            if rule.matches(path):
+                return rule.allow
+        return True
+
+
+def product_token(user_agent: str) -> str:
+    return user_agent.split("/", 1)[0].strip().lower()
+
+
+def parse_robots_txt(text: str, user_agent: str) -> RobotsRules:
+    """
+    Build the rules of the group matching `user_agent`'s product token, falling back to the `*` group.
+    Groups naming the same agent are merged, as required by the RFC.
+    """
+    token = product_token(user_agent)
+    matched: List[RobotsRule] = []
+    wildcard: List[RobotsRule] = []
+    matched_delay: Optional[float] = None
+    wildcard_delay: Optional[float] = None
+    matched_any = False
+    sitemaps: List[str] = []
+
+    group_agents: List[str] = []
+    in_rules = False
+    for raw_line in text.splitlines():
+        line = raw_line.split("#", 1)[0].strip()
+        if ":" not in line:
+            continue
+        key, value = line.split(":", 1)
+        key = key.strip().lower()
+        value = value.strip()
+
+        if key == "sitemap":
+            if value:
+                sitemaps.append(value)
+            continue
+
+        if key == "user-agent":
+            if in_rules:
+                group_agents = []
+                in_rules = False
+            group_agents.append(value.lower())
+            continue
+
+        if key not in ("allow", "disallow", "crawl-delay"):
+            continue
+        in_rules = True
+        is_matched = token in group_agents
+        is_wildcard = "*" in group_agents
+        if is_matched:
+            matched_any = True
+        if not (is_matched or is_wildcard):
+            continue
+
+        if key == "crawl-delay":
+            try:
+                delay = float(value)
+            except ValueError:
+                continue
+            if is_matched:
+                matched_delay = delay
+            if is_wildcard:
+                wildcard_delay = delay
+            continue
+
+        if not value:
+            # an empty Disallow allows everything, which is the default
+            continue
+        rule = RobotsRule(pattern=value, allow=key == "allow")
+        if is_matched:
+            matched.append(rule)
+        if is_wildcard:
+            wildcard.append(rule)
+
+    if matched_any:
+        return RobotsRules(rules=matched, crawl_delay=matched_delay, sitemaps=sitemaps)
+    return RobotsRules(rules=wildcard, crawl_delay=wildcard_delay, sitemaps=sitemaps)
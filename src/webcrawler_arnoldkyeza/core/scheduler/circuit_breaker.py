@@ -0,0 +1,52 @@
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Optional
+
+
+@dataclass
+class CircuitState:
+    consecutive_failures: int = field(default=0)
+    open_until: float = field(default=0.0)
+    trips: int = field(default=0)
+
+
+@dataclass
+class HostCircuitBreaker:
+    """
+    Stops dispatching to a host after `failure_threshold` consecutive transient failures.
+
+    The circuit stays open for `cool_down` seconds. Once it has elapsed, the host is probed again; any further
+    failure before a success re-opens it with a doubled cool-down (up to `max_cool_down`), and a success closes it.
+    """
+    failure_threshold: int = field(default=5)
+    cool_down: float = field(default=30.0)
+    max_cool_down: float = field(default=300.0)
+    clock: Callable[[], float] = field(default=time.monotonic, repr=False)
+    _circuits: Dict[str, CircuitState] = field(default_factory=dict, init=False, repr=False)
+
+    def is_open(self, host: str) -> bool:
+        circuit = self._circuits.get(host)
+        return circuit is not None and circuit.open_until > self.clock()
+
+    def record_success(self, host: str) -> None:
+        self._circuits.pop(host, None)
+
+    def record_failure(self, host: str) -> Optional[float]:
+        """Count a failure and return the cool-down in seconds when it opens the circuit."""
+        if self.failure_threshold <= 0:
+            return None
+
+        circuit = self._circuits.setdefault(host, CircuitState())
+        circuit.consecutive_failures += 1
+        if circuit.consecutive_failures < self.failure_threshold:
+            return None
+
+        now = self.clock()
+        if circuit.open_until > now:
+            # failures of fetches that were already in flight when the circuit opened
+            return None
+
+        cool_down = min(self.max_cool_down, self.cool_down * 2 ** circuit.trips)
+        circuit.trips += 1
+        circuit.open_until = now + cool_down
+        return cool_down
@@ -1,8 +1,9 @@
 import datetime
 from dataclasses import dataclass, field
-from typing import Optional
+from typing import Any, Mapping, Optional
 
 from webcrawler_arnoldkyeza.core.enums.url_status_type import UrlStatusType
+from webcrawler_arnoldkyeza.core.utils import from_epoch
 
 
 @dataclass(order=True)
@@ -10,8 +11,9 @@ class Url:
     url: str
     normalized_url: str
     priority: int = field(default=1)  # ideally, this should be based on the importance of the website
-    update_frequency: int = field(
-        default=1)  # ideally, this should be based on how often the content on the URL is expected to change
+    # days after the last crawl that the URL is due for a recrawl; ideally, this should be based on how often
+    # the content on the URL is expected to change
+    update_frequency: int = field(default=1)
     last_crawled_at: Optional[datetime.datetime] = field(default=None)
     status: UrlStatusType = field(default=UrlStatusType.PENDING)
     parent_url_id: Optional[int] = field(default=None)
@@ -19,4 +21,25 @@ class Url:
     depth: Optional[int] = field(default=0)
     created_at: Optional[datetime.datetime] = field(default=None)
     url_id: Optional[int] = field(default=None)
+    etag: Optional[str] = field(default=None)
+    last_modified: Optional[str] = field(default=None)
+    attempts: int = field(default=0)
+    lastmod: Optional[str] = field(default=None)  # as given by the sitemap listing the URL
+    sitemap_priority: Optional[float] = field(default=None)  # set only for URLs loaded from a sitemap
 
+    @classmethod
+    def from_row(cls, row: Mapping[str, Any], normalized_url: Optional[str] = None) -> "Url":
+        """
+        Build the URL from a row of the `urls` table, which stores it in compact form: a NULL `url` when it is the
+        normalized URL, integer status codes and epoch timestamps. `normalized_url` is taken from the row unless
+        given, for statements that cannot join the hosts table.
+        """
+        values = {key: row[key] for key in row.keys()}
+        if normalized_url is not None:
+            values["normalized_url"] = normalized_url
+        if values["url"] is None:
+            values["url"] = values["normalized_url"]
+        values["status"] = UrlStatusType.from_code(values["status"])
+        values["last_crawled_at"] = from_epoch(values["last_crawled_at"])
+        values["created_at"] = from_epoch(values["created_at"])
+        return cls(**values)
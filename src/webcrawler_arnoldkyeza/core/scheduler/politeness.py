@@ -0,0 +1,176 @@
+"""
+Politeness:
+    Per-host pacing for the Scheduler so that adding workers does not hammer a single server.
+
+Each host gets:
+    - a token bucket: `requests_per_second` tokens are added per second up to `burst`; a fetch costs one token.
+    - an in-flight cap: at most `max_in_flight_per_host` URLs of the host are being fetched at the same time.
+    - a backlog: URLs pulled from the frontier while their host was not allowed to be hit yet, kept in
+                 (depth, url) order.
+
+A host can also be blocked for a while (see `block`); its ready time is then pushed back to the end of the block.
+
+Hosts with a backlog sit in a ready-time heap keyed by the moment their bucket has a token again. Hosts that
+are blocked by the in-flight cap are taken out of the heap and put back when one of their fetches is released.
+"""
+import heapq
+import itertools
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+
+@dataclass
+class TokenBucket:
+    rate: float
+    capacity: float
+    tokens: float = field(init=False)
+    updated_at: Optional[float] = field(default=None, init=False)
+
+    def __post_init__(self):
+        self.tokens = self.capacity
+
+    def _refill(self, now: float) -> None:
+        if self.updated_at is not None:
+            elapsed = max(0.0, now - self.updated_at)
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+        self.updated_at = now
+
+    def delay(self, now: float) -> float:
+        """Seconds until a token is available (0 when one is available now)."""
+        self._refill(now)
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def consume(self, now: float) -> bool:
+        if self.delay(now) > 0:
+            return False
+        self.tokens -= 1
+        return True
+
+
+@dataclass
+class HostState:
+    bucket: Optional[TokenBucket]
+    in_flight: int = field(default=0)
+    backlog: List[Tuple[int, str]] = field(default_factory=list)
+    scheduled: bool = field(default=False)
+    blocked_until: float = field(default=0.0)
+
+
+@dataclass
+class HostPoliteness:
+    requests_per_second: Optional[float] = field(default=4.0)
+    burst: int = field(default=4)
+    max_in_flight_per_host: int = field(default=4)
+    clock: Callable[[], float] = field(default=time.monotonic, repr=False)
+    _hosts: Dict[str, HostState] = field(default_factory=dict, init=False, repr=False)
+    _ready_heap: List[Tuple[float, int, str]] = field(default_factory=list, init=False, repr=False)
+    _sequence: itertools.count = field(default_factory=itertools.count, init=False, repr=False)
+    _parked_count: int = field(default=0, init=False)
+
+    @property
+    def parked_count(self) -> int:
+        return self._parked_count
+
+    @staticmethod
+    def host_of(url: str) -> str:
+        return (urlparse(url).hostname or "").lower()
+
+    def _state(self, host: str) -> HostState:
+        state = self._hosts.get(host)
+        if state is None:
+            bucket = None
+            if self.requests_per_second:
+                bucket = TokenBucket(rate=self.requests_per_second, capacity=max(1, self.burst))
+            state = HostState(bucket=bucket)
+            self._hosts[host] = state
+        return state
+
+    def set_crawl_delay(self, host: str, crawl_delay: float) -> None:
+        """Limit the host to one request every `crawl_delay` seconds when that is stricter than the default rate."""
+        if crawl_delay <= 0:
+            return
+        state = self._state(host)
+        rate = 1.0 / crawl_delay
+        if state.bucket is None or state.bucket.rate > rate:
+            state.bucket = TokenBucket(rate=rate, capacity=1)
+
+    def block(self, host: str, seconds: float) -> None:
+        """Stop handing out URLs of the host for `seconds`, e.g. while its circuit breaker is open."""
+        state = self._state(host)
+        state.blocked_until = max(state.blocked_until, self.clock() + seconds)
+
+    def _delay(self, state: HostState, now: float) -> float:
+        delay = state.bucket.delay(now) if state.bucket is not None else 0.0
+        return max(delay, state.blocked_until - now)
+
+    def _is_capped(self, state: HostState) -> bool:
+        return self.max_in_flight_per_host > 0 and state.in_flight >= self.max_in_flight_per_host
+
+    def _schedule(self, host: str, state: HostState, now: float) -> None:
+        if state.scheduled or not state.backlog or self._is_capped(state):
+            return
+        state.scheduled = True
+        heapq.heappush(self._ready_heap, (now + self._delay(state, now), next(self._sequence), host))
+
+    def _acquire(self, state: HostState, now: float) -> None:
+        if state.bucket is not None:
+            state.bucket.consume(now)
+        state.in_flight += 1
+
+    def try_acquire(self, url: str) -> bool:
+        """
+        Grant a fetch slot for `url` if its host may be hit right now. URLs already parked for the host go first,
+        so a fresh URL is refused while the host still has a backlog.
+        """
+        now = self.clock()
+        state = self._state(self.host_of(url))
+        if state.backlog or self._is_capped(state) or self._delay(state, now) > 0:
+            return False
+        self._acquire(state, now)
+        return True
+
+    def park(self, priority: int, url: str) -> None:
+        host = self.host_of(url)
+        state = self._state(host)
+        heapq.heappush(state.backlog, (priority, url))
+        self._parked_count += 1
+        self._schedule(host, state, self.clock())
+
+    def pop_ready(self) -> Optional[Tuple[int, str]]:
+        """Return the next parked (priority, url) whose host may be hit now, acquiring a slot for it."""
+        now = self.clock()
+        while self._ready_heap and self._ready_heap[0][0] <= now:
+            _, _, host = heapq.heappop(self._ready_heap)
+            state = self._hosts[host]
+            state.scheduled = False
+            if not state.backlog or self._is_capped(state):
+                continue
+            if self._delay(state, now) > 0:
+                self._schedule(host, state, now)
+                continue
+
+            self._acquire(state, now)
+            item = heapq.heappop(state.backlog)
+            self._parked_count -= 1
+            self._schedule(host, state, now)
+            return item
+
+        return None
+
+    def next_ready_in(self) -> Optional[float]:
+        """Seconds until the earliest parked host becomes ready, or None when nothing is scheduled."""
+        if not self._ready_heap:
+            return None
+        return max(0.0, self._ready_heap[0][0] - self.clock())
+
+    def release(self, url: str) -> None:
+        host = self.host_of(url)
+        state = self._hosts.get(host)
+        if state is None or state.in_flight == 0:
+            return
+        state.in_flight -= 1
+        self._schedule(host, state, self.clock())
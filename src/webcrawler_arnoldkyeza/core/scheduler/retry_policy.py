@@ -0,0 +1,29 @@
+import random
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+from webcrawler_arnoldkyeza.core.html_fetcher.protocol_handlers.errors import TransientFetchError
+
+
+@dataclass
+class RetryPolicy:
+    """
+    Exponential backoff with jitter for transient fetch errors.
+
+    The n-th retry waits between half and all of `base_delay * 2 ** (n - 1)` seconds (capped at `max_delay`), and
+    never less than the server's Retry-After.
+    """
+    max_attempts: int = field(default=3)
+    base_delay: float = field(default=1.0)
+    max_delay: float = field(default=60.0)
+    random: Callable[[], float] = field(default=random.random, repr=False)
+
+    def should_retry(self, error: Exception, attempts: int) -> bool:
+        return isinstance(error, TransientFetchError) and attempts < self.max_attempts
+
+    def backoff(self, attempts: int, retry_after: Optional[float] = None) -> float:
+        delay = min(self.max_delay, self.base_delay * 2 ** max(0, attempts - 1))
+        delay = delay / 2 + self.random() * delay / 2
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
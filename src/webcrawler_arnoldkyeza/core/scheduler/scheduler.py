@@ -20,24 +20,62 @@ Implementation work-flow:
 - normalize the URL
 - pass it through the Duplicate Eliminator Component, which performs checksum comparisons against existing URLs
 - Discard if it's duplicate
+- Discard if the host's robots.txt disallows it
 - Add to RDB with URL metadata, priority and update frequency
 - Enqueue the URL to the URL Frontier
+
+Dispatching:
+- a worker is only handed a URL whose host passes the politeness layer (token bucket and in-flight cap per host)
+- URLs whose host is not ready yet are parked per host and released from a host ready-time heap
+- URLs that failed with a transient error are put back on the frontier after an exponential backoff, and a host
+  that keeps failing is paused by its circuit breaker
+
+Sitemaps:
+- when a sitemap ingester is set, the seed site's sitemaps are read in the background while the crawl runs
+- their URLs go through the same checks, are bulk-inserted into the RDB one batch at a time and start at depth 1
+- the frontier is refilled from those RDB rows whenever it drains below half, so a sitemap of any size only ever
+  holds a frontier's worth of URLs in memory
+
+Resuming:
+- on start every URL already in the RDB is marked as seen in one streaming pass, so pages crawled by an earlier
+  run are neither discovered nor fetched again
+- URLs still pending, or left in progress by an interrupted run, are fed to the frontier the same way as sitemap
+  URLs, in insertion order
+- crawled URLs whose update frequency has passed since their last crawl are pending again, so they are recrawled
+  with a conditional GET
 """
 import asyncio
+import datetime
+import heapq
 import logging
+import time
 from dataclasses import dataclass, field
-from typing import Optional, Tuple, List
+from typing import Any, Callable, Optional, Tuple, List
+from urllib.parse import urlparse
 
 from webcrawler_arnoldkyeza.core.datastore.database_manager import DatabaseManager
+from webcrawler_arnoldkyeza.core.datastore.write_behind_writer import WriteBehindWriter
 from webcrawler_arnoldkyeza.core.duplicate_eliminator.duplicate_eliminator import DuplicateEliminator
+from webcrawler_arnoldkyeza.core.html_fetcher.dns_cache import DNSCache, DEFAULT_PORTS
+from webcrawler_arnoldkyeza.core.html_fetcher.protocol_handlers.errors import TransientFetchError
+from webcrawler_arnoldkyeza.core.robots.robots_cache import RobotsCache
+from webcrawler_arnoldkyeza.core.scheduler.circuit_breaker import HostCircuitBreaker
 from webcrawler_arnoldkyeza.core.scheduler.errors import InvalidSeedUrlError
 from webcrawler_arnoldkyeza.core.scheduler.models.url import Url
 from webcrawler_arnoldkyeza.core.scheduler.models.url_frontier import UrlFrontier
+from webcrawler_arnoldkyeza.core.scheduler.politeness import HostPoliteness
+from webcrawler_arnoldkyeza.core.scheduler.retry_policy import RetryPolicy
+from webcrawler_arnoldkyeza.core.sitemaps.sitemap_ingester import SitemapIngester
+from webcrawler_arnoldkyeza.core.sitemaps.sitemap_parser import DEFAULT_SITEMAP_PRIORITY, SitemapEntry
 from webcrawler_arnoldkyeza.core.utils import normalize_url, is_same_subdomain
 
 logger = logging.getLogger(__name__)
 
-MAX_FETCH_COUNT = 10000
+MAX_PARKED_URLS = 10000
+NEXT_URL_TIMEOUT = 1.0
+SITEMAP_DEPTH = 1
+# URLs restored per bulk add on resume: every Redis command costs fakeredis a scan of the whole set
+RESUME_BATCH_SIZE = 100_000
 
 
 @dataclass
@@ -45,9 +83,22 @@ class Scheduler:
     url_frontier: UrlFrontier
     database_manager: DatabaseManager
     duplicate_eliminator: DuplicateEliminator
+    politeness: HostPoliteness = field(default_factory=HostPoliteness)
+    dns_cache: Optional[DNSCache] = field(default=None)
+    robots: Optional[RobotsCache] = field(default=None)
+    retry_policy: RetryPolicy = field(default_factory=RetryPolicy)
+    circuit_breaker: HostCircuitBreaker = field(default_factory=HostCircuitBreaker)
+    sitemap_ingester: Optional[SitemapIngester] = field(default=None)
+    writer: Optional[WriteBehindWriter] = field(default=None)
     seed_url: str = field(init=False)
     _max_depth: int = field(init=False, default=50)
     _current_depth: int = field(init=False, default=0)
+    _retries: List[Tuple[float, int, str]] = field(init=False, default_factory=list)
+    _ingestion: Optional[asyncio.Task] = field(init=False, default=None)
+    _sitemap_cursor: int = field(init=False, default=0)
+    _sitemap_backlog: bool = field(init=False, default=False)
+    _resume_cursor: int = field(init=False, default=0)
+    _resume_end: int = field(init=False, default=0)
 
     @property
     def current_depth(self) -> int:
@@ -57,14 +108,37 @@ class Scheduler:
         try:
             self.seed_url = seed_url
             self._max_depth = int(max_depth) if max_depth is not None else self._max_depth
-            pending_urls: List[Url] = self.database_manager.get_pending_urls(limit=MAX_FETCH_COUNT)
+            await self.resume()
             await self.enqueue_url(seed_url, is_seed=True)
-            for url_entry in pending_urls:
-                await self.url_frontier.queue.put((url_entry.priority, url_entry.normalized_url))
+            self._refill_from_database()
+
+            if self.sitemap_ingester is not None:
+                # rows that already exist were either queued above or are part of the resumed backlog
+                self._sitemap_cursor = self.database_manager.get_max_url_id()
+                self._ingestion = asyncio.create_task(self._ingest_sitemaps())
         except ValueError as e:
             logger.error(f"Invalid max_depth value: {e}")
             raise e
 
+    async def resume(self) -> None:
+        """
+        Pick up the state of an earlier crawl from the database: every stored URL is marked as seen, so that it is
+        not discovered again, and the pending ones, including those an interrupted crawl left in progress and those
+        due for a recrawl, are queued as the frontier has room for them.
+        """
+        interrupted = await self._write(self.database_manager.reset_in_progress_urls)
+        due = await self._write(self.database_manager.reset_urls_due_for_recrawl, datetime.datetime.now())
+        self._resume_end = self.database_manager.get_max_url_id()
+        if not self._resume_end:
+            return
+
+        started_at = time.monotonic()
+        restored = await asyncio.to_thread(
+            self.duplicate_eliminator.restore_seen_urls, self.database_manager.iter_normalized_urls(RESUME_BATCH_SIZE)
+        )
+        logger.info(f"Resuming crawl: {restored} known URLs restored in {time.monotonic() - started_at:.1f}s, "
+                    f"{interrupted} interrupted URLs back to pending, {due} URLs due for a recrawl")
+
     async def enqueue_url(self, url: str, depth: int = 0, is_seed=False) -> None:
         normalized_url = normalize_url(url)
         if normalized_url is None:
@@ -78,6 +152,11 @@ class Scheduler:
         if depth > self._max_depth:
             return
 
+        if not await self.is_allowed_by_robots(normalized_url):
+            if is_seed:
+                logger.warning(f"Seed URL is disallowed by robots.txt: {url}")
+            return
+
         if self.is_url_duplicate(normalized_url):
             return
 
@@ -87,10 +166,103 @@ class Scheduler:
             depth=depth,
         )
 
-        self.database_manager.insert_url(url_entry)
+        await self._write(self.database_manager.insert_url, url_entry)
+        self.duplicate_eliminator.mark_urls_decided([normalized_url])
+        self.prefetch_host(url_entry.normalized_url)
         await self.url_frontier.queue.put((url_entry.depth, url_entry.normalized_url))
         logger.debug(f"Added URL to queue: {url}")
 
+    async def is_allowed_by_robots(self, normalized_url: str) -> bool:
+        if self.robots is None:
+            return True
+
+        rules = await self.robots.rules_for(normalized_url)
+        if rules.crawl_delay:
+            self.politeness.set_crawl_delay(HostPoliteness.host_of(normalized_url), rules.crawl_delay)
+
+        is_allowed = rules.is_allowed(normalized_url)
+        if not is_allowed:
+            logger.debug(f"Disallowed by robots.txt: {normalized_url}")
+        return is_allowed
+
+    async def enqueue_sitemap_entries(self, entries: List[SitemapEntry]) -> int:
+        """
+        Bulk-load a batch of sitemap entries into the database and return how many were new. They reach the
+        frontier as it drains, see `_refill_from_sitemaps`.
+        """
+        if SITEMAP_DEPTH > self._max_depth:
+            return 0
+
+        urls: List[Url] = []
+        for entry in entries:
+            normalized_url = normalize_url(entry.loc)
+            if normalized_url is None or not is_same_subdomain(self.seed_url, normalized_url):
+                continue
+            if not await self.is_allowed_by_robots(normalized_url):
+                continue
+            if self.is_url_duplicate(normalized_url):
+                continue
+
+            urls.append(Url(
+                url=entry.loc,
+                normalized_url=normalized_url,
+                depth=SITEMAP_DEPTH,
+                lastmod=entry.lastmod,
+                sitemap_priority=entry.priority if entry.priority is not None else DEFAULT_SITEMAP_PRIORITY,
+            ))
+
+        if urls:
+            await self._write(self.database_manager.insert_urls, urls)
+            self.duplicate_eliminator.mark_urls_decided(url.normalized_url for url in urls)
+            self._sitemap_backlog = True
+            self._refill_from_database()
+            logger.debug(f"Loaded {len(urls)} URLs from sitemaps")
+        return len(urls)
+
+    async def _ingest_sitemaps(self) -> None:
+        loaded = 0
+        try:
+            async for entries in self.sitemap_ingester.iter_batches(self.seed_url):
+                loaded += await self.enqueue_sitemap_entries(entries)
+        except Exception as e:
+            logger.error(f"Sitemap ingestion failed: {e}")
+        logger.info(f"Loaded {loaded} new URLs from sitemaps")
+
+    def _has_backlog(self) -> bool:
+        """Whether pending URLs are waiting in the database for room on the frontier."""
+        return self._resume_cursor < self._resume_end or self._sitemap_backlog
+
+    def _refill_from_database(self) -> None:
+        queue = self.url_frontier.queue
+        free = queue.maxsize - queue.qsize()
+        if free > 0 and self._resume_cursor < self._resume_end:
+            urls = self.database_manager.get_pending_urls_between(self._resume_cursor, self._resume_end, free)
+            for url in urls:
+                self.prefetch_host(url.normalized_url)
+                queue.put_nowait((url.depth, url.normalized_url))
+            free -= len(urls)
+            self._resume_cursor = urls[-1].url_id if free <= 0 else self._resume_end
+        if free > 0 and self._sitemap_backlog:
+            self._refill_from_sitemaps(free)
+
+    def _refill_from_sitemaps(self, free: int) -> None:
+        urls = self.database_manager.get_sitemap_urls(self._sitemap_cursor, free)
+        for url in urls:
+            self.prefetch_host(url.normalized_url)
+            self.url_frontier.queue.put_nowait((url.depth, url.normalized_url))
+        if urls:
+            self._sitemap_cursor = urls[-1].url_id
+        if len(urls) < free and not self.is_ingesting_sitemaps():
+            self._sitemap_backlog = False
+
+    def is_ingesting_sitemaps(self) -> bool:
+        return self._ingestion is not None and not self._ingestion.done()
+
+    async def stop_sitemap_ingestion(self) -> None:
+        if self.is_ingesting_sitemaps():
+            self._ingestion.cancel()
+            await asyncio.gather(self._ingestion, return_exceptions=True)
+
     def is_url_duplicate(self, normalized_url: str) -> bool:
         return self.duplicate_eliminator.is_duplicate_url(normalized_url)
 
@@ -98,39 +270,146 @@ class Scheduler:
         if self.finished():
             return None, None
 
-        try:
-            depth, url = await asyncio.wait_for(self.url_frontier.queue.get(), timeout=1.0)
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + NEXT_URL_TIMEOUT
+        while True:
+            self._release_due_retries()
+            if self._has_backlog() and self.url_frontier.queue.qsize() <= self.url_frontier.queue.maxsize // 2:
+                self._refill_from_database()
+            entry = self.politeness.pop_ready()
+            while entry is None and self._can_park() and not self.url_frontier.queue.empty():
+                entry = self._admit(self.url_frontier.queue.get_nowait())
+
+            if entry is None:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    if self.url_frontier.queue.empty():
+                        logger.debug("Queue is empty")
+                    return None, None
+
+                # sleep until a new URL arrives, the earliest parked host becomes ready or a retry is due
+                timeout = min(wait for wait in (remaining, self.politeness.next_ready_in(), self._next_retry_in())
+                              if wait is not None)
+                if not self._can_park():
+                    await asyncio.sleep(timeout)
+                    continue
+                try:
+                    entry = self._admit(await asyncio.wait_for(self.url_frontier.queue.get(), timeout=timeout))
+                except asyncio.TimeoutError:
+                    continue
+                if entry is None:
+                    continue
+
+            depth, url = entry
             if depth > self._current_depth:
                 self.update_depth(depth)
             return depth, url
-        except asyncio.TimeoutError as e:
-            if self.url_frontier.queue.empty():
-                logger.debug("Queue is empty")
-            else:
-                logger.error(f"Error getting next url: {e}")
-            return None, None
+
+    def schedule_retry(self, depth: int, url: str, attempts: int, error: Exception) -> bool:
+        """Put the URL back on the frontier after a backoff, unless the error or the attempt count rules it out."""
+        if not self.retry_policy.should_retry(error, attempts):
+            return False
+
+        delay = self.retry_policy.backoff(attempts, getattr(error, "retry_after", None))
+        heapq.heappush(self._retries, (time.monotonic() + delay, depth, url))
+        logger.debug(f"Retrying {url} in {delay:.2f}s (attempt {attempts})")
+        return True
+
+    def record_fetch_success(self, url: str) -> None:
+        self.circuit_breaker.record_success(HostPoliteness.host_of(url))
+
+    def record_fetch_failure(self, url: str, error: Exception) -> None:
+        if not isinstance(error, TransientFetchError):
+            return
+
+        host = HostPoliteness.host_of(url)
+        cool_down = self.circuit_breaker.record_failure(host)
+        if cool_down is not None:
+            logger.warning(f"Circuit opened for {host}: pausing requests for {cool_down:.0f}s")
+            self.politeness.block(host, cool_down)
+
+    def _release_due_retries(self) -> None:
+        now = time.monotonic()
+        while self._retries and self._retries[0][0] <= now and not self.url_frontier.queue.full():
+            _, depth, url = heapq.heappop(self._retries)
+            self.url_frontier.queue.put_nowait((depth, url))
+
+    def _next_retry_in(self) -> Optional[float]:
+        if not self._retries:
+            return None
+        return max(0.0, self._retries[0][0] - time.monotonic())
+
+    def _can_park(self) -> bool:
+        return self.politeness.parked_count < MAX_PARKED_URLS
+
+    def _admit(self, entry: Tuple[int, str]) -> Optional[Tuple[int, str]]:
+        """Hand out a frontier entry if its host may be hit now, otherwise park it until the host is ready."""
+        depth, url = entry
+        if self.politeness.try_acquire(url):
+            return entry
+        self.politeness.park(depth, url)
+        return None
 
     async def enqueue_many(self, filtered_urls: List[Url]):
+        allowed_urls = await self.admit_many(filtered_urls)
+        if allowed_urls:
+            await self._write(self.database_manager.insert_urls, allowed_urls)
+        await self.queue_many(allowed_urls)
+
+    async def admit_many(self, filtered_urls: List[Url]) -> List[Url]:
+        """The URLs the crawl may follow: on the seed's subdomain, within the maximum depth and allowed by robots."""
+        allowed_urls: List[Url] = []
+        dropped_urls: List[str] = []
         for url in filtered_urls:
-            # only enqueue urls from the same subdomain
-            if not is_same_subdomain(self.seed_url, url.normalized_url):
-                continue
-            if url.depth > self._max_depth:
+            if (not is_same_subdomain(self.seed_url, url.normalized_url) or url.depth > self._max_depth
+                    or not await self.is_allowed_by_robots(url.normalized_url)):
+                dropped_urls.append(url.normalized_url)
                 continue
-            self.database_manager.insert_url(url)
+            allowed_urls.append(url)
+        # never stored: the duplicate eliminator need not hold them until they are
+        self.duplicate_eliminator.mark_urls_decided(dropped_urls)
+        return allowed_urls
+
+    async def queue_many(self, stored_urls: List[Url]) -> None:
+        """
+        Put URLs on the frontier once they are stored. Storing all of them before waiting for room on the frontier
+        lets a duplicate check confirmed against the database see every one of them.
+        """
+        self.duplicate_eliminator.mark_urls_decided(url.normalized_url for url in stored_urls)
+        for url in stored_urls:
+            self.prefetch_host(url.normalized_url)
             await self.url_frontier.queue.put((url.depth, url.normalized_url))
             logger.debug(f"Added URL to queue: {url.normalized_url}")
 
+    async def _write(self, call: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run a database write through the write-behind writer when there is one, directly otherwise."""
+        if self.writer is None:
+            return call(*args, **kwargs)
+        return await self.writer.write(call, *args, **kwargs)
+
+    def prefetch_host(self, normalized_url: str) -> None:
+        """Warm the DNS cache for the URL's host so the fetch does not wait on the resolver."""
+        if self.dns_cache is None:
+            return
+        parsed_url = urlparse(normalized_url)
+        if parsed_url.hostname:
+            self.dns_cache.prefetch(parsed_url.hostname, parsed_url.port or DEFAULT_PORTS[parsed_url.scheme])
+
     def update_depth(self, depth: int) -> None:
         self._current_depth = depth
 
     def finished(self):
         is_max_depth_reached = self._current_depth >= self._max_depth
-        is_queue_empty = self.url_frontier.queue.empty()
+        is_queue_empty = (self.url_frontier.queue.empty() and self.politeness.parked_count == 0
+                          and not self._retries and not self._has_backlog())
+        if self.is_ingesting_sitemaps():
+            return False
         no_active_in_db = not self.database_manager.has_active_urls()
         return (is_max_depth_reached and is_queue_empty) or (is_queue_empty and no_active_in_db)
 
-    def queue_task_done(self) -> None:
+    def queue_task_done(self, url: Optional[str] = None) -> None:
+        if url is not None:
+            self.politeness.release(url)
         self.url_frontier.queue.task_done()
 
     async def completing_in_progress_crawling(self) -> None:
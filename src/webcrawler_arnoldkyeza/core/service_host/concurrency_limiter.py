@@ -0,0 +1,121 @@
+import asyncio
+import logging
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class AdaptiveConcurrencyLimiter:
+    """
+    AIMD controller for the number of pages fetched at the same time.
+
+    Workers take a slot before asking the scheduler for a URL and give it back with the fetch latency and outcome.
+    While fetches are healthy and at least half of the slots are in use, the limit grows by one slot per limit's
+    worth of fetches (additive increase). A transient failure, or a short-term latency average above `latency_tolerance`
+    times the long-term one, shrinks it by `backoff_ratio` (multiplicative decrease). Only fetches started after
+    the previous decrease can trigger another one, so a single slowdown is not punished once per in-flight fetch.
+    Comparing latency against its own long-term average rather than a fixed target keeps the controller usable
+    when hosts with very different response times are crawled together.
+    """
+    initial_limit: int = field(default=4)
+    min_limit: int = field(default=1)
+    max_limit: int = field(default=64)
+    backoff_ratio: float = field(default=0.7)
+    latency_tolerance: float = field(default=2.0)
+    short_smoothing: float = field(default=0.2)
+    long_smoothing: float = field(default=0.02)
+    increases: int = field(default=0, init=False)
+    decreases: int = field(default=0, init=False)
+    _limit: float = field(init=False)
+    _in_flight: int = field(default=0, init=False)
+    _generation: int = field(default=0, init=False)
+    _short_latency: Optional[float] = field(default=None, init=False)
+    _long_latency: Optional[float] = field(default=None, init=False)
+    _waiters: Deque[asyncio.Future] = field(default_factory=deque, init=False, repr=False)
+
+    def __post_init__(self):
+        if not 1 <= self.min_limit <= self.max_limit:
+            raise ValueError("Concurrency bounds must satisfy 1 <= min_limit <= max_limit")
+        self._limit = float(min(self.max_limit, max(self.min_limit, self.initial_limit)))
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "limit": self.limit,
+            "in_flight": self._in_flight,
+            "latency": round(self._short_latency or 0.0, 4),
+            "increases": self.increases,
+            "decreases": self.decreases,
+        }
+
+    async def acquire(self) -> int:
+        """Wait for a free slot and return a ticket to hand back to `release`."""
+        while self._in_flight >= self.limit:
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            finally:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+        self._in_flight += 1
+        return self._generation
+
+    def release(self, ticket: int, latency: Optional[float] = None, failed: bool = False) -> None:
+        """
+        Give a slot back. `latency` is the fetch time in seconds, or None when nothing was fetched (in which case
+        the limit is left as is); `failed` marks a transient failure.
+        """
+        # growing the limit only makes sense while it is what holds the crawl back
+        saturated = self._in_flight * 2 >= self.limit
+        self._in_flight = max(0, self._in_flight - 1)
+
+        if failed or latency is not None:
+            self._update(ticket, latency, failed, saturated)
+        self._wake_waiters()
+
+    def _update(self, ticket: int, latency: Optional[float], failed: bool, saturated: bool) -> None:
+        congested = failed
+        if latency is not None:
+            self._long_latency = self._smooth(self._long_latency, latency, self.long_smoothing)
+            self._short_latency = self._smooth(self._short_latency, latency, self.short_smoothing)
+            congested = congested or self._short_latency > self.latency_tolerance * self._long_latency
+
+        if congested:
+            if ticket >= self._generation:
+                self._generation += 1
+                self.decreases += 1
+                self._set_limit(self._limit * self.backoff_ratio)
+        elif saturated:
+            self.increases += 1
+            self._set_limit(self._limit + 1 / self._limit)
+
+    @staticmethod
+    def _smooth(average: Optional[float], sample: float, weight: float) -> float:
+        if average is None:
+            return sample
+        return average + weight * (sample - average)
+
+    def _set_limit(self, limit: float) -> None:
+        previous = self.limit
+        self._limit = min(float(self.max_limit), max(float(self.min_limit), limit))
+        if self.limit != previous:
+            logger.debug(f"Concurrency limit changed from {previous} to {self.limit}")
+
+    def _wake_waiters(self) -> None:
+        free = self.limit - self._in_flight
+        while free > 0 and self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                free -= 1
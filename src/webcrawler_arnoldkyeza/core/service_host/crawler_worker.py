@@ -2,19 +2,28 @@ import asyncio
 import datetime
 import logging
 import inspect
-from dataclasses import dataclass
-from typing import List, Optional
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, List, Optional, Sequence
+from urllib.parse import urljoin, urlparse
 
 from webcrawler_arnoldkyeza.core.datastore.blob_storage import BlobStorage
 from webcrawler_arnoldkyeza.core.datastore.database_manager import DatabaseManager
+from webcrawler_arnoldkyeza.core.datastore.write_behind_writer import WriteBehindWriter
 from webcrawler_arnoldkyeza.core.duplicate_eliminator.duplicate_eliminator import DuplicateEliminator
-from webcrawler_arnoldkyeza.core.enums.url_status_type import UrlStatusType
 from webcrawler_arnoldkyeza.core.extractor.content_parser.textual_parser import TextualParser
 from webcrawler_arnoldkyeza.core.extractor.extractor import Extractor
+from webcrawler_arnoldkyeza.core.extractor.parse_pool import ParsePool
+from webcrawler_arnoldkyeza.core.html_fetcher.fetch_response import CacheValidators, FetchResponse
+from webcrawler_arnoldkyeza.core.html_fetcher.protocol_handlers.errors import (
+    TransientFetchError,
+    UnsupportedSchemeError,
+)
 from webcrawler_arnoldkyeza.core.html_fetcher.protocol_handlers.http_handler import HTTPProtocolHandler
 from webcrawler_arnoldkyeza.core.scheduler.models.url import Url
 from webcrawler_arnoldkyeza.core.scheduler.scheduler import Scheduler
 from webcrawler_arnoldkyeza.core.html_fetcher.html_fetcher import HTMLFetcher
+from webcrawler_arnoldkyeza.core.service_host.concurrency_limiter import AdaptiveConcurrencyLimiter
 from webcrawler_arnoldkyeza.core.utils import calculate_text_checksum
 
 logger = logging.getLogger(__name__)
@@ -27,52 +36,136 @@ class CrawlerWorker:
     duplicate_eliminator: DuplicateEliminator
     database_manager: DatabaseManager
     blob_storage: BlobStorage
+    html_fetcher: Optional[HTMLFetcher] = field(default=None)
+    concurrency_limiter: Optional[AdaptiveConcurrencyLimiter] = field(default=None)
+    extractor: Optional[Extractor] = field(default=None)
+    parse_pool: Optional[ParsePool] = field(default=None)
+    writer: Optional[WriteBehindWriter] = field(default=None)
 
     async def run(self) -> None:
         while not self.scheduler.finished():
+            # with adaptive concurrency a worker only takes a URL once it holds a fetch slot
+            ticket = await self.concurrency_limiter.acquire() if self.concurrency_limiter else None
             depth, url = await self.scheduler.get_next_url()
             if url is None:
+                self._release_slot(ticket)
                 await asyncio.sleep(0.01)  # wait for 10 milliseconds
                 continue
 
+            latency: Optional[float] = None
+            failed = False
             try:
                 logger.debug(f"Worker {self.worker_id}: processing URL: {url}")
-                self.database_manager.update_url_status(url, UrlStatusType.IN_PROGRESS)
-
-                # Support tests that monkeypatch HTMLFetcher/HTTPProtocolHandler with instances
-                http_handler_ref = HTTPProtocolHandler
-                http_handler = http_handler_ref() if isinstance(http_handler_ref, type) else http_handler_ref
+                parent: Optional[Url] = await self._write(self.database_manager.claim_url, url)
+                if parent is None:
+                    continue
 
-                fetcher_ref = HTMLFetcher
-                fetcher = fetcher_ref(http_handler) if isinstance(fetcher_ref, type) else fetcher_ref
+                validators = CacheValidators(etag=parent.etag, last_modified=parent.last_modified)
+                fetcher = self._get_fetcher()
+                started_at = time.monotonic()
+                fetch_result = fetcher.fetch(url, validators=validators)
+                response: Optional[FetchResponse] = (
+                    await fetch_result if inspect.isawaitable(fetch_result) else fetch_result
+                )
+                if response is None:
+                    # the protocol handlers only fetch http(s) URLs and return nothing for the others
+                    raise UnsupportedSchemeError(urlparse(url).scheme)
+                latency = time.monotonic() - started_at
+                self.scheduler.record_fetch_success(url)
 
-                fetch_result = fetcher.fetch(url)
-                content = await fetch_result if inspect.isawaitable(fetch_result) else fetch_result
+                if response.not_modified:
+                    # unchanged since the last crawl: its text and links are already stored
+                    logger.debug(f"Worker {self.worker_id}: content not modified at {url}")
+                    await self._mark_url_as_crawled(url, response)
+                    continue
 
-                result = Extractor(TextualParser()).extract(content)
+                if self.parse_pool is not None:
+                    result = await self.parse_pool.parse(response.content)
+                else:
+                    result = self._get_extractor().extract(response.content)
                 logger.debug(f"Worker {self.worker_id}: successfully extracted content from {url}")
 
+                if self.duplicate_eliminator.is_near_duplicate_content(result.content):
+                    # a copy of a page already seen: its text is already stored and its links already followed
+                    logger.debug(f"Worker {self.worker_id}: near-duplicate content at {url}")
+                    await self._mark_url_as_crawled(url, response)
+                    continue
+
                 if not self.duplicate_eliminator.is_duplicate_content(result.content):
                     file_name = f"{calculate_text_checksum(url)}.txt"
                     self.blob_storage.upload(container="text_html", blob_name=file_name,
                                              data=result.content.encode('utf-8'))
 
                 next_depth = depth + 1
-                parent: Optional[Url] = self.database_manager.get_url(url)
-                if parent is None:
-                    continue
+                # relative links are relative to the page's <base href>, itself relative to the page URL
+                base_url = urljoin(url, result.base_url) if result.base_url else url
                 filtered_urls: List[Url] = self.duplicate_eliminator.filter_extracted_urls(
                     result.extracted_urls,
                     parent_url_id=parent.url_id,
-                    depth=next_depth
+                    depth=next_depth,
+                    base_url=base_url,
                 )
-                await self.scheduler.enqueue_many(filtered_urls)
-
-                last_crawled_at = datetime.datetime.now()
-                self.database_manager.mark_url_as_crawled(url, last_crawled_at)
+                # the page's links and its crawled status are written in one transaction
+                children = await self.scheduler.admit_many(filtered_urls)
+                await self._mark_url_as_crawled(url, response, children)
+                await self.scheduler.queue_many(children)
 
             except Exception as e:
                 logger.error(f"Worker {self.worker_id}: error crawling url: {url} - {e}")
-                self.database_manager.update_url_on_failed(url, str(e))
+                failed = isinstance(e, TransientFetchError)
+                await self._handle_failure(depth, url, e)
             finally:
-                self.scheduler.queue_task_done()
+                self.scheduler.queue_task_done(url)
+                self._release_slot(ticket, latency, failed)
+
+    def _release_slot(self, ticket: Optional[int], latency: Optional[float] = None, failed: bool = False) -> None:
+        if self.concurrency_limiter is not None and ticket is not None:
+            self.concurrency_limiter.release(ticket, latency=latency, failed=failed)
+
+    async def _handle_failure(self, depth: int, url: str, error: Exception) -> None:
+        self.scheduler.record_fetch_failure(url, error)
+        if isinstance(error, TransientFetchError):
+            attempts = await self._write(self.database_manager.record_failed_attempt, url, str(error))
+            if self.scheduler.schedule_retry(depth, url, attempts, error):
+                logger.info(f"Worker {self.worker_id}: will retry url: {url} (attempt {attempts})")
+                return
+
+        # nothing reads the outcome back, so the worker moves on without waiting for it
+        await self._write(self.database_manager.update_url_on_failed, url, str(error), wait=False)
+
+    async def _mark_url_as_crawled(self, url: str, response: FetchResponse, children: Sequence[Url] = ()) -> None:
+        # awaited: the children must be stored before they are queued and claimed by another worker
+        last_crawled_at = datetime.datetime.now()
+        await self._write(
+            self.database_manager.commit_page,
+            url,
+            list(children),
+            last_crawled_at,
+            etag=response.validators.etag,
+            last_modified=response.validators.last_modified,
+        )
+
+    async def _write(self, call: Callable[..., Any], *args, wait: bool = True, **kwargs) -> Any:
+        """Run a database write through the write-behind writer when there is one, directly otherwise."""
+        if self.writer is None:
+            return call(*args, **kwargs)
+        if wait:
+            return await self.writer.write(call, *args, **kwargs)
+        await self.writer.write_later(call, *args, **kwargs)
+
+    def _get_extractor(self) -> Extractor:
+        if self.extractor is not None:
+            return self.extractor
+        return Extractor(TextualParser())
+
+    def _get_fetcher(self) -> HTMLFetcher:
+        # A shared fetcher keeps its connection pool alive across pages
+        if self.html_fetcher is not None:
+            return self.html_fetcher
+
+        # Support tests that monkeypatch HTMLFetcher/HTTPProtocolHandler with instances
+        http_handler_ref = HTTPProtocolHandler
+        http_handler = http_handler_ref() if isinstance(http_handler_ref, type) else http_handler_ref
+
+        fetcher_ref = HTMLFetcher
+        return fetcher_ref(http_handler) if isinstance(fetcher_ref, type) else fetcher_ref
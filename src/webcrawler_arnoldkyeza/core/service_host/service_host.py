@@ -1,13 +1,18 @@
 import asyncio
 import logging
-from dataclasses import dataclass
-from typing import List
+from dataclasses import dataclass, field
+from typing import List, Optional
 
 from webcrawler_arnoldkyeza.core.commandline_options import CrawlerConfig
 from webcrawler_arnoldkyeza.core.datastore.blob_storage import BlobStorage
 from webcrawler_arnoldkyeza.core.datastore.database_manager import DatabaseManager
+from webcrawler_arnoldkyeza.core.datastore.write_behind_writer import WriteBehindWriter
 from webcrawler_arnoldkyeza.core.duplicate_eliminator.duplicate_eliminator import DuplicateEliminator
+from webcrawler_arnoldkyeza.core.extractor.extractor import Extractor
+from webcrawler_arnoldkyeza.core.extractor.parse_pool import ParsePool
+from webcrawler_arnoldkyeza.core.html_fetcher.html_fetcher import HTMLFetcher
 from webcrawler_arnoldkyeza.core.scheduler.scheduler import Scheduler
+from webcrawler_arnoldkyeza.core.service_host.concurrency_limiter import AdaptiveConcurrencyLimiter
 from webcrawler_arnoldkyeza.core.service_host.crawler_worker import CrawlerWorker
 
 logger = logging.getLogger(__name__)
@@ -19,23 +24,42 @@ class ServiceHost:
     deduplicator: DuplicateEliminator
     database: DatabaseManager
     blob_storage: BlobStorage
+    html_fetcher: Optional[HTMLFetcher] = field(default=None)
+    concurrency_limiter: Optional[AdaptiveConcurrencyLimiter] = field(default=None)
+    extractor: Optional[Extractor] = field(default=None)
+    parse_pool: Optional[ParsePool] = field(default=None)
+    writer: Optional[WriteBehindWriter] = field(default=None)
 
     async def crawl(self, config: CrawlerConfig) -> None:
         try:
+            if self.writer is not None:
+                # the scheduler already writes through it while it resumes and stores the seed URL
+                self.writer.start()
+
             await self.scheduler.initialize(config.start_url, config.max_depth)
             logger.info(f"Scheduler initialized with seed URL: {config.start_url} and max depth: {config.max_depth}")
             logger.info(f"Crawling in progress...")
 
+            # in adaptive mode the limiter decides how many of the workers are fetching at any time
+            number_of_workers = config.number_of_workers
+            if self.concurrency_limiter is not None:
+                number_of_workers = self.concurrency_limiter.max_limit
+                logger.info(f"Adaptive concurrency between {self.concurrency_limiter.min_limit} and "
+                            f"{self.concurrency_limiter.max_limit} fetches, starting at "
+                            f"{self.concurrency_limiter.limit}")
+
             workers: List[asyncio.Task] = []
-            for worker_id in range(config.number_of_workers):
+            for worker_id in range(number_of_workers):
                 worker = CrawlerWorker(worker_id + 1, self.scheduler, self.deduplicator, self.database,
-                                       self.blob_storage)
+                                       self.blob_storage, self.html_fetcher, self.concurrency_limiter,
+                                       self.extractor, self.parse_pool, self.writer)
                 workers.append(asyncio.create_task(worker.run()))
 
             try:
                 while not self.scheduler.finished():
                     await asyncio.sleep(0.01)
             finally:
+                await self.scheduler.stop_sitemap_ingestion()
 
                 await self.scheduler.completing_in_progress_crawling()
                 logger.debug("All crawling workers are completed")
@@ -44,6 +68,26 @@ class ServiceHost:
                     worker.cancel()
                 await asyncio.gather(*workers, return_exceptions=True)
                 logger.debug("All workers stopped")
+
+                if self.writer is not None:
+                    # flush barrier: every write is stored before the report reads the database
+                    await self.writer.close()
+                    logger.info(f"Write-behind: {self.writer.writes_applied} writes in "
+                                f"{self.writer.batches_written} transactions")
+
+                if self.html_fetcher is not None:
+                    await self.html_fetcher.close()
+                    logger.debug("HTML fetcher closed")
+
+                if self.parse_pool is not None:
+                    await self.parse_pool.close()
+                    logger.debug("Parse pool closed")
+
+                self.deduplicator.close()
+
+                if self.concurrency_limiter is not None:
+                    logger.info(f"Adaptive concurrency: {self.concurrency_limiter.stats()}")
+
                 logger.info(f"Crawling finished at depth: {self.scheduler.current_depth}.")
         except Exception as e:
             logger.error(f"Error during crawling: {e}")
@@ -0,0 +1,6 @@
+class SitemapError(ValueError):
+    """Raised when a sitemap is not well-formed XML or is larger than the sitemap protocol allows."""
+
+    def __init__(self, url: str, message: str):
+        self.url = url
+        super().__init__(f"Invalid sitemap {url}: {message}")
@@ -0,0 +1,82 @@
+import logging
+from collections import deque
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Deque, List, Optional, Set, Tuple
+from urllib.parse import urlparse
+
+from webcrawler_arnoldkyeza.core.html_fetcher.html_fetcher import HTMLFetcher
+from webcrawler_arnoldkyeza.core.robots.robots_cache import RobotsCache
+from webcrawler_arnoldkyeza.core.sitemaps.sitemap_parser import SitemapEntry, SitemapParser
+
+logger = logging.getLogger(__name__)
+
+SITEMAP_PATH = "/sitemap.xml"
+
+
+@dataclass
+class SitemapIngester:
+    """
+    Reads every sitemap of the seed's site and hands out the page entries in batches of `batch_size`.
+
+    Sitemaps are discovered from the `Sitemap:` lines of robots.txt (when a robots cache is given) and the
+    well-known `/sitemap.xml`. Sitemap indexes are followed breadth-first, each sitemap at most once and no more
+    than `max_sitemaps` in total. Bodies are streamed through `SitemapParser`, so only the current batch is held in
+    memory. A sitemap that cannot be fetched or parsed is skipped; the entries it gave before failing are kept.
+    """
+    fetcher: HTMLFetcher
+    robots: Optional[RobotsCache] = field(default=None)
+    batch_size: int = field(default=1000)
+    max_sitemaps: int = field(default=1000)
+    sitemaps_read: int = field(default=0, init=False)
+    entries_read: int = field(default=0, init=False)
+
+    async def discover(self, seed_url: str) -> List[str]:
+        parsed_url = urlparse(seed_url)
+        well_known = f"{parsed_url.scheme}://{parsed_url.netloc}{SITEMAP_PATH}"
+        if self.robots is None:
+            return [well_known]
+
+        rules = await self.robots.rules_for(seed_url)
+        sitemaps = list(dict.fromkeys(rules.sitemaps))
+        if well_known not in sitemaps and rules.is_allowed(well_known):
+            sitemaps.append(well_known)
+        return sitemaps
+
+    async def iter_batches(self, seed_url: str) -> AsyncIterator[List[SitemapEntry]]:
+        pending: Deque[str] = deque((await self.discover(seed_url))[:self.max_sitemaps])
+        seen: Set[str] = set(pending)
+        batch: List[SitemapEntry] = []
+
+        while pending:
+            sitemap_url = pending.popleft()
+            self.sitemaps_read += 1
+            try:
+                async for is_index, entries in self._read(sitemap_url):
+                    if is_index:
+                        for entry in entries:
+                            if entry.loc not in seen and len(seen) < self.max_sitemaps:
+                                seen.add(entry.loc)
+                                pending.append(entry.loc)
+                        continue
+
+                    self.entries_read += len(entries)
+                    batch.extend(entries)
+                    while len(batch) >= self.batch_size:
+                        yield batch[:self.batch_size]
+                        batch = batch[self.batch_size:]
+            except ValueError as e:
+                logger.info(f"Skipping sitemap {sitemap_url}: {e}")
+
+        if batch:
+            yield batch
+        logger.info(f"Read {self.entries_read} URLs from {self.sitemaps_read} sitemap(s)")
+
+    async def _read(self, sitemap_url: str) -> AsyncIterator[Tuple[bool, List[SitemapEntry]]]:
+        parser = SitemapParser(sitemap_url)
+        async for chunk in self.fetcher.stream(sitemap_url):
+            entries = parser.feed(chunk)
+            if entries:
+                yield parser.is_index, entries
+        entries = parser.close()
+        if entries:
+            yield parser.is_index, entries
@@ -0,0 +1,134 @@
+import zlib
+from dataclasses import dataclass, field
+from typing import List, Optional
+from xml.etree.ElementTree import Element, ParseError, XMLPullParser
+
+from webcrawler_arnoldkyeza.core.sitemaps.errors import SitemapError
+
+GZIP_MAGIC = b"\x1f\x8b"
+# the sitemap protocol caps a sitemap at 50 MiB uncompressed, which also bounds what a gzip bomb can expand to
+MAX_SITEMAP_SIZE = 50 * 1024 * 1024
+DEFAULT_SITEMAP_PRIORITY = 0.5
+INFLATE_CHUNK_SIZE = 64 * 1024
+SITEMAP_INDEX = "sitemapindex"
+ENTRY_TAGS = {"url", "sitemap"}
+
+
+def _local_name(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+@dataclass
+class SitemapEntry:
+    loc: str
+    lastmod: Optional[str] = field(default=None)
+    priority: Optional[float] = field(default=None)
+
+
+@dataclass
+class SitemapParser:
+    """
+    Incremental parser for one sitemap or sitemap index, fed with the raw body as it is downloaded.
+
+    Gzipped bodies are recognised by their magic bytes and inflated a bounded slice at a time. Every `<url>` or
+    `<sitemap>` element is turned into a `SitemapEntry` as soon as it is closed and then dropped from the tree, so
+    memory stays constant however many entries the file holds. `is_index` tells whether the entries are pages or
+    further sitemaps; namespaces are ignored.
+    """
+    url: str
+    max_size: int = field(default=MAX_SITEMAP_SIZE)
+    is_index: bool = field(default=False, init=False)
+    size: int = field(default=0, init=False)
+    _head: bytes = field(default=b"", init=False, repr=False)
+    _inflater: Optional["zlib._Decompress"] = field(default=None, init=False, repr=False)
+    _started: bool = field(default=False, init=False, repr=False)
+    _root: Optional[Element] = field(default=None, init=False, repr=False)
+    _parser: XMLPullParser = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self._parser = XMLPullParser(events=("start", "end"))
+
+    def feed(self, data: bytes) -> List[SitemapEntry]:
+        """Parse the next chunk of the body and return the entries it completed."""
+        if not self._started:
+            # the magic number may be split across the first two chunks
+            self._head += data
+            if len(self._head) < len(GZIP_MAGIC):
+                return []
+            data, self._head = self._head, b""
+            self._started = True
+            if data.startswith(GZIP_MAGIC):
+                self._inflater = zlib.decompressobj(16 + zlib.MAX_WBITS)
+
+        if self._inflater is None:
+            return self._parse(data)
+
+        entries = self._parse(self._inflate(data))
+        while self._inflater.unconsumed_tail:
+            entries.extend(self._parse(self._inflate(self._inflater.unconsumed_tail)))
+        return entries
+
+    def close(self) -> List[SitemapEntry]:
+        """Finish the document and return the entries that were still open."""
+        entries: List[SitemapEntry] = []
+        if not self._started:
+            entries.extend(self._parse(self._head))
+        elif self._inflater is not None:
+            entries.extend(self._parse(self._inflater.flush()))
+        try:
+            self._parser.close()
+            entries.extend(self._read_events())
+        except ParseError as e:
+            raise SitemapError(self.url, str(e))
+        return entries
+
+    def _inflate(self, data: bytes) -> bytes:
+        try:
+            return self._inflater.decompress(data, INFLATE_CHUNK_SIZE)
+        except zlib.error as e:
+            raise SitemapError(self.url, f"corrupt gzip data ({e})")
+
+    def _parse(self, data: bytes) -> List[SitemapEntry]:
+        if not data:
+            return []
+        self.size += len(data)
+        if self.size > self.max_size:
+            raise SitemapError(self.url, f"larger than {self.max_size} bytes")
+        try:
+            # syntax errors surface either here or, queued as an event, while reading the events
+            self._parser.feed(data)
+            return self._read_events()
+        except ParseError as e:
+            raise SitemapError(self.url, str(e))
+
+    def _read_events(self) -> List[SitemapEntry]:
+        entries: List[SitemapEntry] = []
+        for event, element in self._parser.read_events():
+            if event == "start":
+                if self._root is None:
+                    self._root = element
+                    self.is_index = _local_name(element.tag) == SITEMAP_INDEX
+                continue
+
+            if _local_name(element.tag) in ENTRY_TAGS and element is not self._root:
+                entry = self._entry(element)
+                if entry is not None:
+                    entries.append(entry)
+                # entries are direct children of the root, dropping them keeps the tree from growing
+                self._root.clear()
+        return entries
+
+    @staticmethod
+    def _entry(element: Element) -> Optional[SitemapEntry]:
+        values = {_local_name(child.tag): (child.text or "").strip() for child in element}
+        loc = values.get("loc")
+        if not loc:
+            return None
+
+        priority = None
+        if values.get("priority"):
+            try:
+                priority = min(1.0, max(0.0, float(values["priority"])))
+            except ValueError:
+                pass
+        return SitemapEntry(loc=loc, lastmod=values.get("lastmod") or None, priority=priority)
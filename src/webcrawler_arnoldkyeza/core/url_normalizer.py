@@ -0,0 +1,74 @@
+import re
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Iterable, List, Optional, Tuple, Union
+from urllib.parse import urljoin, urlsplit
+
+from webcrawler_arnoldkyeza.core.utils import normalize_url
+
+# URLs that neither `normalize_url` nor resolving against a base URL would change: lower-case http(s) scheme and
+# host, no port, user info, query or fragment, and a path without empty or dot segments (so no trailing slash other
+# than the root path).
+_CANONICAL_URL = re.compile(r"https?://[a-z0-9.-]+(?:/|(?:/[^/?#;\s.][^/?#;\s]*)+)?")
+
+
+_HAS_SCHEME = re.compile(r"[a-zA-Z][a-zA-Z0-9+.-]*:")
+
+CacheKey = Union[str, Tuple[str, ...]]
+
+
+@dataclass
+class UrlNormalizer:
+    """
+    Normalizes all links of a page in one call.
+
+    Each href is resolved against the page's base URL (its `<base href>` or the page URL), then normalized the way
+    `normalize_url` does it. Links that are already canonical are returned as they are. The others go through a
+    bounded LRU cache: absolute and root-relative links resolve the same way on every page of a site, so they are
+    cached by scheme (and host) rather than by page, and the navigation and footer links that every page repeats
+    are only resolved once.
+    """
+    cache_size: int = field(default=100000)
+    hits: int = field(default=0, init=False)
+    misses: int = field(default=0, init=False)
+    _cache: "OrderedDict[CacheKey, Optional[str]]" = field(default_factory=OrderedDict, init=False, repr=False)
+
+    def normalize(self, url: str) -> Optional[str]:
+        if _CANONICAL_URL.fullmatch(url):
+            return url
+        return self._lookup(url, url)
+
+    def normalize_many(self, hrefs: Iterable[Optional[str]], base_url: Optional[str] = None) -> List[Optional[str]]:
+        """Normalize the hrefs of a page, in order; hrefs that are missing or not crawlable give None."""
+        base = urlsplit(base_url) if base_url else None
+        normalized_urls: List[Optional[str]] = []
+        for href in hrefs:
+            if not href:
+                normalized_urls.append(None)
+                continue
+
+            href = href.strip()
+            if base is None or _CANONICAL_URL.fullmatch(href):
+                normalized_urls.append(self.normalize(href))
+            elif href.startswith("//") or _HAS_SCHEME.match(href):
+                normalized_urls.append(self._lookup((base.scheme, href), href, base_url))
+            elif href.startswith("/"):
+                normalized_urls.append(self._lookup((base.scheme, base.netloc, href), href, base_url))
+            else:
+                # page-relative links rarely repeat across pages, only their resolved form is cached
+                normalized_urls.append(self.normalize(urljoin(base_url, href)))
+        return normalized_urls
+
+    def _lookup(self, key: CacheKey, url: str, base_url: Optional[str] = None) -> Optional[str]:
+        cache = self._cache
+        if key in cache:
+            self.hits += 1
+            cache.move_to_end(key)
+            return cache[key]
+
+        self.misses += 1
+        normalized_url = normalize_url(urljoin(base_url, url) if base_url else url)
+        cache[key] = normalized_url
+        if len(cache) > self.cache_size:
+            cache.popitem(last=False)
+        return normalized_url
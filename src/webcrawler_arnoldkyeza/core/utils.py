@@ -1,8 +1,12 @@
+import datetime
 import hashlib
+import re
 from typing import Optional, Tuple
 from urllib.parse import urlparse, urldefrag, urlencode, parse_qsl, urlunparse
 
 SUPPORTED_SCHEMES = ["http", "https"]
+DIGEST_SIZE = 16
+_ORIGIN = re.compile(r"[a-zA-Z][a-zA-Z0-9+.-]*://[^/?#]*")
 
 
 def remove_default_ports(netloc: str) -> Tuple[str, Optional[int]]:
@@ -58,3 +62,31 @@ def calculate_text_checksum(data: str) -> str:
     sha256_hash = hashlib.sha256()
     sha256_hash.update(data.encode('utf-8'))
     return sha256_hash.hexdigest()
+
+
+def calculate_digest(data: str) -> bytes:
+    """
+    16-byte BLAKE2b digest of the text, the key under which URLs and page texts are deduplicated.
+    Use `calculate_text_checksum` where the key has to be readable, e.g. in a file name.
+    """
+    return hashlib.blake2b(data.encode('utf-8'), digest_size=DIGEST_SIZE).digest()
+
+
+def split_origin(url: str) -> Tuple[str, str]:
+    """
+    Split the URL into its origin (scheme and authority) and the rest, so that `origin + rest == url`.
+    A string without a scheme has an empty origin.
+    """
+    match = _ORIGIN.match(url)
+    if match is None:
+        return "", url
+    return url[:match.end()], url[match.end():]
+
+
+def to_epoch(moment: Optional[datetime.datetime]) -> Optional[int]:
+    """Whole seconds since the epoch; naive datetimes are taken as local time, as `datetime.now()` returns them."""
+    return int(moment.timestamp()) if moment is not None else None
+
+
+def from_epoch(seconds: Optional[int]) -> Optional[datetime.datetime]:
+    return datetime.datetime.fromtimestamp(seconds) if seconds is not None else None
@@ -2,17 +2,35 @@ import asyncio
 import logging
 import sys
 
-import fakeredis
-
 from webcrawler_arnoldkyeza.core.commandline_options import parse_command_line_options, CrawlerConfig
 from webcrawler_arnoldkyeza.core.crawler_logging import setup_logging
 from webcrawler_arnoldkyeza.core.datastore.blob_storage import BlobStorage
 from webcrawler_arnoldkyeza.core.datastore.database_manager import DatabaseManager
+from webcrawler_arnoldkyeza.core.datastore.write_behind_writer import WriteBehindWriter
+from webcrawler_arnoldkyeza.core.duplicate_eliminator.bloom_filter import ScalableBloomFilter
 from webcrawler_arnoldkyeza.core.duplicate_eliminator.duplicate_eliminator import DuplicateEliminator
+from webcrawler_arnoldkyeza.core.duplicate_eliminator.simhash import SimHashIndex
+from webcrawler_arnoldkyeza.core.extractor.extractor import Extractor
+from webcrawler_arnoldkyeza.core.extractor.parse_pool import ParsePool
+from webcrawler_arnoldkyeza.core.html_fetcher.dns_cache import DNSCache
+from webcrawler_arnoldkyeza.core.html_fetcher.html_fetcher import HTMLFetcher
+from webcrawler_arnoldkyeza.core.html_fetcher.protocol_handlers.async_http_handler import AsyncHTTPProtocolHandler
+from webcrawler_arnoldkyeza.core.html_fetcher.protocol_handlers.http_handler import HTTPProtocolHandler
+from webcrawler_arnoldkyeza.core.html_fetcher.protocol_handlers.warc_handler import (
+    WARCRecordingHandler,
+    WARCReplayHandler,
+)
+from webcrawler_arnoldkyeza.core.html_fetcher.warc_archive import WARCArchive, WARCWriter
 from webcrawler_arnoldkyeza.core.reporting.crawl_report_printer import CrawlReportPrinter
+from webcrawler_arnoldkyeza.core.robots.robots_cache import RobotsCache
 from webcrawler_arnoldkyeza.core.scheduler.models.url_frontier import UrlFrontier
+from webcrawler_arnoldkyeza.core.scheduler.circuit_breaker import HostCircuitBreaker
+from webcrawler_arnoldkyeza.core.scheduler.politeness import HostPoliteness
+from webcrawler_arnoldkyeza.core.scheduler.retry_policy import RetryPolicy
 from webcrawler_arnoldkyeza.core.scheduler.scheduler import Scheduler
+from webcrawler_arnoldkyeza.core.service_host.concurrency_limiter import AdaptiveConcurrencyLimiter
 from webcrawler_arnoldkyeza.core.service_host.service_host import ServiceHost
+from webcrawler_arnoldkyeza.core.sitemaps.sitemap_ingester import SitemapIngester
 
 logger = logging.getLogger("webcrawler")
 
@@ -23,26 +41,133 @@ def build_components(options: CrawlerConfig) -> ServiceHost:
     database_backend = DatabaseManager(path=options.database)  # placeholder for actual DB connection
     logger.info("Database backend initialized at %s", options.database)
 
-    redis_backend = fakeredis.FakeStrictRedis()  # placeholder for actual Redis connection
-    logger.info("Redis backend initialized")
-
     blob_storage = BlobStorage(root_path=options.blob_storage_path)
     logger.info("Blob Storage initialized at %s", options.blob_storage_path)
 
-    deduplicator = DuplicateEliminator(redis=redis_backend)
-    logger.info("Duplicate Eliminator initialized")
+    near_duplicates = None
+    if options.near_duplicate_threshold is not None:
+        near_duplicates = SimHashIndex(threshold=options.near_duplicate_threshold)
+    url_filter = None
+    if options.bloom_filter:
+        url_filter = ScalableBloomFilter(
+            initial_capacity=options.bloom_capacity,
+            error_rate=options.bloom_error_rate,
+            path=options.bloom_filter_path,
+        )
+        logger.info("Seen URLs kept in a Bloom filter (%d URLs so far)", len(url_filter))
+    deduplicator = DuplicateEliminator.for_backend(
+        options.dedup_backend,
+        options.redis_urls,
+        near_duplicates=near_duplicates,
+        url_filter=url_filter,
+        database_manager=database_backend,
+    )
+    logger.info("Duplicate Eliminator initialized with %s backend", options.dedup_backend)
+    if near_duplicates is not None:
+        logger.info("Near-duplicate detection enabled within %d bits", options.near_duplicate_threshold)
+
+    dns_cache = None
+    if options.warc_replay:
+        http_handler = WARCReplayHandler(
+            archive=WARCArchive(options.warc_replay),
+            latency=options.replay_latency,
+            latency_jitter=options.replay_latency_jitter,
+            max_body_size=options.max_body_size,
+        )
+    elif options.http_client == "requests":
+        http_handler = HTTPProtocolHandler(max_body_size=options.max_body_size, user_agent=options.user_agent)
+    else:
+        if options.dns_cache_ttl:
+            dns_cache = DNSCache(ttl=options.dns_cache_ttl)
+        http_handler = AsyncHTTPProtocolHandler(
+            max_connections=options.max_connections,
+            max_connections_per_host=options.max_connections_per_host,
+            connect_timeout=options.connect_timeout,
+            read_timeout=options.read_timeout,
+            max_body_size=options.max_body_size,
+            dns_cache=dns_cache,
+            user_agent=options.user_agent,
+        )
+    if options.warc_record and not options.warc_replay:
+        http_handler = WARCRecordingHandler(handler=http_handler, writer=WARCWriter(options.warc_record))
+        logger.info("Recording responses to %s", options.warc_record)
+    html_fetcher = HTMLFetcher(handler=http_handler)
+    if options.warc_replay:
+        logger.info("HTML Fetcher replaying responses from %s", ", ".join(map(str, options.warc_replay)))
+    else:
+        logger.info("HTML Fetcher initialized with %s client", options.http_client)
+
+    robots = None
+    if options.respect_robots_txt:
+        robots = RobotsCache(fetcher=html_fetcher, user_agent=options.user_agent)
+        logger.info("robots.txt checks enabled for %s", options.user_agent)
+
+    sitemap_ingester = None
+    if options.sitemaps:
+        sitemap_ingester = SitemapIngester(
+            fetcher=html_fetcher,
+            robots=robots,
+            batch_size=options.sitemap_batch_size,
+            max_sitemaps=options.max_sitemaps,
+        )
+        logger.info("Sitemap ingestion enabled")
+
+    writer = None
+    if options.write_batch_size > 0:
+        writer = WriteBehindWriter(
+            database_manager=database_backend,
+            batch_size=options.write_batch_size,
+            flush_interval=options.write_flush_interval,
+        )
 
     scheduler = Scheduler(
         url_frontier=UrlFrontier(),
         database_manager=database_backend,
-        duplicate_eliminator=deduplicator
+        duplicate_eliminator=deduplicator,
+        politeness=HostPoliteness(
+            requests_per_second=options.host_requests_per_second,
+            burst=options.host_burst,
+            max_in_flight_per_host=options.max_in_flight_per_host,
+        ),
+        dns_cache=dns_cache,
+        robots=robots,
+        retry_policy=RetryPolicy(max_attempts=options.max_attempts, base_delay=options.retry_base_delay),
+        circuit_breaker=HostCircuitBreaker(
+            failure_threshold=options.circuit_failure_threshold,
+            cool_down=options.circuit_cool_down,
+        ),
+        sitemap_ingester=sitemap_ingester,
+        writer=writer,
     )
 
+    concurrency_limiter = None
+    if options.adaptive_concurrency:
+        concurrency_limiter = AdaptiveConcurrencyLimiter(
+            initial_limit=options.number_of_workers,
+            min_limit=options.min_concurrency,
+            max_limit=options.max_concurrency,
+        )
+
+    parse_pool = None
+    if options.parse_workers > 0:
+        parse_pool = ParsePool(
+            max_workers=options.parse_workers,
+            parser_name=options.parser,
+            batch_size=options.parse_batch_size,
+            batch_delay=options.parse_batch_delay,
+        )
+        logger.info("Parsing pages in %d processes", options.parse_workers)
+
     return ServiceHost(
         scheduler=scheduler,
         deduplicator=deduplicator,
         database=database_backend,
-        blob_storage=blob_storage
+        blob_storage=blob_storage,
+        html_fetcher=html_fetcher,
+        concurrency_limiter=concurrency_limiter,
+        extractor=Extractor.for_parser(options.parser),
+        parse_pool=parse_pool,
+        writer=writer,
     )
 
 
@@ -57,6 +182,7 @@ def main(argv: list[str]) -> None:
         sys.exit(1)
 
     asyncio.run(crawler.crawl(options))
+    crawler.database.close()
 
 
     logger.info("\n\nPrinting crawl report...\n")
@@ -64,6 +190,7 @@ def main(argv: list[str]) -> None:
     db = DatabaseManager(options.database)
     printer = CrawlReportPrinter(database_manager=db)
     printer.print_report(stream=sys.stderr)
+    db.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,58 @@
+import pytest
+
+from webcrawler_arnoldkyeza.core.duplicate_eliminator.bloom_filter import BloomFilterFormatError, ScalableBloomFilter
+
+
+def test_added_keys_are_always_found():
+    bloom = ScalableBloomFilter(initial_capacity=100, error_rate=0.01)
+    keys = [f"https://example.com/page/{i}" for i in range(1000)]
+
+    added = [bloom.add(key) for key in keys]
+
+    assert all(key in bloom for key in keys)
+    # a false positive makes `add` report a new key as seen, nothing else does
+    assert sum(added) >= 990
+    assert bloom.add(keys[0]) is False
+
+
+def test_false_positive_rate_stays_within_bound_while_growing():
+    bloom = ScalableBloomFilter(initial_capacity=1000, error_rate=0.01)
+    for i in range(20_000):
+        bloom.add(f"https://example.com/seen/{i}")
+
+    false_positives = sum(f"https://example.com/new/{i}" in bloom for i in range(20_000))
+
+    assert len(bloom._slices) == 5
+    assert false_positives / 20_000 < 0.01
+    assert bloom.size_in_bytes / 20_000 < 4
+
+
+def test_memory_mapped_filter_persists_between_runs(tmp_path):
+    path = tmp_path / "seen.bloom"
+    bloom = ScalableBloomFilter(initial_capacity=10, error_rate=0.001, path=path)
+    for i in range(50):
+        bloom.add(f"https://example.com/{i}")
+    bloom.close()
+
+    reopened = ScalableBloomFilter(path=path)
+
+    assert reopened.error_rate == 0.001
+    assert reopened.initial_capacity == 10
+    assert len(reopened) == len(bloom)
+    assert all(f"https://example.com/{i}" in reopened for i in range(50))
+    assert reopened.add("https://example.com/new") is True
+    size = reopened.size_in_bytes
+    reopened.close()
+    assert path.stat().st_size == size
+
+
+def test_rejects_invalid_parameters_and_files(tmp_path):
+    with pytest.raises(ValueError):
+        ScalableBloomFilter(error_rate=1.5)
+    with pytest.raises(ValueError):
+        ScalableBloomFilter(initial_capacity=0)
+
+    path = tmp_path / "other.bin"
+    path.write_bytes(b"not a bloom filter at all, just some bytes in a file")
+    with pytest.raises(BloomFilterFormatError):
+        ScalableBloomFilter(path=path)
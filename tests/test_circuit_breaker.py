@@ -0,0 +1,55 @@
+import pytest
+
+from webcrawler_arnoldkyeza.core.scheduler.circuit_breaker import HostCircuitBreaker
+
+
+class FakeClock:
+    def __init__(self, now: float = 0.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    return FakeClock()
+
+
+def test_circuit_opens_after_consecutive_failures(clock):
+    breaker = HostCircuitBreaker(failure_threshold=3, cool_down=10.0, clock=clock)
+
+    assert breaker.record_failure("example.com") is None
+    assert breaker.record_failure("example.com") is None
+    assert breaker.record_failure("example.com") == pytest.approx(10.0)
+    assert breaker.is_open("example.com") is True
+    assert breaker.is_open("other.com") is False
+
+    # failures reported by fetches already in flight do not extend the cool-down
+    assert breaker.record_failure("example.com") is None
+
+    clock.now = 10.0
+    assert breaker.is_open("example.com") is False
+
+
+def test_success_resets_failures(clock):
+    breaker = HostCircuitBreaker(failure_threshold=2, clock=clock)
+
+    breaker.record_failure("example.com")
+    breaker.record_success("example.com")
+
+    assert breaker.record_failure("example.com") is None
+    assert breaker.is_open("example.com") is False
+
+
+def test_failed_probe_reopens_with_doubled_cool_down(clock):
+    breaker = HostCircuitBreaker(failure_threshold=2, cool_down=10.0, max_cool_down=25.0, clock=clock)
+
+    breaker.record_failure("example.com")
+    assert breaker.record_failure("example.com") == pytest.approx(10.0)
+
+    clock.now = 10.0
+    assert breaker.record_failure("example.com") == pytest.approx(20.0)
+
+    clock.now = 30.0
+    assert breaker.record_failure("example.com") == pytest.approx(25.0)
@@ -0,0 +1,93 @@
+import asyncio
+
+import pytest
+
+from webcrawler_arnoldkyeza.core.service_host.concurrency_limiter import AdaptiveConcurrencyLimiter
+
+
+async def fill(limiter: AdaptiveConcurrencyLimiter) -> list:
+    return [await limiter.acquire() for _ in range(limiter.limit)]
+
+
+def test_initial_limit_is_clamped_to_bounds():
+    assert AdaptiveConcurrencyLimiter(initial_limit=100, max_limit=8).limit == 8
+    assert AdaptiveConcurrencyLimiter(initial_limit=0, min_limit=2).limit == 2
+
+    with pytest.raises(ValueError):
+        AdaptiveConcurrencyLimiter(min_limit=5, max_limit=2)
+
+
+@pytest.mark.asyncio
+async def test_acquire_waits_for_a_free_slot():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=1)
+    ticket = await limiter.acquire()
+
+    waiting = asyncio.create_task(limiter.acquire())
+    await asyncio.sleep(0)
+    assert not waiting.done()
+
+    limiter.release(ticket)
+    await asyncio.wait_for(waiting, timeout=0.5)
+    assert limiter.in_flight == 1
+
+
+@pytest.mark.asyncio
+async def test_limit_grows_additively_while_busy_and_healthy():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=2, max_limit=4)
+
+    for _ in range(2):
+        for ticket in await fill(limiter):
+            limiter.release(ticket, latency=0.1)
+
+    assert limiter.limit == 3
+    assert limiter.increases >= 2
+
+
+@pytest.mark.asyncio
+async def test_limit_does_not_grow_when_slots_are_idle():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=4)
+
+    for _ in range(20):
+        limiter.release(await limiter.acquire(), latency=0.1)
+
+    assert limiter.limit == 4
+
+
+@pytest.mark.asyncio
+async def test_transient_failure_decreases_limit_once_per_generation():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=10, backoff_ratio=0.5)
+    tickets = await fill(limiter)
+
+    limiter.release(tickets[0], failed=True)
+    limiter.release(tickets[1], failed=True)
+    assert limiter.limit == 5
+    assert limiter.decreases == 1
+
+    for ticket in tickets[2:]:
+        limiter.release(ticket)
+    # a fetch started after the decrease can shrink the limit again
+    limiter.release(await limiter.acquire(), failed=True)
+    assert limiter.decreases == 2
+
+
+@pytest.mark.asyncio
+async def test_latency_spike_decreases_limit_but_not_below_minimum():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=4, min_limit=2, short_smoothing=1.0)
+
+    for _ in range(10):
+        limiter.release(await limiter.acquire(), latency=0.1)
+    for _ in range(10):
+        limiter.release(await limiter.acquire(), latency=5.0)
+
+    assert limiter.limit == 2
+    assert limiter.stats()["limit"] == 2
+
+
+@pytest.mark.asyncio
+async def test_release_without_sample_keeps_limit():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=1)
+
+    limiter.release(await limiter.acquire())
+
+    assert limiter.limit == 1
+    assert limiter.in_flight == 0
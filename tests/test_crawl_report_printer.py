@@ -11,24 +11,24 @@ def mock_database_manager(mocker):
 
 
 def test_build_report_delegates_to_db(mock_database_manager):
-    data = {
-        "https://example.com": ["https://example.com/a", "https://example.com/b"],
-        "https://example.com/empty": [],
-    }
-    mock_database_manager.get_crawled_urls_with_extracted.return_value = data
+    data = [
+        ("https://example.com", ["https://example.com/a", "https://example.com/b"]),
+        ("https://example.com/empty", []),
+    ]
+    mock_database_manager.get_crawled_urls_with_extracted.return_value = iter(data)
 
     printer = CrawlReportPrinter(database_manager=mock_database_manager)
 
-    assert printer.build_report() == data
+    assert list(printer.build_report()) == data
     mock_database_manager.get_crawled_urls_with_extracted.assert_called_once()
 
 
 def test_print_report_formats_output(mock_database_manager):
-    data = {
-        "https://example.com": ["https://example.com/a", "https://example.com/b"],
-        "https://example.com/empty": [],
-    }
-    mock_database_manager.get_crawled_urls_with_extracted.return_value = data
+    data = [
+        ("https://example.com", ["https://example.com/a", "https://example.com/b"]),
+        ("https://example.com/empty", []),
+    ]
+    mock_database_manager.get_crawled_urls_with_extracted.return_value = iter(data)
 
     printer = CrawlReportPrinter(database_manager=mock_database_manager)
     buf = StringIO()
@@ -43,3 +43,20 @@ def test_print_report_formats_output(mock_database_manager):
     assert output[5] == "Visited: https://example.com/empty"
     assert output[6] == "Extracted:"
     assert output[7] == "- (none)"
+
+
+def test_print_report_writes_in_buffered_chunks(mock_database_manager, mocker):
+    mocker.patch("webcrawler_arnoldkyeza.core.reporting.crawl_report_printer.WRITE_BUFFER_SIZE", 100)
+    mock_database_manager.get_crawled_urls_with_extracted.return_value = (
+        (f"https://example.com/{i}", [f"https://example.com/{i}/a"]) for i in range(10)
+    )
+    stream = mocker.Mock(spec=StringIO)
+
+    CrawlReportPrinter(database_manager=mock_database_manager).print_report(stream=stream)
+
+    written = "".join(call.args[0] for call in stream.write.call_args_list)
+    assert written.count("Visited: ") == 10
+    assert written.startswith("Visited: https://example.com/0\nExtracted:\n- https://example.com/0/a\n\n")
+    # about one write per buffer, not one per line
+    assert 2 < stream.write.call_count < 10
+    stream.flush.assert_called_once()
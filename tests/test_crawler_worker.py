@@ -3,9 +3,18 @@ from unittest.mock import AsyncMock, MagicMock
 import pytest
 from webcrawler_arnoldkyeza.core.datastore.blob_storage import BlobStorage
 from webcrawler_arnoldkyeza.core.datastore.database_manager import DatabaseManager
+from webcrawler_arnoldkyeza.core.datastore.write_behind_writer import WriteBehindWriter
 from webcrawler_arnoldkyeza.core.duplicate_eliminator.duplicate_eliminator import DuplicateEliminator
-from webcrawler_arnoldkyeza.core.enums.url_status_type import UrlStatusType
+from webcrawler_arnoldkyeza.core.extractor.content_parser.parser_result import ParserResult
+from webcrawler_arnoldkyeza.core.extractor.parse_pool import ParsePool
+from webcrawler_arnoldkyeza.core.html_fetcher.fetch_response import CacheValidators, FetchResponse, NOT_MODIFIED
+from webcrawler_arnoldkyeza.core.html_fetcher.protocol_handlers.errors import (
+    TransientFetchError,
+    UnsupportedSchemeError,
+)
+from webcrawler_arnoldkyeza.core.scheduler.models.url import Url
 from webcrawler_arnoldkyeza.core.scheduler.scheduler import Scheduler
+from webcrawler_arnoldkyeza.core.service_host.concurrency_limiter import AdaptiveConcurrencyLimiter
 from webcrawler_arnoldkyeza.core.service_host.crawler_worker import CrawlerWorker
 
 
@@ -16,16 +25,21 @@ async def test_crawler_worker_processes_url_successfully(mocker):
     scheduler_mock.get_next_url = AsyncMock(return_value=(0, "http://example.com"))
 
     duplicate_eliminator_mock = MagicMock(spec=DuplicateEliminator)
+    duplicate_eliminator_mock.is_near_duplicate_content.return_value = False
     duplicate_eliminator_mock.is_duplicate_content.return_value = False
     duplicate_eliminator_mock.filter_extracted_urls.return_value = []
 
     database_manager_mock = MagicMock(spec=DatabaseManager)
-    database_manager_mock.get_url.return_value = MagicMock()
+    database_manager_mock.claim_url.return_value = MagicMock()
 
     blob_storage_mock = MagicMock(spec=BlobStorage)
 
-    mocker.patch("webcrawler_arnoldkyeza.core.service_host.crawler_worker.HTMLFetcher", MagicMock())
-    mocker.patch("webcrawler_arnoldkyeza.core.service_host.crawler_worker.Extractor", return_value=MagicMock())
+    mocker.patch("webcrawler_arnoldkyeza.core.service_host.crawler_worker.HTMLFetcher", MagicMock(
+        fetch=AsyncMock(return_value=FetchResponse(content="<html></html>"))
+    ))
+    mocker.patch("webcrawler_arnoldkyeza.core.service_host.crawler_worker.Extractor", return_value=MagicMock(
+        extract=MagicMock(return_value=ParserResult(title="t", content="text", extracted_urls=["a"], base_url="/docs/"))
+    ))
     mocker.patch("webcrawler_arnoldkyeza.core.service_host.crawler_worker.HTTPProtocolHandler", MagicMock())
     mocker.patch("webcrawler_arnoldkyeza.core.service_host.crawler_worker.calculate_text_checksum",
                  return_value="checksum123")
@@ -43,10 +57,12 @@ async def test_crawler_worker_processes_url_successfully(mocker):
     await worker.run()
 
     scheduler_mock.get_next_url.assert_called_once()
-    database_manager_mock.update_url_status.assert_called_once_with("http://example.com", UrlStatusType.IN_PROGRESS)
+    database_manager_mock.claim_url.assert_called_once_with("http://example.com")
     blob_storage_mock.upload.assert_called_once()
-    database_manager_mock.mark_url_as_crawled.assert_called_once()
+    database_manager_mock.commit_page.assert_called_once()
     database_manager_mock.update_url_on_failed.assert_not_called()
+    # links are resolved against the page's <base href>
+    assert duplicate_eliminator_mock.filter_extracted_urls.call_args.kwargs["base_url"] == "http://example.com/docs/"
 
 
 @pytest.mark.asyncio
@@ -95,3 +111,299 @@ async def test_crawler_worker_handles_processing_error(mocker):
 
     database_manager_mock.update_url_on_failed.assert_called_once_with("http://example.com", "Error fetching content")
     blob_storage_mock.upload.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_crawler_worker_uses_injected_html_fetcher(mocker):
+    scheduler_mock = MagicMock(spec=Scheduler)
+    scheduler_mock.get_next_url = AsyncMock(return_value=(0, "http://example.com"))
+    scheduler_mock.finished.side_effect = [False, True]
+
+    duplicate_eliminator_mock = MagicMock(spec=DuplicateEliminator)
+    duplicate_eliminator_mock.is_near_duplicate_content.return_value = False
+    duplicate_eliminator_mock.is_duplicate_content.return_value = True
+    duplicate_eliminator_mock.filter_extracted_urls.return_value = []
+
+    database_manager_mock = MagicMock(spec=DatabaseManager)
+    database_manager_mock.claim_url.return_value = MagicMock()
+
+    html_fetcher_mock = MagicMock(fetch=AsyncMock(return_value=FetchResponse(content="<html></html>")))
+    handler_patch = mocker.patch("webcrawler_arnoldkyeza.core.service_host.crawler_worker.HTTPProtocolHandler")
+    mocker.patch("webcrawler_arnoldkyeza.core.service_host.crawler_worker.Extractor", return_value=MagicMock(
+        extract=MagicMock(return_value=ParserResult(title="t", content="text"))
+    ))
+
+    worker = CrawlerWorker(
+        worker_id=1,
+        scheduler=scheduler_mock,
+        duplicate_eliminator=duplicate_eliminator_mock,
+        database_manager=database_manager_mock,
+        blob_storage=MagicMock(spec=BlobStorage),
+        html_fetcher=html_fetcher_mock,
+    )
+
+    await worker.run()
+
+    html_fetcher_mock.fetch.assert_awaited_once()
+    assert html_fetcher_mock.fetch.await_args.args == ("http://example.com",)
+    handler_patch.assert_not_called()
+    database_manager_mock.commit_page.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_crawler_worker_revalidates_and_skips_not_modified_content(mocker):
+    scheduler_mock = MagicMock(spec=Scheduler)
+    scheduler_mock.get_next_url = AsyncMock(return_value=(0, "http://example.com"))
+    scheduler_mock.finished.side_effect = [False, True]
+
+    duplicate_eliminator_mock = MagicMock(spec=DuplicateEliminator)
+    database_manager_mock = MagicMock(spec=DatabaseManager)
+    database_manager_mock.claim_url.return_value = Url(
+        url="http://example.com", normalized_url="http://example.com", url_id=1,
+        etag='"v1"', last_modified="Wed, 01 Jan 2025 00:00:00 GMT",
+    )
+    blob_storage_mock = MagicMock(spec=BlobStorage)
+
+    html_fetcher_mock = MagicMock(fetch=AsyncMock(return_value=FetchResponse(
+        content=None, status_code=NOT_MODIFIED,
+        validators=CacheValidators(etag='"v1"', last_modified="Wed, 01 Jan 2025 00:00:00 GMT"),
+    )))
+    extractor_patch = mocker.patch("webcrawler_arnoldkyeza.core.service_host.crawler_worker.Extractor")
+
+    worker = CrawlerWorker(
+        worker_id=1,
+        scheduler=scheduler_mock,
+        duplicate_eliminator=duplicate_eliminator_mock,
+        database_manager=database_manager_mock,
+        blob_storage=blob_storage_mock,
+        html_fetcher=html_fetcher_mock,
+    )
+
+    await worker.run()
+
+    html_fetcher_mock.fetch.assert_awaited_once_with(
+        "http://example.com",
+        validators=CacheValidators(etag='"v1"', last_modified="Wed, 01 Jan 2025 00:00:00 GMT"),
+    )
+    extractor_patch.assert_not_called()
+    blob_storage_mock.upload.assert_not_called()
+    duplicate_eliminator_mock.filter_extracted_urls.assert_not_called()
+    scheduler_mock.admit_many.assert_not_called()
+    database_manager_mock.commit_page.assert_called_once()
+    _, kwargs = database_manager_mock.commit_page.call_args
+    assert kwargs == {"etag": '"v1"', "last_modified": "Wed, 01 Jan 2025 00:00:00 GMT"}
+
+
+@pytest.mark.asyncio
+async def test_crawler_worker_schedules_retry_on_transient_error():
+    scheduler_mock = MagicMock(spec=Scheduler)
+    scheduler_mock.get_next_url = AsyncMock(return_value=(2, "http://example.com"))
+    scheduler_mock.finished.side_effect = [False, True]
+    scheduler_mock.schedule_retry.return_value = True
+
+    database_manager_mock = MagicMock(spec=DatabaseManager)
+    database_manager_mock.record_failed_attempt.return_value = 1
+
+    error = TransientFetchError("Service unavailable", status_code=503, retry_after=5.0)
+    worker = CrawlerWorker(
+        worker_id=1,
+        scheduler=scheduler_mock,
+        duplicate_eliminator=MagicMock(spec=DuplicateEliminator),
+        database_manager=database_manager_mock,
+        blob_storage=MagicMock(spec=BlobStorage),
+        html_fetcher=MagicMock(fetch=AsyncMock(side_effect=error)),
+    )
+
+    await worker.run()
+
+    scheduler_mock.record_fetch_failure.assert_called_once_with("http://example.com", error)
+    database_manager_mock.record_failed_attempt.assert_called_once_with("http://example.com", "Service unavailable")
+    scheduler_mock.schedule_retry.assert_called_once_with(2, "http://example.com", 1, error)
+    database_manager_mock.update_url_on_failed.assert_not_called()
+    scheduler_mock.queue_task_done.assert_called_once_with("http://example.com")
+
+
+@pytest.mark.asyncio
+async def test_crawler_worker_fails_url_with_an_unsupported_scheme():
+    scheduler_mock = MagicMock(spec=Scheduler)
+    scheduler_mock.get_next_url = AsyncMock(return_value=(0, "ftp://example.com/file"))
+    scheduler_mock.finished.side_effect = [False, True]
+
+    database_manager_mock = MagicMock(spec=DatabaseManager)
+    worker = CrawlerWorker(
+        worker_id=1,
+        scheduler=scheduler_mock,
+        duplicate_eliminator=MagicMock(spec=DuplicateEliminator),
+        database_manager=database_manager_mock,
+        blob_storage=MagicMock(spec=BlobStorage),
+        html_fetcher=MagicMock(fetch=AsyncMock(return_value=None)),
+    )
+
+    await worker.run()
+
+    error = scheduler_mock.record_fetch_failure.call_args.args[1]
+    assert isinstance(error, UnsupportedSchemeError)
+    scheduler_mock.record_fetch_success.assert_not_called()
+    database_manager_mock.record_failed_attempt.assert_not_called()
+    database_manager_mock.update_url_on_failed.assert_called_once_with(
+        "ftp://example.com/file", "Unsupported URL scheme: ftp"
+    )
+    scheduler_mock.queue_task_done.assert_called_once_with("ftp://example.com/file")
+
+
+@pytest.mark.asyncio
+async def test_crawler_worker_fails_url_when_retries_are_exhausted():
+    scheduler_mock = MagicMock(spec=Scheduler)
+    scheduler_mock.get_next_url = AsyncMock(return_value=(0, "http://example.com"))
+    scheduler_mock.finished.side_effect = [False, True]
+    scheduler_mock.schedule_retry.return_value = False
+
+    database_manager_mock = MagicMock(spec=DatabaseManager)
+    database_manager_mock.record_failed_attempt.return_value = 3
+
+    worker = CrawlerWorker(
+        worker_id=1,
+        scheduler=scheduler_mock,
+        duplicate_eliminator=MagicMock(spec=DuplicateEliminator),
+        database_manager=database_manager_mock,
+        blob_storage=MagicMock(spec=BlobStorage),
+        html_fetcher=MagicMock(fetch=AsyncMock(side_effect=TransientFetchError("Timed out"))),
+    )
+
+    await worker.run()
+
+    database_manager_mock.update_url_on_failed.assert_called_once_with("http://example.com", "Timed out")
+
+
+@pytest.mark.asyncio
+async def test_crawler_worker_reports_fetch_outcome_to_concurrency_limiter():
+    scheduler_mock = MagicMock(spec=Scheduler)
+    scheduler_mock.get_next_url = AsyncMock(side_effect=[(0, "http://example.com"), (0, None)])
+    scheduler_mock.finished.side_effect = [False, False, True]
+    scheduler_mock.schedule_retry.return_value = True
+
+    limiter_mock = MagicMock(spec=AdaptiveConcurrencyLimiter)
+    limiter_mock.acquire = AsyncMock(side_effect=[7, 8])
+
+    worker = CrawlerWorker(
+        worker_id=1,
+        scheduler=scheduler_mock,
+        duplicate_eliminator=MagicMock(spec=DuplicateEliminator),
+        database_manager=MagicMock(spec=DatabaseManager),
+        blob_storage=MagicMock(spec=BlobStorage),
+        html_fetcher=MagicMock(fetch=AsyncMock(side_effect=TransientFetchError("Timed out"))),
+        concurrency_limiter=limiter_mock,
+    )
+
+    await worker.run()
+
+    assert limiter_mock.release.call_args_list[0].args == (7,)
+    assert limiter_mock.release.call_args_list[0].kwargs == {"latency": None, "failed": True}
+    # no URL was handed out, so the slot goes back without a sample
+    assert limiter_mock.release.call_args_list[1].args == (8,)
+    assert limiter_mock.release.call_args_list[1].kwargs == {"latency": None, "failed": False}
+
+
+@pytest.mark.asyncio
+async def test_crawler_worker_parses_in_parse_pool(mocker):
+    scheduler_mock = MagicMock(spec=Scheduler)
+    scheduler_mock.get_next_url = AsyncMock(return_value=(0, "http://example.com"))
+    scheduler_mock.finished.side_effect = [False, True]
+
+    duplicate_eliminator_mock = MagicMock(spec=DuplicateEliminator)
+    duplicate_eliminator_mock.is_near_duplicate_content.return_value = False
+    duplicate_eliminator_mock.is_duplicate_content.return_value = True
+    duplicate_eliminator_mock.filter_extracted_urls.return_value = []
+
+    database_manager_mock = MagicMock(spec=DatabaseManager)
+    database_manager_mock.claim_url.return_value = MagicMock()
+
+    parse_pool_mock = MagicMock(spec=ParsePool)
+    parse_pool_mock.parse = AsyncMock(return_value=ParserResult(title="t", content="text", extracted_urls=["/a"]))
+    extractor_patch = mocker.patch("webcrawler_arnoldkyeza.core.service_host.crawler_worker.Extractor")
+
+    worker = CrawlerWorker(
+        worker_id=1,
+        scheduler=scheduler_mock,
+        duplicate_eliminator=duplicate_eliminator_mock,
+        database_manager=database_manager_mock,
+        blob_storage=MagicMock(spec=BlobStorage),
+        html_fetcher=MagicMock(fetch=AsyncMock(return_value=FetchResponse(content="<html></html>"))),
+        parse_pool=parse_pool_mock,
+    )
+
+    await worker.run()
+
+    parse_pool_mock.parse.assert_awaited_once_with("<html></html>")
+    extractor_patch.assert_not_called()
+    duplicate_eliminator_mock.filter_extracted_urls.assert_called_once()
+    assert duplicate_eliminator_mock.filter_extracted_urls.call_args.args[0] == ["/a"]
+
+
+@pytest.mark.asyncio
+async def test_crawler_worker_skips_storage_and_links_of_near_duplicate_pages(mocker):
+    scheduler_mock = MagicMock(spec=Scheduler)
+    scheduler_mock.get_next_url = AsyncMock(return_value=(0, "http://example.com/copy"))
+    scheduler_mock.finished.side_effect = [False, True]
+
+    duplicate_eliminator_mock = MagicMock(spec=DuplicateEliminator)
+    duplicate_eliminator_mock.is_near_duplicate_content.return_value = True
+
+    database_manager_mock = MagicMock(spec=DatabaseManager)
+    database_manager_mock.claim_url.return_value = MagicMock()
+    blob_storage_mock = MagicMock(spec=BlobStorage)
+
+    mocker.patch("webcrawler_arnoldkyeza.core.service_host.crawler_worker.Extractor", return_value=MagicMock(
+        extract=MagicMock(return_value=ParserResult(title="t", content="text", extracted_urls=["/a"]))
+    ))
+
+    worker = CrawlerWorker(
+        worker_id=1,
+        scheduler=scheduler_mock,
+        duplicate_eliminator=duplicate_eliminator_mock,
+        database_manager=database_manager_mock,
+        blob_storage=blob_storage_mock,
+        html_fetcher=MagicMock(fetch=AsyncMock(return_value=FetchResponse(content="<html></html>"))),
+    )
+
+    await worker.run()
+
+    duplicate_eliminator_mock.is_near_duplicate_content.assert_called_once_with("text")
+    blob_storage_mock.upload.assert_not_called()
+    duplicate_eliminator_mock.filter_extracted_urls.assert_not_called()
+    scheduler_mock.admit_many.assert_not_called()
+    database_manager_mock.commit_page.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_crawler_worker_defers_failure_status_to_write_behind_writer():
+    scheduler_mock = MagicMock(spec=Scheduler)
+    scheduler_mock.get_next_url = AsyncMock(return_value=(0, "http://example.com"))
+    scheduler_mock.finished.side_effect = [False, True]
+    scheduler_mock.schedule_retry.return_value = False
+
+    database_manager_mock = MagicMock(spec=DatabaseManager)
+    database_manager_mock.record_failed_attempt.return_value = 3
+    writer = WriteBehindWriter(database_manager=database_manager_mock, flush_interval=0.05)
+    writer.start()
+
+    worker = CrawlerWorker(
+        worker_id=1,
+        scheduler=scheduler_mock,
+        duplicate_eliminator=MagicMock(spec=DuplicateEliminator),
+        database_manager=database_manager_mock,
+        blob_storage=MagicMock(spec=BlobStorage),
+        html_fetcher=MagicMock(fetch=AsyncMock(side_effect=TransientFetchError("Timed out"))),
+        writer=writer,
+    )
+
+    await worker.run()
+
+    # the claim and the attempt count were waited for, the final status is only queued
+    database_manager_mock.claim_url.assert_called_once_with("http://example.com")
+    database_manager_mock.record_failed_attempt.assert_called_once_with("http://example.com", "Timed out")
+    database_manager_mock.update_url_on_failed.assert_not_called()
+
+    await writer.close()
+
+    database_manager_mock.update_url_on_failed.assert_called_once_with("http://example.com", "Timed out")
@@ -1,4 +1,6 @@
 import datetime
+import sqlite3
+import threading
 from pathlib import Path
 
 import pytest
@@ -6,6 +8,7 @@ import pytest
 from webcrawler_arnoldkyeza.core.datastore.database_manager import DatabaseManager
 from webcrawler_arnoldkyeza.core.enums.url_status_type import UrlStatusType
 from webcrawler_arnoldkyeza.core.scheduler.models.url import Url
+from webcrawler_arnoldkyeza.core.utils import calculate_digest
 
 
 @pytest.fixture
@@ -79,8 +82,8 @@ def test_insert_duplicate_is_ignored(db: DatabaseManager) -> None:
 
     with db._connect() as conn:
         cur = conn.execute(
-            "SELECT COUNT(1) AS num_of_urls FROM urls WHERE normalized_url = ?",
-            (test_url.normalized_url,),
+            "SELECT COUNT(1) AS num_of_urls FROM urls WHERE url_key = ?",
+            (calculate_digest(test_url.normalized_url),),
         )
         result = cur.fetchone()
     assert result is not None
@@ -139,10 +142,110 @@ def test_mark_url_as_crawled_updates_timestamp_and_status(db: DatabaseManager) -
     assert fetched_url is not None
     last = fetched_url.last_crawled_at
     status = fetched_url.status
-    assert last == last_crawled_at_time.isoformat()
+    assert last == last_crawled_at_time
     assert status == UrlStatusType.COMPLETED
 
 
+def test_mark_url_as_crawled_stores_cache_validators(db: DatabaseManager) -> None:
+    test_norm_url = "https://example.com/cached"
+    db.insert_url(make_url(test_norm_url, test_norm_url))
+
+    db.mark_url_as_crawled(test_norm_url, datetime.datetime(2025, 1, 1), etag='"v1"',
+                           last_modified="Wed, 01 Jan 2025 00:00:00 GMT")
+
+    fetched_url = db.get_url(test_norm_url)
+    assert fetched_url.etag == '"v1"'
+    assert fetched_url.last_modified == "Wed, 01 Jan 2025 00:00:00 GMT"
+
+
+def test_init_migrates_database_without_validator_columns(db_path: Path) -> None:
+    conn = sqlite3.connect(db_path)
+    conn.executescript("""
+        CREATE TABLE urls
+        (
+            url_id           INTEGER PRIMARY KEY AUTOINCREMENT,
+            url              TEXT    NOT NULL,
+            normalized_url   TEXT    NOT NULL UNIQUE,
+            priority         INTEGER NOT NULL,
+            update_frequency INTEGER NOT NULL,
+            last_crawled_at  TEXT    NULL,
+            status           TEXT    NOT NULL DEFAULT 'pending',
+            parent_url_id    INTEGER NULL,
+            error_message    TEXT    NULL,
+            depth            INTEGER NOT NULL DEFAULT 0,
+            created_at       TEXT    NOT NULL DEFAULT (DATETIME('now'))
+        );
+        INSERT INTO urls (url, normalized_url, priority, update_frequency) VALUES ('old', 'old', 1, 1);
+    """)
+    conn.close()
+
+    manager = DatabaseManager(db_path)
+
+    fetched_url = manager.get_url("old")
+    assert fetched_url is not None
+    assert fetched_url.etag is None
+    assert fetched_url.last_modified is None
+
+
+def test_init_migrates_indexes_and_counts_existing_urls_per_status(db_path: Path) -> None:
+    conn = sqlite3.connect(db_path)
+    conn.executescript("""
+        CREATE TABLE urls
+        (
+            url_id           INTEGER PRIMARY KEY AUTOINCREMENT,
+            url              TEXT    NOT NULL,
+            normalized_url   TEXT    NOT NULL UNIQUE,
+            priority         INTEGER NOT NULL,
+            update_frequency INTEGER NOT NULL,
+            last_crawled_at  TEXT    NULL,
+            status           TEXT    NOT NULL DEFAULT 'pending',
+            parent_url_id    INTEGER NULL,
+            error_message    TEXT    NULL,
+            depth            INTEGER NOT NULL DEFAULT 0,
+            created_at       TEXT    NOT NULL DEFAULT (DATETIME('now'))
+        );
+        CREATE INDEX idx_urls_url_id ON urls (url_id);
+        CREATE INDEX idx_urls_normalized_url ON urls (normalized_url);
+        INSERT INTO urls (url, normalized_url, priority, update_frequency, status)
+        VALUES ('a', 'a', 1, 1, 'completed'), ('b', 'b', 1, 1, 'in_progress'), ('c', 'c', 1, 1, 'completed');
+    """)
+    conn.close()
+
+    manager = DatabaseManager(db_path)
+
+    with manager._connect() as conn:
+        indexes = {row["name"] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        counts = dict(conn.execute("SELECT status, url_count FROM url_status_counts").fetchall())
+        plan = conn.execute("EXPLAIN QUERY PLAN SELECT * FROM urls WHERE status = ? ORDER BY priority, created_at",
+                            (UrlStatusType.PENDING.code,)).fetchall()
+    assert "idx_urls_url_id" not in indexes and "idx_urls_normalized_url" not in indexes
+    assert {"idx_urls_pending_priority", "idx_urls_pending", "idx_urls_in_progress"} <= indexes
+    assert counts == {UrlStatusType.COMPLETED.code: 2, UrlStatusType.IN_PROGRESS.code: 1}
+    assert "idx_urls_pending_priority" in plan[0]["detail"]
+
+    assert manager.has_active_urls() is True
+    manager.update_url_status("b", UrlStatusType.COMPLETED)
+    assert manager.has_active_urls() is False
+    manager.close()
+
+    # reopening keeps the counters instead of counting again
+    assert DatabaseManager(db_path).has_active_urls() is False
+
+
+def test_status_counts_follow_inserts_updates_and_deletes(db: DatabaseManager) -> None:
+    db.insert_urls([make_url(f"https://a.com/{i}", f"https://a.com/{i}") for i in range(3)])
+    db.insert_url(make_url("https://a.com/0", "https://a.com/0"))
+    db.claim_url("https://a.com/0")
+    db.commit_page("https://a.com/0", [make_url("https://a.com/3", "https://a.com/3")], datetime.datetime(2025, 1, 1))
+    db.update_url_on_failed("https://a.com/1", "Timed out")
+    with db._connect() as conn:
+        conn.execute("DELETE FROM urls WHERE url_key = ?", (calculate_digest("https://a.com/2"),))
+        counts = {UrlStatusType.from_code(row["status"]): row["url_count"]
+                  for row in conn.execute("SELECT status, url_count FROM url_status_counts")}
+
+    assert counts == {"pending": 1, "in_progress": 0, "completed": 1, "failed": 1}
+
+
 def test_update_url_on_failed_sets_status_and_error_message(db: DatabaseManager) -> None:
     test_norm_url = "https://example.com/fail"
     db.insert_url(make_url(test_norm_url, test_norm_url))
@@ -158,6 +261,24 @@ def test_update_url_on_failed_sets_status_and_error_message(db: DatabaseManager)
     assert err == msg
 
 
+def test_record_failed_attempt_counts_attempts_until_crawled(db: DatabaseManager) -> None:
+    test_norm_url = "https://example.com/flaky"
+    db.insert_url(make_url(test_norm_url, test_norm_url))
+    db.update_url_status(test_norm_url, UrlStatusType.IN_PROGRESS)
+
+    assert db.record_failed_attempt(test_norm_url, "timeout") == 1
+    assert db.record_failed_attempt(test_norm_url, "503") == 2
+
+    fetched_url = db.get_url(test_norm_url)
+    assert fetched_url.status == UrlStatusType.PENDING
+    assert fetched_url.attempts == 2
+    assert fetched_url.error_message == "503"
+
+    db.mark_url_as_crawled(test_norm_url, datetime.datetime.now())
+    assert db.get_url(test_norm_url).attempts == 0
+    assert db.record_failed_attempt("https://example.com/unknown", "timeout") == 0
+
+
 def test_has_active_urls_false_when_empty(db: DatabaseManager) -> None:
     assert db.has_active_urls() is False
 
@@ -197,9 +318,141 @@ def test_get_crawled_urls_with_extracted_returns_mapping(db: DatabaseManager) ->
     other_parent_norm = "https://example.com/empty"
     db.insert_url(make_url(other_parent_norm, other_parent_norm, status=UrlStatusType.COMPLETED))
 
-    mapping = db.get_crawled_urls_with_extracted()
+    mapping = dict(db.get_crawled_urls_with_extracted())
 
     assert parent_norm in mapping
     assert mapping[parent_norm] == [child1_norm, child2_norm]
     assert other_parent_norm in mapping
     assert mapping[other_parent_norm] == []
+
+
+def test_get_crawled_urls_with_extracted_streams_groups_in_discovery_order(db: DatabaseManager) -> None:
+    db.insert_urls([make_url(f"https://a.com/{i}", f"https://a.com/{i}") for i in range(4)])
+    for i in (2, 0, 3):
+        parent = db.claim_url(f"https://a.com/{i}")
+        children = [make_url(f"https://a.com/{i}/{j}", f"https://a.com/{i}/{j}", parent_url_id=parent.url_id)
+                    for j in range(i)]
+        db.commit_page(f"https://a.com/{i}", children, datetime.datetime(2025, 1, 1))
+
+    report = db.get_crawled_urls_with_extracted()
+
+    assert next(report) == ("https://a.com/0", [])
+    assert list(report) == [
+        ("https://a.com/2", ["https://a.com/2/0", "https://a.com/2/1"]),
+        ("https://a.com/3", ["https://a.com/3/0", "https://a.com/3/1", "https://a.com/3/2"]),
+    ]
+
+
+def test_insert_urls_bulk_inserts_and_returns_sitemap_rows_in_order(db: DatabaseManager) -> None:
+    db.insert_url(make_url("https://a.com", "https://a.com"))
+    db.insert_urls([
+        Url(url="https://a.com/1", normalized_url="https://a.com/1", depth=1, lastmod="2024-05-01",
+            sitemap_priority=0.8),
+        Url(url="https://a.com/2", normalized_url="https://a.com/2", depth=1, sitemap_priority=0.5),
+        Url(url="https://a.com/1", normalized_url="https://a.com/1", depth=1, sitemap_priority=0.1),
+    ])
+
+    sitemap_urls = db.get_sitemap_urls(after_url_id=0, limit=10)
+    assert [url.normalized_url for url in sitemap_urls] == ["https://a.com/1", "https://a.com/2"]
+    assert sitemap_urls[0].lastmod == "2024-05-01"
+    assert sitemap_urls[0].sitemap_priority == pytest.approx(0.8)
+    assert db.get_sitemap_urls(after_url_id=sitemap_urls[0].url_id, limit=10) == [sitemap_urls[1]]
+    assert db.get_max_url_id() == sitemap_urls[1].url_id
+
+
+def test_resume_queries_stream_urls_and_reset_interrupted_ones(db: DatabaseManager) -> None:
+    db.insert_urls([make_url(f"https://a.com/{i}", f"https://a.com/{i}") for i in range(5)])
+    db.update_url_status("https://a.com/1", UrlStatusType.IN_PROGRESS)
+    db.update_url_status("https://a.com/3", UrlStatusType.COMPLETED)
+
+    assert list(db.iter_normalized_urls(batch_size=2)) == [
+        ["https://a.com/0", "https://a.com/1"], ["https://a.com/2", "https://a.com/3"], ["https://a.com/4"],
+    ]
+    assert db.reset_in_progress_urls() == 1
+    assert db.get_url("https://a.com/1").status == UrlStatusType.PENDING.value
+
+    pending = db.get_pending_urls_between(after_url_id=1, up_to_url_id=4, limit=10)
+    assert [url.normalized_url for url in pending] == ["https://a.com/1", "https://a.com/2"]
+
+
+def test_reset_urls_due_for_recrawl_after_their_update_frequency(db: DatabaseManager) -> None:
+    now = datetime.datetime.now()
+    db.insert_urls([
+        make_url("https://a.com/daily", "https://a.com/daily"),
+        make_url("https://a.com/weekly", "https://a.com/weekly", update_frequency=7),
+        make_url("https://a.com/fresh", "https://a.com/fresh"),
+        make_url("https://a.com/pending", "https://a.com/pending"),
+    ])
+    two_days_ago = now - datetime.timedelta(days=2)
+    db.mark_url_as_crawled("https://a.com/daily", two_days_ago, etag='"v1"')
+    db.mark_url_as_crawled("https://a.com/weekly", two_days_ago)
+    db.mark_url_as_crawled("https://a.com/fresh", now)
+
+    assert db.reset_urls_due_for_recrawl(now) == 1
+    daily = db.get_url("https://a.com/daily")
+    assert daily.status == UrlStatusType.PENDING.value
+    assert daily.etag == '"v1"'
+    assert db.get_url("https://a.com/weekly").status == UrlStatusType.COMPLETED.value
+    assert db.get_url("https://a.com/fresh").status == UrlStatusType.COMPLETED.value
+
+
+def test_calls_share_one_connection_and_roll_back_failed_transactions(db: DatabaseManager) -> None:
+    connection = db._connection
+    db.insert_url(make_url("https://a.com", "https://a.com"))
+    assert db.get_url("https://a.com") is not None
+    assert db._connection is connection
+
+    with pytest.raises(sqlite3.IntegrityError):
+        with db._connect() as conn:
+            conn.execute("UPDATE urls SET status = ? WHERE url_key = ?",
+                         (UrlStatusType.COMPLETED.code, calculate_digest("https://a.com")))
+            conn.execute("INSERT INTO urls (url_key, host_id, path, priority, update_frequency) "
+                         "VALUES (?, 1, '', 1, 1)", (calculate_digest("https://a.com"),))
+    assert db.get_url("https://a.com").status == UrlStatusType.PENDING.value
+
+    db.close()
+    with sqlite3.connect(db.path) as other:
+        assert other.execute("SELECT COUNT(1) FROM urls").fetchone() == (1,)
+
+
+def test_claim_url_and_commit_page(db: DatabaseManager) -> None:
+    db.insert_url(make_url("https://a.com", "https://a.com"))
+    assert db.claim_url("https://missing.com") is None
+
+    parent = db.claim_url("https://a.com")
+    assert parent.status == UrlStatusType.IN_PROGRESS.value
+
+    children = [make_url(f"https://a.com/{i}", f"https://a.com/{i}", parent_url_id=parent.url_id, depth=1)
+                for i in range(3)]
+    db.commit_page("https://a.com", children + children[:1], datetime.datetime(2025, 1, 1), etag='"v1"')
+
+    crawled = db.get_url("https://a.com")
+    assert crawled.status == UrlStatusType.COMPLETED.value
+    assert crawled.etag == '"v1"'
+    assert list(db.get_crawled_urls_with_extracted()) == [("https://a.com", [f"https://a.com/{i}" for i in range(3)])]
+
+
+def test_lookups_do_not_wait_for_a_write_transaction(db: DatabaseManager) -> None:
+    db.insert_url(make_url("https://a.com/stored", "https://a.com/stored"))
+    in_transaction = threading.Event()
+    release = threading.Event()
+
+    def hold_batch():
+        with db.transaction():
+            db.insert_url(make_url("https://a.com/uncommitted", "https://a.com/uncommitted"))
+            in_transaction.set()
+            release.wait(timeout=5)
+
+    writer = threading.Thread(target=hold_batch)
+    writer.start()
+    try:
+        assert in_transaction.wait(timeout=5)
+        # answered from the committed state while the other thread holds the write connection
+        assert db.url_exists("https://a.com/stored")
+        assert not db.url_exists("https://a.com/uncommitted")
+        assert db.has_active_urls()
+        assert [url.normalized_url for url in db.get_pending_urls_between(0, 10, limit=10)] == ["https://a.com/stored"]
+    finally:
+        release.set()
+        writer.join()
+    assert db.url_exists("https://a.com/uncommitted")
@@ -0,0 +1,84 @@
+import os
+
+import fakeredis
+import pytest
+
+from webcrawler_arnoldkyeza.core.duplicate_eliminator.backends.memory_backend import MemoryDedupBackend
+from webcrawler_arnoldkyeza.core.duplicate_eliminator.backends.redis_backend import (
+    FakeRedisDedupBackend,
+    RedisDedupBackend,
+)
+from webcrawler_arnoldkyeza.core.duplicate_eliminator.backends.sharded_redis_backend import ShardedRedisDedupBackend
+from webcrawler_arnoldkyeza.core.duplicate_eliminator.duplicate_eliminator import DuplicateEliminator
+
+
+def redis_node() -> RedisDedupBackend:
+    # each node gets a server of its own, like separate Redis instances
+    return RedisDedupBackend(client=fakeredis.FakeStrictRedis(server=fakeredis.FakeServer()))
+
+
+@pytest.fixture(params=["memory", "redis", "sharded-redis"])
+def backend(request):
+    if request.param == "memory":
+        return MemoryDedupBackend()
+    if request.param == "redis":
+        return redis_node()
+    return ShardedRedisDedupBackend(nodes={f"redis://node{i}:6379/0": redis_node() for i in range(3)})
+
+
+def test_backends_report_which_members_were_new(backend):
+    digests = [os.urandom(16) for _ in range(50)]
+
+    assert backend.add("urls", digests[0]) is True
+    assert backend.add("urls", digests[0]) is False
+    assert backend.add("pages", digests[0]) is True
+
+    assert backend.add_many("urls", digests[:3] + digests[2:3]) == [False, True, True, False]
+    assert backend.add_many("urls", []) == []
+
+    backend.update("urls", digests)
+    assert backend.add_many("urls", digests[::10]) == [False] * 5
+    backend.close()
+
+
+def test_sharded_backend_spreads_members_and_moves_few_when_a_node_leaves():
+    nodes = {f"redis://node{i}:6379/0": redis_node() for i in range(3)}
+    sharded = ShardedRedisDedupBackend(nodes=nodes)
+    digests = [os.urandom(16) for _ in range(3000)]
+
+    sharded.update("urls", digests)
+
+    sizes = [node.client.scard("urls") for node in nodes.values()]
+    assert sum(sizes) == 3000
+    assert min(sizes) > 700
+    assert all(sharded.node_for(digest) == sharded.node_for(digest) for digest in digests[:10])
+
+    # consistent hashing: only the members of the node that left change owner
+    survivors = dict(list(nodes.items())[:2])
+    shrunk = ShardedRedisDedupBackend(nodes=survivors)
+    assert all(shrunk.node_for(digest) == sharded.node_for(digest)
+               for digest in digests if sharded.node_for(digest) in survivors)
+
+
+def test_sharded_backend_pipelines_once_per_node(mocker):
+    nodes = {f"redis://node{i}:6379/0": redis_node() for i in range(2)}
+    sharded = ShardedRedisDedupBackend(nodes=nodes)
+    pipelines = [mocker.spy(node.client, "pipeline") for node in nodes.values()]
+
+    sharded.add_many("urls", [os.urandom(16) for _ in range(100)])
+
+    assert [pipeline.call_count for pipeline in pipelines] == [1, 1]
+
+
+def test_for_backend_builds_the_named_backend():
+    assert isinstance(DuplicateEliminator.for_backend("fakeredis").backend, FakeRedisDedupBackend)
+    assert isinstance(DuplicateEliminator.for_backend("memory").backend, MemoryDedupBackend)
+
+    # clients connect lazily, so no server is needed to build them
+    sharded = DuplicateEliminator.for_backend("sharded-redis", ["redis://a:6379/0", "redis://b:6379/0"]).backend
+    assert list(sharded.nodes) == ["redis://a:6379/0", "redis://b:6379/0"]
+
+    with pytest.raises(ValueError):
+        DuplicateEliminator.for_backend("sharded-redis")
+    with pytest.raises(ValueError):
+        DuplicateEliminator.for_backend("memcached")
@@ -0,0 +1,127 @@
+import asyncio
+import socket
+
+import pytest
+
+from webcrawler_arnoldkyeza.core.html_fetcher.dns_cache import DNSCache
+
+
+class FakeClock:
+    def __init__(self, now: float = 0.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FakeResolver:
+    def __init__(self, fail: bool = False):
+        self.calls = []
+        self.fail = fail
+        self.closed = False
+
+    async def resolve(self, host, port=0, family=socket.AF_INET):
+        self.calls.append((host, port, family))
+        await asyncio.sleep(0)
+        if self.fail:
+            raise socket.gaierror(f"cannot resolve {host}")
+        return [{"hostname": host, "host": "127.0.0.1", "port": port, "family": socket.AF_INET,
+                 "proto": 0, "flags": socket.AI_NUMERICHOST}]
+
+    async def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    return FakeClock()
+
+
+@pytest.mark.asyncio
+async def test_resolve_caches_until_ttl_expires(clock):
+    resolver = FakeResolver()
+    cache = DNSCache(ttl=10.0, resolver=resolver, clock=clock)
+
+    first = await cache.resolve("example.com", 443, family=socket.AF_UNSPEC)
+    second = await cache.resolve("example.com", 443, family=socket.AF_UNSPEC)
+
+    assert first == second
+    assert len(resolver.calls) == 1
+    assert cache.stats() == {"hits": 1, "misses": 1, "prefetches": 0, "entries": 1}
+
+    clock.now = 10.0
+    await cache.resolve("example.com", 443, family=socket.AF_UNSPEC)
+    assert len(resolver.calls) == 2
+    assert cache.misses == 2
+
+
+@pytest.mark.asyncio
+async def test_concurrent_resolves_share_one_lookup(clock):
+    resolver = FakeResolver()
+    cache = DNSCache(resolver=resolver, clock=clock)
+
+    results = await asyncio.gather(*(cache.resolve("example.com", 80) for _ in range(5)))
+
+    assert len(resolver.calls) == 1
+    assert all(result == results[0] for result in results)
+    assert cache.misses == 1
+    assert cache.hits == 4
+
+
+@pytest.mark.asyncio
+async def test_failed_lookups_are_negatively_cached(clock):
+    resolver = FakeResolver(fail=True)
+    cache = DNSCache(negative_ttl=5.0, resolver=resolver, clock=clock)
+
+    with pytest.raises(OSError):
+        await cache.resolve("missing.example", 80)
+    with pytest.raises(OSError):
+        await cache.resolve("missing.example", 80)
+    assert len(resolver.calls) == 1
+
+    clock.now = 5.0
+    with pytest.raises(OSError):
+        await cache.resolve("missing.example", 80)
+    assert len(resolver.calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_prefetch_warms_cache_for_later_resolve(clock):
+    resolver = FakeResolver()
+    cache = DNSCache(resolver=resolver, clock=clock)
+
+    cache.prefetch("example.com", 443)
+    cache.prefetch("example.com", 443)
+    assert cache.prefetches == 1
+
+    await asyncio.sleep(0.01)
+    await cache.resolve("example.com", 443, family=socket.AF_UNSPEC)
+
+    assert resolver.calls == [("example.com", 443, socket.AF_UNSPEC)]
+    assert cache.hits == 1
+    assert cache.misses == 0
+
+
+@pytest.mark.asyncio
+async def test_cache_evicts_least_recently_used_entries(clock):
+    resolver = FakeResolver()
+    cache = DNSCache(max_size=2, resolver=resolver, clock=clock)
+
+    await cache.resolve("a.example", 80)
+    await cache.resolve("b.example", 80)
+    await cache.resolve("a.example", 80)
+    await cache.resolve("c.example", 80)
+    await cache.resolve("a.example", 80)
+    await cache.resolve("b.example", 80)
+
+    assert [host for host, _, _ in resolver.calls] == ["a.example", "b.example", "c.example", "b.example"]
+
+
+@pytest.mark.asyncio
+async def test_close_closes_wrapped_resolver(clock):
+    resolver = FakeResolver()
+    cache = DNSCache(resolver=resolver, clock=clock)
+
+    await cache.close()
+
+    assert resolver.closed
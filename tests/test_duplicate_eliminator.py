@@ -1,9 +1,13 @@
 import fakeredis
 import pytest
 
+from webcrawler_arnoldkyeza.core.datastore.database_manager import DatabaseManager
+from webcrawler_arnoldkyeza.core.duplicate_eliminator.bloom_filter import ScalableBloomFilter
+from webcrawler_arnoldkyeza.core.duplicate_eliminator.backends.redis_backend import RedisDedupBackend
 from webcrawler_arnoldkyeza.core.duplicate_eliminator.duplicate_eliminator import DuplicateEliminator
+from webcrawler_arnoldkyeza.core.duplicate_eliminator.simhash import SimHashIndex
 from webcrawler_arnoldkyeza.core.scheduler.models.url import Url
-from webcrawler_arnoldkyeza.core.utils import normalize_url, calculate_text_checksum
+from webcrawler_arnoldkyeza.core.utils import normalize_url, calculate_digest
 
 
 @pytest.fixture
@@ -13,7 +17,7 @@ def fake_redis() -> fakeredis.FakeStrictRedis:
 
 @pytest.fixture
 def duplicate_eliminator(fake_redis: fakeredis.FakeStrictRedis) -> DuplicateEliminator:
-    return DuplicateEliminator(redis=fake_redis)
+    return DuplicateEliminator(backend=RedisDedupBackend(fake_redis))
 
 
 @pytest.fixture
@@ -50,8 +54,9 @@ def test_is_duplicate_url(fake_redis, duplicate_eliminator):
 
     assert de.is_duplicate_url(normalized) is False
 
-    checksum = calculate_text_checksum(normalized)
-    assert redis.sismember("crawler:visited_urls", checksum)
+    digest = calculate_digest(normalized)
+    assert len(digest) == 16
+    assert redis.sismember("crawler:visited_urls", digest)
 
     assert de.is_duplicate_url(normalized) is True
 
@@ -63,8 +68,7 @@ def test_is_duplicate_content(fake_redis, duplicate_eliminator, sample_html_cont
 
     assert de.is_duplicate_content(content) is False
 
-    checksum = calculate_text_checksum(content)
-    assert redis.sismember("crawler:seen_content", checksum)
+    assert redis.sismember("crawler:seen_content", calculate_digest(content))
 
     assert de.is_duplicate_content(content) is True
 
@@ -90,8 +94,7 @@ def test_filter_extracted_urls_filters_invalid_and_duplicates(fake_redis, duplic
     assert all(u.depth == depth for u in filtered)
 
     for norm in expected_norm:
-        checksum = calculate_text_checksum(norm)
-        assert redis.sismember("crawler:visited_urls", checksum)
+        assert redis.sismember("crawler:visited_urls", calculate_digest(norm))
 
     # Running the filter again on already-seen URLs should yield nothing new
     filtered_again = de.filter_extracted_urls([
@@ -100,3 +103,124 @@ def test_filter_extracted_urls_filters_invalid_and_duplicates(fake_redis, duplic
         "https://example.com/path?a=1&b=2&c=3",
     ], parent_url_id=parent_url_id, depth=depth)
     assert filtered_again == []
+
+
+def test_filter_extracted_urls_resolves_relative_links(duplicate_eliminator):
+    filtered = duplicate_eliminator.filter_extracted_urls(
+        ["/about/", "contact", None, "https://example.com/about"],
+        parent_url_id=1,
+        depth=1,
+        base_url="https://example.com/team/",
+    )
+
+    assert [u.normalized_url for u in filtered] == [
+        "https://example.com/about",
+        "https://example.com/team/contact",
+    ]
+    assert [u.url for u in filtered] == ["/about/", "contact"]
+
+
+def test_is_near_duplicate_content_needs_an_index(fake_redis):
+    page = " ".join(f"section {i} describes the same product in many words" for i in range(30))
+    plain = DuplicateEliminator(backend=RedisDedupBackend(fake_redis))
+    near = DuplicateEliminator(backend=RedisDedupBackend(fake_redis), near_duplicates=SimHashIndex(threshold=3))
+
+    assert plain.is_near_duplicate_content(page) is False
+    assert plain.is_near_duplicate_content(page) is False
+
+    assert near.is_near_duplicate_content(f"{page} rendered at 10:00:00") is False
+    assert near.is_near_duplicate_content(f"{page} rendered at 11:30:59") is True
+    assert near.is_near_duplicate_content("") is False
+    assert near.is_near_duplicate_content("") is False
+
+
+def test_bloom_filter_hits_are_confirmed_against_the_database(fake_redis, mocker):
+    database_manager = mocker.Mock(spec=DatabaseManager)
+    database_manager.url_exists.return_value = False
+    de = DuplicateEliminator(backend=RedisDedupBackend(fake_redis),
+                             url_filter=ScalableBloomFilter(initial_capacity=100), database_manager=database_manager)
+
+    assert de.is_duplicate_url("https://example.com/a") is False
+    de.mark_urls_decided(["https://example.com/a"])
+    database_manager.url_exists.assert_not_called()
+
+    # seen by the filter but not in the database: treated as a false positive
+    assert de.is_duplicate_url("https://example.com/a") is False
+    database_manager.url_exists.return_value = True
+    assert de.is_duplicate_url("https://example.com/a") is True
+    database_manager.url_exists.assert_called_with("https://example.com/a")
+    assert fake_redis.scard("crawler:visited_urls") == 0
+
+
+def test_bloom_filter_link_from_two_pages_before_either_is_stored(fake_redis, mocker):
+    database_manager = mocker.Mock(spec=DatabaseManager)
+    database_manager.url_exists.return_value = False
+    de = DuplicateEliminator(backend=RedisDedupBackend(fake_redis),
+                             url_filter=ScalableBloomFilter(initial_capacity=100), database_manager=database_manager)
+
+    assert len(de.filter_extracted_urls(["http://e.com/x"], parent_url_id=1, depth=1)) == 1
+    assert len(de.filter_extracted_urls(["http://e.com/x"], parent_url_id=2, depth=1)) == 0
+    # until the scheduler has stored or dropped it, a repeat is answered without a database lookup
+    assert len(de.filter_extracted_urls(["http://e.com/x"], parent_url_id=3, depth=1)) == 0
+    database_manager.url_exists.assert_not_called()
+
+
+def test_filter_extracted_urls_drops_repeated_links_of_a_page(fake_redis, mocker):
+    database_manager = mocker.Mock(spec=DatabaseManager)
+    database_manager.url_exists.return_value = False
+    de = DuplicateEliminator(backend=RedisDedupBackend(fake_redis),
+                             url_filter=ScalableBloomFilter(initial_capacity=100), database_manager=database_manager)
+
+    urls = de.filter_extracted_urls(["/a", "/b", "/a/", "https://example.com/b"], parent_url_id=1, depth=1,
+                                    base_url="https://example.com/")
+
+    assert [url.normalized_url for url in urls] == ["https://example.com/a", "https://example.com/b"]
+
+
+def test_are_duplicate_urls_uses_one_pipelined_round_trip(fake_redis, duplicate_eliminator, mocker):
+    duplicate_eliminator.is_duplicate_url("https://example.com/seen")
+    pipeline = mocker.spy(fake_redis, "pipeline")
+    sismember = mocker.spy(fake_redis, "sismember")
+
+    duplicates = duplicate_eliminator.are_duplicate_urls(
+        ["https://example.com/new", "https://example.com/seen", "https://example.com/new"]
+    )
+
+    assert duplicates == [False, True, True]
+    pipeline.assert_called_once_with(transaction=False)
+    sismember.assert_not_called()
+    assert duplicate_eliminator.are_duplicate_urls([]) == []
+
+
+def test_workers_sharing_redis_agree_on_the_first_sighting(fake_redis):
+    first = DuplicateEliminator(backend=RedisDedupBackend(fake_redis))
+    second = DuplicateEliminator(backend=RedisDedupBackend(fake_redis))
+
+    assert first.filter_extracted_urls(["https://example.com/a"], parent_url_id=1, depth=1) != []
+    urls = second.filter_extracted_urls(["https://example.com/a", "https://example.com/b"], parent_url_id=2, depth=1)
+    assert [url.normalized_url for url in urls] == ["https://example.com/b"]
+    assert second.is_duplicate_url("https://example.com/a") is True
+
+
+def test_restore_seen_urls_in_one_command_per_batch(fake_redis, duplicate_eliminator, mocker):
+    sadd = mocker.spy(fake_redis, "sadd")
+
+    restored = duplicate_eliminator.restore_seen_urls(
+        iter([["https://example.com/a", "https://example.com/b"], [], ["https://example.com/c"]])
+    )
+
+    assert restored == 3
+    assert sadd.call_count == 2
+    assert duplicate_eliminator.are_duplicate_urls(["https://example.com/b", "https://example.com/d"]) == [True, False]
+
+
+def test_restore_seen_urls_skips_a_reopened_bloom_filter(fake_redis, tmp_path):
+    path = tmp_path / "seen.bloom"
+    de = DuplicateEliminator(backend=RedisDedupBackend(fake_redis),
+                             url_filter=ScalableBloomFilter(initial_capacity=100, path=path))
+    assert de.restore_seen_urls([["https://example.com/a"]]) == 1
+    de.close()
+
+    reopened = DuplicateEliminator(backend=RedisDedupBackend(fake_redis), url_filter=ScalableBloomFilter(path=path))
+    assert reopened.restore_seen_urls([["https://example.com/a"]]) == 0
+    assert reopened.is_duplicate_url("https://example.com/a") is True
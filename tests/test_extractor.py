@@ -1,5 +1,8 @@
+import pytest
+
 from webcrawler_arnoldkyeza.core.extractor.extractor import Extractor
 from webcrawler_arnoldkyeza.core.extractor.content_parser.content_parser import ContentParser
+from webcrawler_arnoldkyeza.core.extractor.content_parser.fast_textual_parser import FastTextualParser
 from webcrawler_arnoldkyeza.core.extractor.content_parser.textual_parser import TextualParser
 from webcrawler_arnoldkyeza.core.extractor.content_parser.parser_result import ParserResult
 
@@ -34,3 +37,11 @@ def test_extractor_with_textual_parser_integration():
     assert isinstance(result, ParserResult)
     assert result.title == "sample_title"
     assert result.extracted_urls == ["/link1", "/link2"]
+
+
+def test_extractor_for_parser_selects_backend():
+    assert isinstance(Extractor.for_parser("bs4").parser, TextualParser)
+    assert isinstance(Extractor.for_parser("fast").parser, FastTextualParser)
+
+    with pytest.raises(ValueError):
+        Extractor.for_parser("lxml")
@@ -0,0 +1,93 @@
+import pytest
+
+from webcrawler_arnoldkyeza.core.extractor.content_parser.fast_textual_parser import FastTextualParser
+from webcrawler_arnoldkyeza.core.extractor.content_parser.textual_parser import TextualParser
+
+# Each document is parsed by both backends; the fast parser must produce the same ParserResult as BeautifulSoup.
+PARITY_DOCUMENTS = {
+    "basic": """
+        <html>
+          <head><title>Hello World</title></head>
+          <body>
+            <h1>Welcome</h1>
+            <p>Some paragraph.</p>
+            <a href="https://example.com/page">Example</a>
+            <a href="/relative/path">Rel</a>
+            <a>No href here</a>
+          </body>
+        </html>
+    """,
+    "doctype_comments_and_declarations": (
+        "<!DOCTYPE html><html><head><title>Doc</title></head>"
+        "<body>x<!-- a comment -->y<!bogus>z<?php echo 1 ?>w</body></html>"
+    ),
+    "entities": (
+        "<html><head><title> Caf&eacute; &amp; Bar </title></head>"
+        "<body><p>a&nbsp;b &lt;tag&gt; &#169; &#x263A; &copy</p>"
+        "<a href=\"/search?q=1&amp;page=2\">s</a></body></html>"
+    ),
+    "script_style_and_template": (
+        "<html><head><title>T</title><style>p { color: red }</style>"
+        "<script>var html = \"<a href='/not-a-link'>\"; if (a < b) {}</script></head>"
+        "<body><template><p>hidden</p><a href=\"/in-template\">t</a></template>visible"
+        "<SCRIPT type=\"module\">x</SCRIPT >after</body></html>"
+    ),
+    "attribute_forms": (
+        "<html><head><title>Attrs</title></head><body>"
+        "<A HREF='/upper'>u</A><a href=/unquoted>q</a><a class=\"x\" href = \"/spaced\">s</a>"
+        "<a title=\"has href=/fake inside\" href=\"/real\">r</a><a href=\"/1\" href=\"/2\">dup</a>"
+        "<a href>empty</a><a name=\"anchor\">none</a><a href=\"/self-closing\"/>"
+        "</body></html>"
+    ),
+    "whitespace": (
+        "<html>\n  <head>\n    <title>Spaces</title>\n  </head>\n  <body>\n\n"
+        "    <div>  padded  </div>   <span>a</span>\t<span>b</span>\n"
+        "    <pre>\n  keep   this\n\n  </pre>\n    <textarea>   </textarea>\n  </body>\n</html>\n"
+    ),
+    "cdata_and_stray_brackets": (
+        "<html><head><title>Math</title></head><body>"
+        "<p>1 < 2 and 3 > 2</p><![CDATA[raw <b>text</b>]]><p>a<b>bold</b>c</p></body></html>"
+    ),
+    "base_href": (
+        "<html><head><base target=\"_blank\"><base href=\"https://cdn.example.com/docs/\"><base href=\"/ignored/\">"
+        "<title>Base</title></head><body><a href=\"guide\">g</a></body></html>"
+    ),
+    "title_in_body": "<html><body><p>first</p><title>Late Title</title><a href='#top'>top</a></body></html>",
+    "unicode": (
+        "<html><head><title>Ünïcödé Títle</title></head>"
+        "<body><p>日本語のテキスト</p><a href=\"/é\">é</a></body></html>"
+    ),
+}
+
+
+def generated_page(sections: int) -> str:
+    body = []
+    for i in range(sections):
+        body.append(f'<div class="section-{i}" data-index=\'{i}\'>\n  <h2>Section {i}</h2>\n')
+        body.append(f'  <p>Text of section {i} with <em>emphasis</em> &amp; an entity.</p>\n')
+        body.append(f'  <a href="/section/{i}?ref=nav&amp;x={i}">Section {i}</a> <a href=#s{i}>#</a>\n')
+        if i % 10 == 0:
+            body.append('  <script>window.track("<a href=/x>")</script><!-- separator --><br/>\n')
+        body.append('</div>\n')
+    return f"<!DOCTYPE html>\n<html><head><title>Generated Page</title></head><body>\n{''.join(body)}</body></html>"
+
+
+@pytest.mark.parametrize("html", list(PARITY_DOCUMENTS.values()) + [generated_page(200)],
+                         ids=list(PARITY_DOCUMENTS) + ["generated"])
+def test_fast_parser_matches_beautifulsoup(html):
+    assert FastTextualParser.parse(html) == TextualParser.parse(html)
+
+
+def test_fast_parser_returns_empty_title_when_missing():
+    result = FastTextualParser.parse("<html><body><a href='/a'>a</a></body></html>")
+
+    assert result.title == ""
+    assert result.content == "a"
+    assert result.extracted_urls == ["/a"]
+
+
+def test_fast_parser_skips_unterminated_script():
+    result = FastTextualParser.parse("<html><head><title>T</title></head><body>text<script>var a = '<a href=/x>'")
+
+    assert result.content == "Ttext"
+    assert result.extracted_urls == []
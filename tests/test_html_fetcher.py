@@ -1,15 +1,23 @@
 import asyncio
 import pytest
+import pytest_asyncio
 import requests
 
+from webcrawler_arnoldkyeza.core.html_fetcher.fetch_response import CacheValidators, NOT_MODIFIED
 from webcrawler_arnoldkyeza.core.html_fetcher.html_fetcher import HTMLFetcher
+from webcrawler_arnoldkyeza.core.html_fetcher.protocol_handlers.async_http_handler import (
+    AsyncHTTPProtocolHandler,
+)
 from webcrawler_arnoldkyeza.core.html_fetcher.protocol_handlers.http_handler import (
     HTTPProtocolHandler,
 )
 from webcrawler_arnoldkyeza.core.html_fetcher.protocol_handlers.protocol_handler import (
+    DEFAULT_USER_AGENT,
     ProtocolHandler,
 )
 from webcrawler_arnoldkyeza.core.html_fetcher.protocol_handlers.errors import (
+    ContentTooLargeError,
+    TransientFetchError,
     UnsupportedContentTypeError,
 )
 
@@ -38,7 +46,7 @@ def test_http_handler_fetches_html_success(mocker):
     response = mocker.Mock()
     response.raise_for_status = mocker.Mock()
     response.headers = {"Content-Type": "text/html; charset=utf-8"}
-    response.text = "<html><body>OK</body></html>"
+    response.iter_content.return_value = [b"<html><body>", b"OK</body></html>"]
     mocker.patch("requests.get", return_value=response)
 
     handler = HTTPProtocolHandler()
@@ -46,7 +54,31 @@ def test_http_handler_fetches_html_success(mocker):
     content = asyncio.run(handler.get_content("https://example.com"))
 
     response.raise_for_status.assert_called_once()
-    assert content == response.text
+    response.close.assert_called_once()
+    assert content.content == "<html><body>OK</body></html>"
+
+
+def test_http_handler_sends_validators_and_handles_not_modified(mocker):
+    response = mocker.Mock()
+    response.raise_for_status = mocker.Mock()
+    response.status_code = NOT_MODIFIED
+    response.headers = {}
+    get_patch = mocker.patch("requests.get", return_value=response)
+
+    handler = HTTPProtocolHandler()
+    validators = CacheValidators(etag='"v1"', last_modified="Wed, 01 Jan 2025 00:00:00 GMT")
+
+    result = asyncio.run(handler.get_content("https://example.com", validators=validators))
+
+    _, kwargs = get_patch.call_args
+    assert kwargs["headers"] == {
+        "User-Agent": DEFAULT_USER_AGENT,
+        "If-None-Match": '"v1"',
+        "If-Modified-Since": "Wed, 01 Jan 2025 00:00:00 GMT",
+    }
+    assert result.not_modified
+    assert result.content is None
+    assert result.validators == validators
 
 
 def test_http_handler_unsupported_content_type_raises(mocker):
@@ -61,6 +93,51 @@ def test_http_handler_unsupported_content_type_raises(mocker):
     with pytest.raises(UnsupportedContentTypeError):
         asyncio.run(handler.get_content("https://example.com"))
 
+    # the body is never read for unsupported content
+    response.iter_content.assert_not_called()
+    response.close.assert_called_once()
+
+
+def test_http_handler_decodes_streamed_body_with_declared_charset(mocker):
+    response = mocker.Mock()
+    response.raise_for_status = mocker.Mock()
+    response.headers = {"Content-Type": "text/html; charset=utf-8"}
+    encoded = "<p>caf\u00e9</p>".encode("utf-8")
+    # split inside the multibyte character
+    response.iter_content.return_value = [encoded[:7], encoded[7:]]
+    mocker.patch("requests.get", return_value=response)
+
+    content = asyncio.run(HTTPProtocolHandler().get_content("https://example.com"))
+
+    assert content.content == "<p>caf\u00e9</p>"
+
+
+def test_http_handler_aborts_body_larger_than_max_size(mocker):
+    response = mocker.Mock()
+    response.raise_for_status = mocker.Mock()
+    response.headers = {"Content-Type": "text/html"}
+    response.iter_content.return_value = [b"a" * 8, b"a" * 8, b"a" * 8]
+    mocker.patch("requests.get", return_value=response)
+
+    handler = HTTPProtocolHandler(max_body_size=10)
+
+    with pytest.raises(ContentTooLargeError):
+        asyncio.run(handler.get_content("https://example.com"))
+
+    response.close.assert_called_once()
+
+
+def test_http_handler_rejects_declared_content_length_over_max_size(mocker):
+    response = mocker.Mock()
+    response.raise_for_status = mocker.Mock()
+    response.headers = {"Content-Type": "text/html", "Content-Length": "2147483648"}
+    mocker.patch("requests.get", return_value=response)
+
+    with pytest.raises(ContentTooLargeError):
+        asyncio.run(HTTPProtocolHandler().get_content("https://example.com"))
+
+    response.iter_content.assert_not_called()
+
 
 def test_http_handler_request_exception_raises_value_error(mocker):
     mocker.patch("requests.get", side_effect=requests.RequestException("Error"))
@@ -70,3 +147,210 @@ def test_http_handler_request_exception_raises_value_error(mocker):
         asyncio.run(handler.get_content("https://example.com"))
 
     assert "Error fetching content" in str(err.value)
+
+
+def test_http_handler_timeout_raises_transient_error(mocker):
+    mocker.patch("requests.get", side_effect=requests.Timeout("Read timed out"))
+    handler = HTTPProtocolHandler()
+
+    with pytest.raises(TransientFetchError):
+        asyncio.run(handler.get_content("https://example.com"))
+
+
+@pytest_asyncio.fixture
+async def html_server():
+    from aiohttp import web
+    from aiohttp.test_utils import TestServer
+
+    async def page(request):
+        return web.Response(text="<html><body>OK</body></html>", content_type="text/html")
+
+    async def cached_page(request):
+        if request.headers.get("If-None-Match") == '"v1"':
+            return web.Response(status=304)
+        response = web.Response(text="<html><body>Cached</body></html>", content_type="text/html")
+        response.headers["ETag"] = '"v1"'
+        response.headers["Last-Modified"] = "Wed, 01 Jan 2025 00:00:00 GMT"
+        return response
+
+    async def json_page(request):
+        return web.json_response({"ok": True})
+
+    async def large_page(request):
+        return web.Response(body=b"<html>" + b"a" * 1024 + b"</html>", content_type="text/html")
+
+    async def robots_txt(request):
+        return web.Response(text="User-agent: *\nDisallow: /private\n", content_type="text/plain")
+
+    async def missing(request):
+        raise web.HTTPNotFound()
+
+    async def gzipped_sitemap(request):
+        return web.Response(body=b"\x1f\x8b" + b"x" * 200_000, content_type="application/gzip")
+
+    async def unavailable(request):
+        raise web.HTTPServiceUnavailable(headers={"Retry-After": "7"})
+
+    app = web.Application()
+    app.router.add_get("/", page)
+    app.router.add_get("/cached", cached_page)
+    app.router.add_get("/json", json_page)
+    app.router.add_get("/large", large_page)
+    app.router.add_get("/robots.txt", robots_txt)
+    app.router.add_get("/missing", missing)
+    app.router.add_get("/sitemap.xml.gz", gzipped_sitemap)
+    app.router.add_get("/unavailable", unavailable)
+
+    server = TestServer(app)
+    await server.start_server()
+    yield server
+    await server.close()
+
+
+@pytest.mark.asyncio
+async def test_async_http_handler_returns_none_for_non_http_schemes():
+    handler = AsyncHTTPProtocolHandler()
+
+    result = await handler.get_content("ftp://example.com/resource")
+
+    assert result is None
+    await handler.close()
+
+
+@pytest.mark.asyncio
+async def test_async_http_handler_fetches_html_and_reuses_session(html_server):
+    handler = AsyncHTTPProtocolHandler(max_connections=10, max_connections_per_host=2)
+
+    first = await handler.get_content(str(html_server.make_url("/")))
+    session = handler._session
+    second = await handler.get_content(str(html_server.make_url("/")))
+
+    assert first.content == second.content == "<html><body>OK</body></html>"
+    assert handler._session is session
+    assert session.connector.limit == 10
+    assert session.connector.limit_per_host == 2
+
+    await handler.close()
+    assert session.closed
+    assert handler._session is None
+
+
+@pytest.mark.asyncio
+async def test_async_http_handler_conditional_get_round_trip(html_server):
+    handler = AsyncHTTPProtocolHandler()
+    url = str(html_server.make_url("/cached"))
+
+    first = await handler.get_content(url)
+    assert not first.not_modified
+    assert first.validators == CacheValidators(etag='"v1"', last_modified="Wed, 01 Jan 2025 00:00:00 GMT")
+
+    second = await handler.get_content(url, validators=first.validators)
+    assert second.not_modified
+    assert second.content is None
+    assert second.validators == first.validators
+
+    await handler.close()
+
+
+@pytest.mark.asyncio
+async def test_async_http_handler_unsupported_content_type_raises(html_server):
+    handler = AsyncHTTPProtocolHandler()
+
+    with pytest.raises(UnsupportedContentTypeError):
+        await handler.get_content(str(html_server.make_url("/json")))
+
+    await handler.close()
+
+
+@pytest.mark.asyncio
+async def test_async_http_handler_aborts_body_larger_than_max_size(html_server):
+    handler = AsyncHTTPProtocolHandler(max_body_size=512)
+
+    with pytest.raises(ContentTooLargeError):
+        await handler.get_content(str(html_server.make_url("/large")))
+
+    await handler.close()
+
+
+@pytest.mark.asyncio
+async def test_async_http_handler_http_error_raises_value_error(html_server):
+    handler = AsyncHTTPProtocolHandler()
+
+    with pytest.raises(ValueError) as err:
+        await handler.get_content(str(html_server.make_url("/missing")))
+
+    assert "Error fetching content" in str(err.value)
+    await handler.close()
+
+
+@pytest.mark.asyncio
+async def test_async_http_handler_server_error_raises_transient_error(html_server):
+    handler = AsyncHTTPProtocolHandler()
+
+    with pytest.raises(TransientFetchError) as err:
+        await handler.get_content(str(html_server.make_url("/unavailable")))
+
+    assert err.value.status_code == 503
+    assert err.value.retry_after == pytest.approx(7.0)
+    await handler.close()
+
+
+@pytest.mark.asyncio
+async def test_html_fetcher_close_delegates_to_handler(mocker):
+    handler = mocker.Mock(spec=ProtocolHandler)
+    handler.close = mocker.AsyncMock()
+    fetcher = HTMLFetcher(handler=handler)
+
+    await fetcher.close()
+
+    handler.close.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_async_http_handler_fetches_robots_txt(html_server):
+    handler = AsyncHTTPProtocolHandler()
+
+    text = await handler.get_robots_txt(str(html_server.make_url("/robots.txt")))
+    missing = await handler.get_robots_txt(str(html_server.make_url("/missing")))
+
+    assert "Disallow: /private" in text
+    assert missing is None
+    await handler.close()
+
+
+def test_http_handler_robots_txt_missing_returns_none(mocker):
+    response = mocker.Mock()
+    response.status_code = 404
+    get_patch = mocker.patch("requests.get", return_value=response)
+
+    result = asyncio.run(HTTPProtocolHandler(user_agent="TestBot/1.0").get_robots_txt("https://example.com/robots.txt"))
+
+    assert result is None
+    _, kwargs = get_patch.call_args
+    assert kwargs["headers"] == {"User-Agent": "TestBot/1.0"}
+
+
+@pytest.mark.asyncio
+async def test_async_http_handler_streams_raw_resource(html_server):
+    fetcher = HTMLFetcher(handler=AsyncHTTPProtocolHandler())
+
+    chunks = [chunk async for chunk in fetcher.stream(str(html_server.make_url("/sitemap.xml.gz")))]
+
+    assert len(chunks) > 1
+    assert b"".join(chunks) == b"\x1f\x8b" + b"x" * 200_000
+    with pytest.raises(ValueError):
+        [chunk async for chunk in fetcher.stream(str(html_server.make_url("/missing")))]
+    await fetcher.close()
+
+
+def test_http_handler_streams_raw_resource_and_closes_response(mocker):
+    response = mocker.Mock()
+    response.iter_content.return_value = iter([b"\x1f\x8b", b"body"])
+    mocker.patch("requests.get", return_value=response)
+
+    async def read():
+        return [chunk async for chunk in HTTPProtocolHandler().stream_resource("https://example.com/sitemap.xml.gz")]
+
+    assert asyncio.run(read()) == [b"\x1f\x8b", b"body"]
+    response.raise_for_status.assert_called_once()
+    response.close.assert_called_once()
@@ -0,0 +1,54 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from webcrawler_arnoldkyeza.core.extractor.content_parser.textual_parser import TextualParser
+from webcrawler_arnoldkyeza.core.extractor.errors import ContentParseError
+from webcrawler_arnoldkyeza.core.extractor.parse_pool import ParsePool, _parse_batch
+
+
+def page(i: int) -> str:
+    return f"<html><head><title>Page {i}</title></head><body><a href='/p/{i}'>next</a></body></html>"
+
+
+@pytest.mark.asyncio
+async def test_parse_pool_parses_in_processes():
+    pool = ParsePool(max_workers=2, parser_name="fast", batch_size=4)
+
+    results = await asyncio.gather(*(pool.parse(page(i)) for i in range(10)))
+    await pool.close()
+
+    assert results == [TextualParser.parse(page(i)) for i in range(10)]
+    assert pool.executor is None
+
+
+@pytest.mark.asyncio
+async def test_parse_pool_groups_documents_into_batches(mocker):
+    batch_spy = mocker.patch("webcrawler_arnoldkyeza.core.extractor.parse_pool._parse_batch", wraps=_parse_batch)
+    pool = ParsePool(parser_name="bs4", batch_size=3, batch_delay=0.01, executor=ThreadPoolExecutor(1))
+
+    results = await asyncio.gather(*(pool.parse(page(i)) for i in range(4)))
+    await pool.close()
+
+    assert [result.title for result in results] == ["page_0", "page_1", "page_2", "page_3"]
+    # one full batch sent at once, the remaining page after the batch delay
+    assert [len(call.args[1]) for call in batch_spy.call_args_list] == [3, 1]
+
+
+@pytest.mark.asyncio
+async def test_parse_pool_reports_failures_per_document():
+    pool = ParsePool(parser_name="bs4", executor=ThreadPoolExecutor(1))
+
+    # the BeautifulSoup parser fails on pages without a title
+    results = await asyncio.gather(pool.parse(page(1)), pool.parse("<p>no title</p>"), return_exceptions=True)
+    await pool.close()
+
+    assert results[0].title == "page_1"
+    assert isinstance(results[1], ContentParseError)
+    assert "AttributeError" in str(results[1])
+
+
+def test_parse_pool_rejects_unknown_parser():
+    with pytest.raises(ValueError):
+        ParsePool(parser_name="lxml")
@@ -0,0 +1,92 @@
+import pytest
+
+from webcrawler_arnoldkyeza.core.scheduler.politeness import HostPoliteness, TokenBucket
+
+
+class FakeClock:
+    def __init__(self, now: float = 0.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    return FakeClock()
+
+
+def test_token_bucket_allows_burst_then_paces():
+    bucket = TokenBucket(rate=2.0, capacity=2)
+
+    assert bucket.consume(0.0) is True
+    assert bucket.consume(0.0) is True
+    assert bucket.consume(0.0) is False
+    assert bucket.delay(0.0) == pytest.approx(0.5)
+
+    assert bucket.consume(0.5) is True
+
+
+def test_try_acquire_respects_rate_limit(clock):
+    politeness = HostPoliteness(requests_per_second=1.0, burst=1, max_in_flight_per_host=0, clock=clock)
+
+    assert politeness.try_acquire("https://example.com/a") is True
+    assert politeness.try_acquire("https://example.com/b") is False
+    # other hosts have their own bucket
+    assert politeness.try_acquire("https://other.com/a") is True
+
+    clock.now = 1.0
+    assert politeness.try_acquire("https://example.com/b") is True
+
+
+def test_try_acquire_respects_in_flight_cap(clock):
+    politeness = HostPoliteness(requests_per_second=None, max_in_flight_per_host=2, clock=clock)
+
+    assert politeness.try_acquire("https://example.com/a") is True
+    assert politeness.try_acquire("https://example.com/b") is True
+    assert politeness.try_acquire("https://example.com/c") is False
+
+    politeness.release("https://example.com/a")
+    assert politeness.try_acquire("https://example.com/c") is True
+
+
+def test_parked_urls_are_released_when_host_is_ready(clock):
+    politeness = HostPoliteness(requests_per_second=1.0, burst=1, max_in_flight_per_host=0, clock=clock)
+    assert politeness.try_acquire("https://example.com/a") is True
+
+    politeness.park(2, "https://example.com/c")
+    politeness.park(1, "https://example.com/b")
+    assert politeness.parked_count == 2
+    assert politeness.pop_ready() is None
+    assert politeness.next_ready_in() == pytest.approx(1.0)
+
+    clock.now = 1.0
+    assert politeness.pop_ready() == (1, "https://example.com/b")
+    assert politeness.pop_ready() is None
+
+    clock.now = 2.0
+    assert politeness.pop_ready() == (2, "https://example.com/c")
+    assert politeness.parked_count == 0
+    assert politeness.next_ready_in() is None
+
+
+def test_capped_host_is_rescheduled_on_release(clock):
+    politeness = HostPoliteness(requests_per_second=None, max_in_flight_per_host=1, clock=clock)
+    assert politeness.try_acquire("https://example.com/a") is True
+
+    politeness.park(0, "https://example.com/b")
+    assert politeness.pop_ready() is None
+    assert politeness.next_ready_in() is None
+
+    politeness.release("https://example.com/a")
+    assert politeness.pop_ready() == (0, "https://example.com/b")
+
+
+def test_fresh_url_waits_behind_parked_backlog(clock):
+    politeness = HostPoliteness(requests_per_second=None, max_in_flight_per_host=1, clock=clock)
+    assert politeness.try_acquire("https://example.com/a") is True
+    politeness.park(0, "https://example.com/b")
+    politeness.release("https://example.com/a")
+
+    assert politeness.try_acquire("https://example.com/c") is False
+    assert politeness.pop_ready() == (0, "https://example.com/b")
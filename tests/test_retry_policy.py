@@ -0,0 +1,44 @@
+import pytest
+
+from webcrawler_arnoldkyeza.core.html_fetcher.fetch_response import is_retryable_status, parse_retry_after
+from webcrawler_arnoldkyeza.core.html_fetcher.protocol_handlers.errors import TransientFetchError
+from webcrawler_arnoldkyeza.core.scheduler.retry_policy import RetryPolicy
+
+
+def test_should_retry_only_transient_errors_below_max_attempts():
+    policy = RetryPolicy(max_attempts=3)
+
+    assert policy.should_retry(TransientFetchError("timeout"), 1) is True
+    assert policy.should_retry(TransientFetchError("timeout"), 2) is True
+    assert policy.should_retry(TransientFetchError("timeout"), 3) is False
+    assert policy.should_retry(ValueError("404"), 1) is False
+
+
+def test_backoff_grows_exponentially_with_jitter_and_cap():
+    policy = RetryPolicy(base_delay=1.0, max_delay=5.0, random=lambda: 1.0)
+
+    assert policy.backoff(1) == pytest.approx(1.0)
+    assert policy.backoff(2) == pytest.approx(2.0)
+    assert policy.backoff(3) == pytest.approx(4.0)
+    assert policy.backoff(10) == pytest.approx(5.0)
+
+    jittered = RetryPolicy(base_delay=1.0, random=lambda: 0.0)
+    assert jittered.backoff(3) == pytest.approx(2.0)
+
+
+def test_backoff_honours_retry_after():
+    policy = RetryPolicy(base_delay=1.0, random=lambda: 0.0)
+
+    assert policy.backoff(1, retry_after=30.0) == pytest.approx(30.0)
+    assert policy.backoff(1, retry_after=0.1) == pytest.approx(0.5)
+
+
+def test_retryable_statuses_and_retry_after_parsing():
+    assert is_retryable_status(429) is True
+    assert is_retryable_status(503) is True
+    assert is_retryable_status(404) is False
+
+    assert parse_retry_after("120") == pytest.approx(120.0)
+    assert parse_retry_after("Wed, 01 Jan 2000 00:00:00 GMT") == 0.0
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
@@ -0,0 +1,124 @@
+import asyncio
+
+import pytest
+
+from webcrawler_arnoldkyeza.core.html_fetcher.html_fetcher import HTMLFetcher
+from webcrawler_arnoldkyeza.core.robots.robots_cache import RobotsCache
+from webcrawler_arnoldkyeza.core.robots.robots_rules import RobotsRules, parse_robots_txt
+
+ROBOTS_TXT = """
+# comment
+User-agent: *
+Disallow: /private
+Allow: /private/public
+Disallow: /*.pdf$
+Crawl-delay: 2
+
+User-agent: WebCrawler
+User-agent: OtherBot
+Disallow: /search
+Allow: /search/about
+Disallow: /tmp/*/cache
+
+Sitemap: https://example.com/sitemap.xml
+"""
+
+
+class FakeClock:
+    def __init__(self, now: float = 0.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_parse_uses_wildcard_group_when_agent_not_listed():
+    rules = parse_robots_txt(ROBOTS_TXT, "SomeBot/2.0")
+
+    assert rules.crawl_delay == 2
+    assert rules.sitemaps == ["https://example.com/sitemap.xml"]
+    assert rules.is_allowed("https://example.com/") is True
+    assert rules.is_allowed("https://example.com/private/page") is False
+    # the longer Allow wins over the shorter Disallow
+    assert rules.is_allowed("https://example.com/private/public/page") is True
+    assert rules.is_allowed("https://example.com/docs/file.pdf") is False
+    assert rules.is_allowed("https://example.com/docs/file.pdf?x=1") is True
+
+
+def test_parse_uses_group_matching_product_token():
+    rules = parse_robots_txt(ROBOTS_TXT, "WebCrawler/0.0.1")
+
+    assert rules.crawl_delay is None
+    assert rules.is_allowed("https://example.com/private/page") is True
+    assert rules.is_allowed("https://example.com/search?q=1") is False
+    assert rules.is_allowed("https://example.com/search/about") is True
+    assert rules.is_allowed("https://example.com/tmp/a/cache/x") is False
+    assert rules.is_allowed("https://example.com/tmp/cache") is True
+
+
+def test_allow_wins_tie_and_robots_txt_is_always_allowed():
+    rules = parse_robots_txt("User-agent: *\nDisallow: /page\nAllow: /page\nDisallow: /\n", "bot")
+
+    assert rules.is_allowed("https://example.com/page") is True
+    assert rules.is_allowed("https://example.com/other") is False
+    assert rules.is_allowed("https://example.com/robots.txt") is True
+
+
+def test_empty_disallow_allows_everything():
+    rules = parse_robots_txt("User-agent: *\nDisallow:\n", "bot")
+
+    assert rules.rules == []
+    assert rules.is_allowed("https://example.com/anything") is True
+
+
+@pytest.mark.asyncio
+async def test_robots_cache_fetches_once_per_origin(mocker):
+    fetcher = mocker.Mock(spec=HTMLFetcher)
+    fetcher.fetch_robots_txt = mocker.AsyncMock(return_value="User-agent: *\nDisallow: /private\n")
+    cache = RobotsCache(fetcher=fetcher)
+
+    results = await asyncio.gather(
+        cache.is_allowed("https://example.com/private/a"),
+        cache.is_allowed("https://example.com/public"),
+        cache.is_allowed("https://example.com/private/b"),
+    )
+
+    assert results == [False, True, False]
+    fetcher.fetch_robots_txt.assert_awaited_once_with("https://example.com/robots.txt")
+
+
+@pytest.mark.asyncio
+async def test_robots_cache_refetches_after_expiry(mocker):
+    clock = FakeClock()
+    fetcher = mocker.Mock(spec=HTMLFetcher)
+    fetcher.fetch_robots_txt = mocker.AsyncMock(return_value=None)
+    cache = RobotsCache(fetcher=fetcher, ttl=10, clock=clock)
+
+    assert await cache.is_allowed("https://example.com/a") is True
+    clock.now = 5
+    await cache.is_allowed("https://example.com/b")
+    assert fetcher.fetch_robots_txt.await_count == 1
+
+    clock.now = 10
+    await cache.is_allowed("https://example.com/c")
+    assert fetcher.fetch_robots_txt.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_robots_cache_allows_temporarily_on_fetch_error(mocker):
+    clock = FakeClock()
+    fetcher = mocker.Mock(spec=HTMLFetcher)
+    fetcher.fetch_robots_txt = mocker.AsyncMock(side_effect=ValueError("503"))
+    cache = RobotsCache(fetcher=fetcher, error_ttl=60, clock=clock)
+
+    assert await cache.is_allowed("https://example.com/a") is True
+
+    clock.now = 60
+    fetcher.fetch_robots_txt.side_effect = None
+    fetcher.fetch_robots_txt.return_value = "User-agent: *\nDisallow: /\n"
+    assert await cache.is_allowed("https://example.com/a") is False
+
+
+def test_disallow_all_rules():
+    assert RobotsRules.disallow_all().is_allowed("https://example.com/x") is False
+    assert RobotsRules.allow_all().is_allowed("https://example.com/x") is True
@@ -1,12 +1,26 @@
 import asyncio
+import datetime
+
+import fakeredis
 import pytest
 
 from webcrawler_arnoldkyeza.core.datastore.database_manager import DatabaseManager
+from webcrawler_arnoldkyeza.core.datastore.write_behind_writer import WriteBehindWriter
+from webcrawler_arnoldkyeza.core.duplicate_eliminator.backends.redis_backend import RedisDedupBackend
+from webcrawler_arnoldkyeza.core.duplicate_eliminator.bloom_filter import ScalableBloomFilter
 from webcrawler_arnoldkyeza.core.duplicate_eliminator.duplicate_eliminator import DuplicateEliminator
+from webcrawler_arnoldkyeza.core.enums.url_status_type import UrlStatusType
+from webcrawler_arnoldkyeza.core.html_fetcher.dns_cache import DNSCache
+from webcrawler_arnoldkyeza.core.html_fetcher.protocol_handlers.errors import TransientFetchError
+from webcrawler_arnoldkyeza.core.robots.robots_cache import RobotsCache
+from webcrawler_arnoldkyeza.core.robots.robots_rules import parse_robots_txt
+from webcrawler_arnoldkyeza.core.scheduler.circuit_breaker import HostCircuitBreaker
 from webcrawler_arnoldkyeza.core.scheduler.errors import InvalidSeedUrlError
 from webcrawler_arnoldkyeza.core.scheduler.scheduler import Scheduler
 from webcrawler_arnoldkyeza.core.scheduler.models.url_frontier import UrlFrontier
 from webcrawler_arnoldkyeza.core.scheduler.models.url import Url
+from webcrawler_arnoldkyeza.core.scheduler.politeness import HostPoliteness
+from webcrawler_arnoldkyeza.core.scheduler.retry_policy import RetryPolicy
 
 
 @pytest.fixture
@@ -16,7 +30,11 @@ def url_frontier() -> UrlFrontier:
 
 @pytest.fixture
 def mock_database_manager(mocker):
-    return mocker.Mock(spec=DatabaseManager)
+    db = mocker.Mock(spec=DatabaseManager)
+    db.reset_in_progress_urls.return_value = 0
+    db.reset_urls_due_for_recrawl.return_value = 0
+    db.get_max_url_id.return_value = 0
+    return db
 
 
 @pytest.fixture
@@ -38,16 +56,18 @@ def scheduler(url_frontier, mock_database_manager, mock_duplicate_eliminator):
 @pytest.mark.asyncio
 async def test_scheduler_initialization(scheduler, url_frontier, mock_database_manager, mock_duplicate_eliminator):
     pending = [
-        Url(url="https://example.com/a", normalized_url="https://example.com/a", priority=5, depth=0),
-        Url(url="https://example.com/b", normalized_url="https://example.com/b", priority=2, depth=0),
+        Url(url="https://example.com/a", normalized_url="https://example.com/a", priority=5, depth=2, url_id=1),
+        Url(url="https://example.com/b", normalized_url="https://example.com/b", priority=2, depth=1, url_id=2),
     ]
-    mock_database_manager.get_pending_urls.return_value = pending
+    mock_database_manager.get_max_url_id.return_value = 2
+    mock_database_manager.get_pending_urls_between.return_value = pending
 
     await scheduler.initialize(seed_url="https://example.com", max_depth=3)
 
     assert scheduler.seed_url == "https://example.com"
     assert scheduler._max_depth == 3
     mock_database_manager.insert_url.assert_called_once()
+    mock_duplicate_eliminator.restore_seen_urls.assert_called_once()
 
     items = []
     while not url_frontier.queue.empty():
@@ -55,8 +75,8 @@ async def test_scheduler_initialization(scheduler, url_frontier, mock_database_m
 
     assert set(items) == {
         (0, "https://example.com"),
-        (5, "https://example.com/a"),
-        (2, "https://example.com/b"),
+        (2, "https://example.com/a"),
+        (1, "https://example.com/b"),
     }
 
 
@@ -216,3 +236,257 @@ async def test_completing_in_progress_crawling_waits_until_task_done(scheduler,
 
     await asyncio.wait_for(join_task, timeout=0.5)
     assert join_task.done()
+
+
+@pytest.mark.asyncio
+async def test_get_next_url_skips_hosts_that_are_not_ready(url_frontier, mock_database_manager,
+                                                           mock_duplicate_eliminator):
+    scheduler = Scheduler(
+        url_frontier=url_frontier,
+        database_manager=mock_database_manager,
+        duplicate_eliminator=mock_duplicate_eliminator,
+        politeness=HostPoliteness(requests_per_second=None, max_in_flight_per_host=1),
+    )
+    scheduler.seed_url = "https://example.com"
+    mock_database_manager.has_active_urls.return_value = True
+
+    url_frontier.queue.put_nowait((1, "https://example.com/a"))
+    url_frontier.queue.put_nowait((1, "https://example.com/b"))
+    url_frontier.queue.put_nowait((2, "https://other.com/c"))
+
+    assert await scheduler.get_next_url() == (1, "https://example.com/a")
+    # example.com is at its in-flight cap, so the next host gets the worker
+    assert await scheduler.get_next_url() == (2, "https://other.com/c")
+    assert scheduler.politeness.parked_count == 1
+    assert scheduler.finished() is False
+
+    scheduler.queue_task_done("https://example.com/a")
+    assert await scheduler.get_next_url() == (1, "https://example.com/b")
+    assert scheduler.politeness.parked_count == 0
+
+
+@pytest.mark.asyncio
+async def test_enqueue_many_prefetches_dns_for_new_hosts(url_frontier, mock_database_manager,
+                                                         mock_duplicate_eliminator, mocker):
+    dns_cache = mocker.Mock(spec=DNSCache)
+    scheduler = Scheduler(
+        url_frontier=url_frontier,
+        database_manager=mock_database_manager,
+        duplicate_eliminator=mock_duplicate_eliminator,
+        dns_cache=dns_cache,
+    )
+    scheduler.seed_url = "https://example.com"
+
+    await scheduler.enqueue_many([
+        Url(url="https://example.com/a", normalized_url="https://example.com/a", depth=1),
+        Url(url="https://other.com/b", normalized_url="https://other.com/b", depth=1),
+    ])
+
+    dns_cache.prefetch.assert_called_once_with("example.com", 443)
+
+
+@pytest.mark.asyncio
+async def test_enqueue_skips_urls_disallowed_by_robots(url_frontier, mock_database_manager,
+                                                       mock_duplicate_eliminator, mocker):
+    robots = mocker.Mock(spec=RobotsCache)
+    robots.rules_for = mocker.AsyncMock(
+        return_value=parse_robots_txt("User-agent: *\nDisallow: /private\nCrawl-delay: 5\n", "bot")
+    )
+    politeness = HostPoliteness()
+    scheduler = Scheduler(
+        url_frontier=url_frontier,
+        database_manager=mock_database_manager,
+        duplicate_eliminator=mock_duplicate_eliminator,
+        politeness=politeness,
+        robots=robots,
+    )
+    scheduler.seed_url = "https://example.com"
+
+    await scheduler.enqueue_url("https://example.com/private/page")
+    await scheduler.enqueue_many([
+        Url(url="https://example.com/private/b", normalized_url="https://example.com/private/b", depth=1),
+        Url(url="https://example.com/public", normalized_url="https://example.com/public", depth=1),
+    ])
+
+    mock_database_manager.insert_url.assert_not_called()
+    inserted = mock_database_manager.insert_urls.call_args.args[0]
+    assert [url.normalized_url for url in inserted] == ["https://example.com/public"]
+    assert url_frontier.queue.get_nowait() == (1, "https://example.com/public")
+    assert url_frontier.queue.empty()
+    mock_duplicate_eliminator.is_duplicate_url.assert_not_called()
+    # Crawl-delay slows the host down to one request every 5 seconds
+    assert politeness._state("example.com").bucket.rate == pytest.approx(0.2)
+
+
+@pytest.mark.asyncio
+async def test_schedule_retry_requeues_transient_failures_after_backoff(url_frontier, mock_database_manager,
+                                                                       mock_duplicate_eliminator):
+    scheduler = Scheduler(
+        url_frontier=url_frontier,
+        database_manager=mock_database_manager,
+        duplicate_eliminator=mock_duplicate_eliminator,
+        retry_policy=RetryPolicy(max_attempts=2, base_delay=0.05, random=lambda: 1.0),
+    )
+    scheduler.seed_url = "https://example.com"
+    mock_database_manager.has_active_urls.return_value = True
+
+    assert scheduler.schedule_retry(1, "https://example.com/a", 1, TransientFetchError("timeout")) is True
+    assert scheduler.schedule_retry(1, "https://example.com/b", 2, TransientFetchError("timeout")) is False
+    assert scheduler.schedule_retry(1, "https://example.com/c", 1, ValueError("not found")) is False
+
+    # the retry is pending, so the crawl is not finished even though the queue is empty
+    mock_database_manager.has_active_urls.return_value = False
+    assert scheduler.finished() is False
+
+    assert await scheduler.get_next_url() == (1, "https://example.com/a")
+    scheduler.queue_task_done("https://example.com/a")
+    assert scheduler.finished() is True
+
+
+def test_record_fetch_failure_opens_circuit_and_blocks_host(url_frontier, mock_database_manager,
+                                                           mock_duplicate_eliminator):
+    politeness = HostPoliteness()
+    scheduler = Scheduler(
+        url_frontier=url_frontier,
+        database_manager=mock_database_manager,
+        duplicate_eliminator=mock_duplicate_eliminator,
+        politeness=politeness,
+        circuit_breaker=HostCircuitBreaker(failure_threshold=2, cool_down=60.0),
+    )
+
+    scheduler.record_fetch_failure("https://example.com/a", ValueError("not found"))
+    scheduler.record_fetch_failure("https://example.com/a", TransientFetchError("timeout"))
+    assert politeness.try_acquire("https://example.com/b") is True
+
+    scheduler.record_fetch_failure("https://example.com/a", TransientFetchError("timeout"))
+    assert scheduler.circuit_breaker.is_open("example.com") is True
+    assert politeness.try_acquire("https://example.com/c") is False
+    assert politeness.try_acquire("https://other.com/") is True
+
+
+@pytest.mark.asyncio
+async def test_resumed_crawl_skips_completed_urls_and_drains_the_pending_ones(tmp_path):
+    database = DatabaseManager(tmp_path / "crawler.sqlite")
+    database.insert_urls([
+        Url(url="https://example.com", normalized_url="https://example.com", depth=0),
+        Url(url="https://example.com/done", normalized_url="https://example.com/done", depth=1),
+        Url(url="https://example.com/interrupted", normalized_url="https://example.com/interrupted", depth=1),
+        *(Url(url=f"https://example.com/p{i}", normalized_url=f"https://example.com/p{i}", depth=1)
+          for i in range(5)),
+    ])
+    for url in ("https://example.com", "https://example.com/done"):
+        database.mark_url_as_crawled(url, datetime.datetime.now())
+    database.update_url_status("https://example.com/interrupted", UrlStatusType.IN_PROGRESS)
+
+    # a new process: the frontier and the seen-URL set start empty
+    url_frontier = UrlFrontier()
+    url_frontier.queue._maxsize = 2
+    duplicate_eliminator = DuplicateEliminator(backend=RedisDedupBackend(fakeredis.FakeStrictRedis()))
+    scheduler = Scheduler(
+        url_frontier=url_frontier,
+        database_manager=database,
+        duplicate_eliminator=duplicate_eliminator,
+        politeness=HostPoliteness(requests_per_second=0, max_in_flight_per_host=0),
+    )
+    await scheduler.initialize("https://example.com", max_depth=3)
+
+    new_urls = duplicate_eliminator.filter_extracted_urls(
+        ["https://example.com/done", "https://example.com/p4", "https://example.com/new"], parent_url_id=1, depth=2
+    )
+    assert [url.normalized_url for url in new_urls] == ["https://example.com/new"]
+
+    fetched = []
+    while not scheduler.finished():
+        _, url = await scheduler.get_next_url()
+        if url is None:
+            continue
+        fetched.append(url)
+        database.mark_url_as_crawled(url, datetime.datetime.now())
+        scheduler.queue_task_done(url)
+
+    assert fetched == ["https://example.com/interrupted"] + [f"https://example.com/p{i}" for i in range(5)]
+
+
+@pytest.mark.asyncio
+async def test_resumed_urls_keep_their_stored_depth(tmp_path):
+    database = DatabaseManager(tmp_path / "crawler.sqlite")
+    database.insert_urls([
+        Url(url="https://example.com", normalized_url="https://example.com", depth=0),
+        Url(url="https://example.com/a/b/c", normalized_url="https://example.com/a/b/c", depth=3),
+    ])
+    database.mark_url_as_crawled("https://example.com", datetime.datetime.now())
+
+    scheduler = Scheduler(
+        url_frontier=UrlFrontier(),
+        database_manager=database,
+        duplicate_eliminator=DuplicateEliminator(backend=RedisDedupBackend(fakeredis.FakeStrictRedis())),
+        politeness=HostPoliteness(requests_per_second=0, max_in_flight_per_host=0),
+    )
+    await scheduler.initialize("https://example.com", max_depth=3)
+
+    assert await scheduler.get_next_url() == (3, "https://example.com/a/b/c")
+    assert scheduler.current_depth == 3
+
+
+@pytest.mark.asyncio
+async def test_resumed_crawl_recrawls_urls_due_for_it(tmp_path):
+    database = DatabaseManager(tmp_path / "crawler.sqlite")
+    database.insert_urls([
+        Url(url="https://example.com", normalized_url="https://example.com", depth=0),
+        Url(url="https://example.com/stale", normalized_url="https://example.com/stale", depth=1),
+    ])
+    database.mark_url_as_crawled("https://example.com", datetime.datetime.now())
+    database.mark_url_as_crawled("https://example.com/stale", datetime.datetime.now() - datetime.timedelta(days=2),
+                                 etag='"v1"')
+
+    scheduler = Scheduler(
+        url_frontier=UrlFrontier(),
+        database_manager=database,
+        duplicate_eliminator=DuplicateEliminator(backend=RedisDedupBackend(fakeredis.FakeStrictRedis())),
+        politeness=HostPoliteness(requests_per_second=0, max_in_flight_per_host=0),
+    )
+    await scheduler.initialize("https://example.com", max_depth=3)
+
+    assert await scheduler.get_next_url() == (1, "https://example.com/stale")
+    # its validators are kept for the conditional GET
+    assert database.claim_url("https://example.com/stale").etag == '"v1"'
+
+
+@pytest.mark.asyncio
+async def test_scheduler_stores_urls_through_the_write_behind_writer(tmp_path):
+    database = DatabaseManager(tmp_path / "crawler.sqlite")
+    writer = WriteBehindWriter(database_manager=database)
+    writer.start()
+    scheduler = Scheduler(
+        url_frontier=UrlFrontier(),
+        database_manager=database,
+        duplicate_eliminator=DuplicateEliminator(backend=RedisDedupBackend(fakeredis.FakeStrictRedis())),
+        writer=writer,
+    )
+
+    await scheduler.initialize("https://example.com", max_depth=3)
+    await scheduler.enqueue_many([Url(url="https://example.com/a", normalized_url="https://example.com/a", depth=1)])
+
+    # resetting interrupted and due URLs, the seed and the discovered URL
+    assert writer.writes_applied == 4
+    assert database.url_exists("https://example.com")
+    assert database.url_exists("https://example.com/a")
+    await writer.close()
+
+
+@pytest.mark.asyncio
+async def test_bloom_filter_does_not_hold_links_the_scheduler_drops(tmp_path):
+    database = DatabaseManager(tmp_path / "crawler.sqlite")
+    duplicate_eliminator = DuplicateEliminator(backend=RedisDedupBackend(fakeredis.FakeStrictRedis()),
+                                               url_filter=ScalableBloomFilter(initial_capacity=1000),
+                                               database_manager=database)
+    scheduler = Scheduler(url_frontier=UrlFrontier(), database_manager=database,
+                          duplicate_eliminator=duplicate_eliminator)
+    await scheduler.initialize("https://example.com", max_depth=3)
+
+    links = [f"https://other{i}.org/page" for i in range(50)] + ["https://example.com/about"]
+    await scheduler.enqueue_many(duplicate_eliminator.filter_extracted_urls(links, parent_url_id=1, depth=1))
+
+    assert duplicate_eliminator._unstored_urls == set()
+    assert database.url_exists("https://example.com/about")
+    assert not database.url_exists("https://other0.org/page")
@@ -0,0 +1,112 @@
+import datetime
+import sqlite3
+from pathlib import Path
+
+from webcrawler_arnoldkyeza.core.datastore import schema_migration
+from webcrawler_arnoldkyeza.core.datastore.database_manager import DatabaseManager
+from webcrawler_arnoldkyeza.core.enums.url_status_type import UrlStatusType
+from webcrawler_arnoldkyeza.core.scheduler.models.url import Url
+
+
+def create_legacy_database(path: Path, rows: int = 0) -> None:
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE urls
+        (
+            url_id           INTEGER PRIMARY KEY AUTOINCREMENT,
+            url              TEXT    NOT NULL,
+            normalized_url   TEXT    NOT NULL UNIQUE,
+            priority         INTEGER NOT NULL,
+            update_frequency INTEGER NOT NULL,
+            last_crawled_at  TEXT    NULL,
+            status           TEXT    NOT NULL DEFAULT 'pending',
+            parent_url_id    INTEGER NULL,
+            error_message    TEXT    NULL,
+            depth            INTEGER NOT NULL DEFAULT 0,
+            created_at       TEXT    NOT NULL DEFAULT (DATETIME('now')),
+            etag             TEXT    NULL
+        );
+        CREATE INDEX idx_urls_normalized_url ON urls (normalized_url);
+        CREATE INDEX idx_urls_parent_url_id ON urls (parent_url_id);
+        INSERT INTO urls (url, normalized_url, priority, update_frequency, last_crawled_at, status, created_at, etag)
+        VALUES ('https://Example.com/a/#top', 'https://example.com/a', 1, 1, '2025-01-01T12:00:00.250000', 'completed',
+                '2025-01-01 11:00:00', '"v1"');
+        INSERT INTO urls (url, normalized_url, priority, update_frequency, status, parent_url_id, depth, error_message)
+        VALUES ('https://other.com/b?y=2&x=1', 'https://other.com/b?x=1&y=2', 2, 1, 'failed', 1, 1, 'Timed out'),
+               ('https://example.com/c', 'https://example.com/c', 1, 1, 'in_progress', 1, 1, NULL);
+    """)
+    conn.executemany(
+        "INSERT INTO urls (url, normalized_url, priority, update_frequency, status) VALUES (?, ?, 1, 1, 'completed')",
+        ((f"https://example.com/p{i}", f"https://example.com/p{i}") for i in range(rows)),
+    )
+    conn.commit()
+    conn.close()
+
+
+def test_opening_a_legacy_database_converts_every_url(tmp_path: Path) -> None:
+    path = tmp_path / "crawler.sqlite"
+    create_legacy_database(path)
+
+    db = DatabaseManager(path)
+
+    crawled = db.get_url("https://example.com/a")
+    assert crawled.url_id == 1
+    assert crawled.url == "https://Example.com/a/#top"
+    assert crawled.status == UrlStatusType.COMPLETED
+    assert crawled.last_crawled_at == datetime.datetime(2025, 1, 1, 12, 0, 0)
+    assert crawled.created_at == datetime.datetime.fromtimestamp(
+        datetime.datetime(2025, 1, 1, 11, tzinfo=datetime.timezone.utc).timestamp())
+    assert crawled.etag == '"v1"'
+    assert crawled.attempts == 0
+
+    failed = db.get_url("https://other.com/b?x=1&y=2")
+    assert (failed.url_id, failed.parent_url_id, failed.depth, failed.priority) == (2, 1, 1, 2)
+    assert failed.status == UrlStatusType.FAILED
+    assert failed.error_message == "Timed out"
+
+    assert list(db.get_crawled_urls_with_extracted()) == [
+        ("https://example.com/a", ["https://other.com/b?x=1&y=2", "https://example.com/c"]),
+    ]
+    assert db.has_active_urls() is True
+    assert db.reset_in_progress_urls() == 1
+
+    # new URLs go on after the converted ones and reuse their hosts
+    db.insert_url(Url(url="https://example.com/d", normalized_url="https://example.com/d"))
+    assert db.get_url("https://example.com/d").url_id == 4
+    with db._connect() as conn:
+        assert conn.execute("SELECT COUNT(1) FROM hosts").fetchone()[0] == 2
+        tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    assert schema_migration.LEGACY_TABLE not in tables
+    db.close()
+
+
+def test_failed_conversion_leaves_the_legacy_database_untouched(tmp_path: Path) -> None:
+    path = tmp_path / "crawler.sqlite"
+    create_legacy_database(path)
+    with sqlite3.connect(path) as conn:
+        conn.execute("UPDATE urls SET status = 'unknown' WHERE url_id = 3")
+
+    try:
+        DatabaseManager(path)
+    except sqlite3.Error:
+        pass
+    else:
+        raise AssertionError("an unknown status must stop the conversion")
+
+    with sqlite3.connect(path) as conn:
+        assert schema_migration.is_legacy_database(conn)
+        assert conn.execute("SELECT COUNT(1) FROM urls").fetchone() == (3,)
+
+
+def test_migration_tool_converts_and_compacts_the_file(tmp_path: Path) -> None:
+    path = tmp_path / "crawler.sqlite"
+    create_legacy_database(path, rows=5000)
+    size_before = path.stat().st_size
+
+    schema_migration.main([str(path)])
+
+    assert path.stat().st_size < size_before
+    db = DatabaseManager(path)
+    assert db.url_exists("https://example.com/p4999")
+    assert db.get_max_url_id() == 5003
+    db.close()
@@ -2,6 +2,7 @@ from unittest.mock import AsyncMock, MagicMock
 
 import pytest
 from webcrawler_arnoldkyeza.core.commandline_options import CrawlerConfig
+from webcrawler_arnoldkyeza.core.service_host.concurrency_limiter import AdaptiveConcurrencyLimiter
 from webcrawler_arnoldkyeza.core.service_host.service_host import ServiceHost
 
 
@@ -52,3 +53,27 @@ async def test_service_host_crawl_creates_workers(mocker):
     assert cw_run_patch.call_count == config.number_of_workers
     mock_scheduler.initialize.assert_called_once_with(config.start_url, config.max_depth)
     assert mock_scheduler.completing_in_progress_crawling.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_service_host_starts_max_concurrency_workers_in_adaptive_mode(mocker):
+    mock_scheduler = AsyncMock()
+    mock_scheduler.finished.side_effect = [False, True]
+    config = CrawlerConfig(start_url="http://example.com", number_of_workers=2, max_depth=5)
+
+    cw_run_patch = mocker.patch(
+        "webcrawler_arnoldkyeza.core.service_host.service_host.CrawlerWorker.run",
+        return_value=AsyncMock()
+    )
+
+    service_host = ServiceHost(
+        scheduler=mock_scheduler,
+        deduplicator=MagicMock(),
+        database=MagicMock(),
+        blob_storage=MagicMock(),
+        concurrency_limiter=AdaptiveConcurrencyLimiter(initial_limit=2, max_limit=6),
+    )
+
+    await service_host.crawl(config)
+
+    assert cw_run_patch.call_count == 6
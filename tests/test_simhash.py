@@ -0,0 +1,80 @@
+import random
+
+import pytest
+
+from webcrawler_arnoldkyeza.core.duplicate_eliminator.simhash import SimHashIndex, hamming_distance, simhash
+
+ARTICLE = " ".join(
+    f"paragraph {i} of the article explains how the crawler schedules pages politely across many hosts"
+    for i in range(40)
+)
+
+
+def test_simhash_is_stable_and_close_for_small_edits():
+    stamped = f"{ARTICLE} generated at 2024-05-01 10:00:00 session 8f3a2c"
+    restamped = f"{ARTICLE} generated at 2024-05-02 17:42:13 session 11d9e0"
+    unrelated = " ".join(f"a different page {i} about cooking pasta with tomatoes and basil" for i in range(40))
+
+    assert simhash(stamped) == simhash(stamped)
+    assert simhash(ARTICLE.upper()) == simhash(ARTICLE)
+    assert hamming_distance(simhash(stamped), simhash(restamped)) <= 3
+    assert hamming_distance(simhash(stamped), simhash(unrelated)) > 10
+
+
+def test_simhash_of_text_without_words_is_none():
+    assert simhash("") is None
+    assert simhash(" \n ... ") is None
+    assert simhash("two words") is not None
+
+
+def test_index_finds_fingerprints_within_threshold_only():
+    rng = random.Random(0)
+    index = SimHashIndex(threshold=3)
+    indexed = [rng.getrandbits(64) for _ in range(2000)]
+    for fingerprint in indexed:
+        index.add(fingerprint)
+
+    for fingerprint in indexed[:200]:
+        near = fingerprint
+        for bit in rng.sample(range(64), 3):
+            near ^= 1 << bit
+        assert index.find(near) == fingerprint
+
+        far = fingerprint
+        for bit in rng.sample(range(64), 12):
+            far ^= 1 << bit
+        found = index.find(far)
+        assert found is None or hamming_distance(found, far) <= 3
+
+    assert len(index) == 2000
+
+
+def test_index_lookup_matches_linear_scan():
+    rng = random.Random(1)
+    index = SimHashIndex(threshold=5)
+    # clustered fingerprints so that many lookups are close to several indexed ones
+    base = rng.getrandbits(64)
+    indexed = [base ^ rng.getrandbits(16) for _ in range(500)]
+    for fingerprint in indexed:
+        index.add(fingerprint)
+
+    for _ in range(500):
+        query = base ^ rng.getrandbits(20)
+        expected = any(hamming_distance(query, fingerprint) <= 5 for fingerprint in indexed)
+        assert (index.find(query) is not None) is expected
+
+
+def test_add_if_new_rejects_near_duplicates():
+    index = SimHashIndex(threshold=2)
+
+    assert index.add_if_new(0b1010) is True
+    assert index.add_if_new(0b1001) is False
+    assert index.add_if_new(0b0101) is True
+    assert len(index) == 2
+
+
+def test_index_rejects_invalid_threshold():
+    with pytest.raises(ValueError):
+        SimHashIndex(threshold=-1)
+    with pytest.raises(ValueError):
+        SimHashIndex(threshold=32)
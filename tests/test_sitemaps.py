@@ -0,0 +1,201 @@
+import asyncio
+import gzip
+
+import fakeredis
+import pytest
+
+from webcrawler_arnoldkyeza.core.datastore.database_manager import DatabaseManager
+from webcrawler_arnoldkyeza.core.duplicate_eliminator.backends.redis_backend import RedisDedupBackend
+from webcrawler_arnoldkyeza.core.duplicate_eliminator.duplicate_eliminator import DuplicateEliminator
+from webcrawler_arnoldkyeza.core.enums.url_status_type import UrlStatusType
+from webcrawler_arnoldkyeza.core.html_fetcher.html_fetcher import HTMLFetcher
+from webcrawler_arnoldkyeza.core.html_fetcher.protocol_handlers.protocol_handler import ProtocolHandler
+from webcrawler_arnoldkyeza.core.robots.robots_cache import RobotsCache
+from webcrawler_arnoldkyeza.core.scheduler.models.url_frontier import UrlFrontier
+from webcrawler_arnoldkyeza.core.scheduler.politeness import HostPoliteness
+from webcrawler_arnoldkyeza.core.scheduler.scheduler import Scheduler
+from webcrawler_arnoldkyeza.core.sitemaps.errors import SitemapError
+from webcrawler_arnoldkyeza.core.sitemaps.sitemap_ingester import SitemapIngester
+from webcrawler_arnoldkyeza.core.sitemaps.sitemap_parser import SitemapEntry, SitemapParser
+
+NAMESPACE = 'xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"'
+
+
+def urlset(*urls: str) -> bytes:
+    return f'<?xml version="1.0" encoding="UTF-8"?><urlset {NAMESPACE}>{"".join(urls)}</urlset>'.encode("utf-8")
+
+
+def sitemap_index(*locs: str) -> bytes:
+    entries = "".join(f"<sitemap><loc>{loc}</loc></sitemap>" for loc in locs)
+    return f'<?xml version="1.0" encoding="UTF-8"?><sitemapindex {NAMESPACE}>{entries}</sitemapindex>'.encode("utf-8")
+
+
+def parse_in_chunks(parser: SitemapParser, body: bytes, chunk_size: int) -> list:
+    entries = []
+    for offset in range(0, len(body), chunk_size):
+        entries.extend(parser.feed(body[offset:offset + chunk_size]))
+    entries.extend(parser.close())
+    return entries
+
+
+class FakeSitemapHandler(ProtocolHandler):
+    """Serves sitemap bodies from a dict in small chunks; unknown URLs fail like a 404."""
+
+    def __init__(self, bodies: dict, robots_txt: str = None, chunk_size: int = 7):
+        self.bodies = bodies
+        self.robots_txt = robots_txt
+        self.chunk_size = chunk_size
+        self.requested = []
+
+    async def get_robots_txt(self, url):
+        return self.robots_txt
+
+    async def stream_resource(self, url):
+        self.requested.append(url)
+        if url not in self.bodies:
+            raise ValueError(f"Error fetching {url}: 404")
+        body = self.bodies[url]
+        for offset in range(0, len(body), self.chunk_size):
+            yield body[offset:offset + self.chunk_size]
+
+
+def test_parser_reads_entries_across_chunk_boundaries():
+    body = urlset(
+        "<url><loc> https://example.com/a </loc><lastmod>2024-05-01</lastmod><priority>0.8</priority></url>",
+        "<url><loc>https://example.com/b</loc><priority>high</priority></url>",
+        "<url><lastmod>2024-05-01</lastmod></url>",
+    )
+    parser = SitemapParser("https://example.com/sitemap.xml")
+
+    entries = parse_in_chunks(parser, body, chunk_size=5)
+
+    assert parser.is_index is False
+    assert entries == [
+        SitemapEntry(loc="https://example.com/a", lastmod="2024-05-01", priority=0.8),
+        SitemapEntry(loc="https://example.com/b"),
+    ]
+
+
+def test_parser_inflates_gzipped_sitemap_index():
+    body = gzip.compress(sitemap_index("https://example.com/s1.xml", "https://example.com/s2.xml.gz"))
+    parser = SitemapParser("https://example.com/sitemap_index.xml.gz")
+
+    # a one byte first chunk splits the gzip magic number
+    entries = parse_in_chunks(parser, body, chunk_size=1)
+
+    assert parser.is_index is True
+    assert [entry.loc for entry in entries] == ["https://example.com/s1.xml", "https://example.com/s2.xml.gz"]
+
+
+def test_parser_drops_finished_entries_from_the_tree():
+    parser = SitemapParser("https://example.com/sitemap.xml")
+    body = urlset(*(f"<url><loc>https://example.com/{i}</loc></url>" for i in range(1000)))
+
+    entries = parser.feed(body[:-len(b"</urlset>")])
+
+    assert len(entries) == 1000
+    assert len(parser._root) == 0
+
+
+def test_parser_rejects_malformed_and_oversized_sitemaps():
+    with pytest.raises(SitemapError):
+        parse_in_chunks(SitemapParser("https://example.com/broken.xml"), b"<urlset><url></urlset>", 4)
+
+    with pytest.raises(SitemapError):
+        parse_in_chunks(SitemapParser("https://example.com/truncated.xml"), b"<urlset><url>", 4)
+
+    # the limit applies to the inflated size, so a small gzip cannot expand without bound
+    bomb = gzip.compress(urlset("<url><loc>https://example.com/</loc></url>" * 1000))
+    with pytest.raises(SitemapError):
+        parse_in_chunks(SitemapParser("https://example.com/bomb.xml.gz", max_size=10_000), bomb, 1024)
+
+
+@pytest.mark.asyncio
+async def test_ingester_follows_indexes_from_robots_txt_and_well_known_path():
+    handler = FakeSitemapHandler(
+        {
+            "https://example.com/index.xml": sitemap_index(
+                "https://example.com/pages.xml.gz", "https://example.com/index.xml", "https://example.com/broken.xml"
+            ),
+            "https://example.com/pages.xml.gz": gzip.compress(urlset(
+                *(f"<url><loc>https://example.com/p{i}</loc></url>" for i in range(5))
+            )),
+            "https://example.com/broken.xml": b"<urlset><url><loc>https://example.com/kept</loc></url><url>",
+            "https://example.com/sitemap.xml": urlset("<url><loc>https://example.com/home</loc></url>"),
+        },
+        robots_txt="User-agent: *\nDisallow:\nSitemap: https://example.com/index.xml\n",
+    )
+    fetcher = HTMLFetcher(handler=handler)
+    ingester = SitemapIngester(fetcher=fetcher, robots=RobotsCache(fetcher=fetcher), batch_size=2)
+
+    batches = [batch async for batch in ingester.iter_batches("https://example.com/start")]
+
+    assert [len(batch) for batch in batches] == [2, 2, 2, 1]
+    assert [entry.loc for batch in batches for entry in batch] == [
+        "https://example.com/home",
+        "https://example.com/p0", "https://example.com/p1", "https://example.com/p2", "https://example.com/p3",
+        "https://example.com/p4",
+        "https://example.com/kept",
+    ]
+    # the index listing itself is not read twice
+    assert handler.requested.count("https://example.com/index.xml") == 1
+    assert ingester.sitemaps_read == 4
+
+
+@pytest.mark.asyncio
+async def test_ingester_without_robots_reads_well_known_sitemap_only():
+    handler = FakeSitemapHandler({})
+    ingester = SitemapIngester(fetcher=HTMLFetcher(handler=handler))
+
+    assert [batch async for batch in ingester.iter_batches("https://example.com/")] == []
+    assert handler.requested == ["https://example.com/sitemap.xml"]
+
+
+@pytest.mark.asyncio
+async def test_scheduler_bulk_loads_sitemap_urls_and_refills_the_frontier(tmp_path):
+    handler = FakeSitemapHandler({
+        "https://example.com/sitemap.xml": urlset(
+            "<url><loc>https://example.com/</loc></url>",
+            "<url><loc>https://example.com/a</loc><lastmod>2024-05-01</lastmod><priority>0.9</priority></url>",
+            "<url><loc>https://other.com/b</loc></url>",
+            *(f"<url><loc>https://example.com/p{i}</loc></url>" for i in range(10)),
+        ),
+    })
+    database = DatabaseManager(tmp_path / "crawler.sqlite")
+    url_frontier = UrlFrontier()
+    url_frontier.queue._maxsize = 4
+    scheduler = Scheduler(
+        url_frontier=url_frontier,
+        database_manager=database,
+        duplicate_eliminator=DuplicateEliminator(backend=RedisDedupBackend(fakeredis.FakeStrictRedis())),
+        politeness=HostPoliteness(requests_per_second=0, max_in_flight_per_host=0),
+        sitemap_ingester=SitemapIngester(fetcher=HTMLFetcher(handler=handler), batch_size=5),
+    )
+
+    await scheduler.initialize("https://example.com/", max_depth=3)
+    while scheduler.is_ingesting_sitemaps():
+        assert scheduler.finished() is False
+        await asyncio.sleep(0)
+
+    # the seed is not loaded again, the other host is dropped and the rest waits in the database
+    sitemap_url = database.get_url("https://example.com/a")
+    assert sitemap_url.depth == 1
+    assert sitemap_url.lastmod == "2024-05-01"
+    assert sitemap_url.sitemap_priority == pytest.approx(0.9)
+    assert database.get_url("https://example.com/p9").sitemap_priority == pytest.approx(0.5)
+    assert database.get_url("https://other.com/b") is None
+    assert url_frontier.queue.full()
+
+    crawled = []
+    while not scheduler.finished():
+        depth, url = await scheduler.get_next_url()
+        if url is None:
+            continue
+        crawled.append(url)
+        database.update_url_status(url, UrlStatusType.COMPLETED)
+        scheduler.queue_task_done(url)
+
+    assert sorted(crawled) == sorted(
+        ["https://example.com/", "https://example.com/a"] + [f"https://example.com/p{i}" for i in range(10)]
+    )
+
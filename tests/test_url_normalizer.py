@@ -0,0 +1,82 @@
+import pytest
+
+from webcrawler_arnoldkyeza.core.url_normalizer import UrlNormalizer
+from webcrawler_arnoldkyeza.core.utils import normalize_url
+
+ABSOLUTE_URLS = [
+    "https://example.com",
+    "https://example.com/",
+    "https://example.com/about",
+    "https://example.com/about/",
+    "https://example.com/a//b",
+    "https://example.com/a/./b",
+    "https://example.com/.well-known/security.txt",
+    "https://example.com/path;params",
+    "http://Example.com/path/?b=2&a=1",
+    "https://example.com:443/path?c=3&b=2&a=1",
+    "http://example.com:8080/path",
+    "https://example.com/page#section",
+    "  https://example.com/padded  ",
+    "https://user@example.com/private",
+    "mailto:user@example.com",
+    "javascript:void(0)",
+    "/relative/path",
+]
+
+
+@pytest.mark.parametrize("url", ABSOLUTE_URLS)
+def test_normalize_matches_normalize_url(url):
+    assert UrlNormalizer().normalize(url.strip()) == normalize_url(url)
+
+
+def test_normalize_many_resolves_relative_links_against_base_url():
+    normalizer = UrlNormalizer()
+
+    result = normalizer.normalize_many(
+        ["/about/", "team?b=2&a=1", "../up", "#top", "//cdn.example.com/lib", "https://other.com/x",
+         "mailto:a@example.com", None, ""],
+        base_url="https://example.com/docs/guide/",
+    )
+
+    assert result == [
+        "https://example.com/about",
+        "https://example.com/docs/guide/team?a=1&b=2",
+        "https://example.com/docs/up",
+        "https://example.com/docs/guide",
+        "https://cdn.example.com/lib",
+        "https://other.com/x",
+        None,
+        None,
+        None,
+    ]
+
+
+def test_normalize_many_without_base_url_drops_relative_links():
+    assert UrlNormalizer().normalize_many(["/about", "https://example.com/about"]) == [
+        None,
+        "https://example.com/about",
+    ]
+
+
+def test_normalize_caches_non_canonical_urls_within_bound():
+    normalizer = UrlNormalizer(cache_size=2)
+
+    normalizer.normalize_many(["/a/", "/a/", "/b/", "/c/", "/a/", "https://example.com/canonical"],
+                              base_url="https://example.com/")
+
+    # "/a/" is normalized again after being evicted, canonical URLs bypass the cache
+    assert normalizer.hits == 1
+    assert normalizer.misses == 4
+    assert len(normalizer._cache) == 2
+
+
+def test_root_relative_links_are_cached_per_site():
+    normalizer = UrlNormalizer()
+
+    first = normalizer.normalize_many(["/nav/", "http://EXAMPLE.com/x/"], base_url="https://example.com/a/")
+    second = normalizer.normalize_many(["/nav/", "http://EXAMPLE.com/x/"], base_url="https://example.com/b/c")
+    other_site = normalizer.normalize_many(["/nav/"], base_url="https://other.com/")
+
+    assert first == second == ["https://example.com/nav", "http://example.com/x"]
+    assert other_site == ["https://other.com/nav"]
+    assert normalizer.hits == 2
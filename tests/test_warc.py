@@ -0,0 +1,140 @@
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from webcrawler_arnoldkyeza.core.html_fetcher.fetch_response import CacheValidators, FetchResponse, NOT_MODIFIED
+from webcrawler_arnoldkyeza.core.html_fetcher.protocol_handlers.errors import (
+    TransientFetchError,
+    UnsupportedContentTypeError,
+)
+from webcrawler_arnoldkyeza.core.html_fetcher.protocol_handlers.protocol_handler import ProtocolHandler
+from webcrawler_arnoldkyeza.core.html_fetcher.protocol_handlers.warc_handler import (
+    WARCRecordingHandler,
+    WARCReplayHandler,
+)
+from webcrawler_arnoldkyeza.core.html_fetcher.warc_archive import WARCArchive, WARCFormatError, WARCWriter
+
+
+def test_warc_writer_and_archive_round_trip(tmp_path):
+    path = tmp_path / "crawl.warc"
+    writer = WARCWriter(path)
+    writer.write_response("https://example.com/", 200, "OK", [("Content-Type", "text/html")], b"<html>a</html>")
+    writer.write_response("https://example.com/", 304, "Not Modified", [("ETag", '"v1"')], b"")
+    writer.write_metadata("https://example.com/down", {"error": "transient", "status": "503"})
+    writer.close()
+
+    archive = WARCArchive([path])
+
+    assert len(archive) == 2
+    assert "https://example.com/missing" not in archive
+    # a later 304 does not hide the full response
+    http = archive.get("https://example.com/").http_response()
+    assert http.status_code == 200
+    assert http.headers["content-type"] == "text/html"
+    assert http.body == b"<html>a</html>"
+    assert archive.get("https://example.com/down").fields() == {"error": "transient", "status": "503"}
+    archive.close()
+
+
+def test_warc_archive_rejects_malformed_file(tmp_path):
+    path = tmp_path / "broken.warc"
+    path.write_bytes(b"not a warc file\r\n\r\n")
+
+    with pytest.raises(WARCFormatError):
+        WARCArchive([path])
+
+
+@pytest.mark.asyncio
+async def test_recorded_crawl_replays_identically(tmp_path):
+    path = tmp_path / "crawl.warc"
+    inner = MagicMock(spec=ProtocolHandler)
+    inner.get_content = AsyncMock(side_effect=[
+        FetchResponse(content="<html>café</html>", validators=CacheValidators(etag='"v1"')),
+        TransientFetchError("Service unavailable", status_code=503, retry_after=7.0),
+        UnsupportedContentTypeError("application/json"),
+    ])
+    inner.get_robots_txt = AsyncMock(side_effect=["User-agent: *\nDisallow: /private\n", None])
+    inner.close = AsyncMock()
+
+    recorder = WARCRecordingHandler(handler=inner, writer=WARCWriter(path))
+    page = await recorder.get_content("https://example.com/")
+    with pytest.raises(TransientFetchError):
+        await recorder.get_content("https://example.com/down")
+    with pytest.raises(UnsupportedContentTypeError):
+        await recorder.get_content("https://example.com/data.json")
+    robots_txt = await recorder.get_robots_txt("https://example.com/robots.txt")
+    assert await recorder.get_robots_txt("https://other.com/robots.txt") is None
+    await recorder.close()
+    inner.close.assert_awaited_once()
+
+    replay = WARCReplayHandler(archive=WARCArchive([path]))
+
+    assert await replay.get_content("https://example.com/") == page
+    not_modified = await replay.get_content("https://example.com/", validators=CacheValidators(etag='"v1"'))
+    assert not_modified.status_code == NOT_MODIFIED
+    assert not_modified.validators.etag == '"v1"'
+
+    with pytest.raises(TransientFetchError) as err:
+        await replay.get_content("https://example.com/down")
+    assert err.value.status_code == 503
+    assert err.value.retry_after == pytest.approx(7.0)
+
+    with pytest.raises(ValueError) as err:
+        await replay.get_content("https://example.com/data.json")
+    assert "Unsupported content type" in str(err.value)
+
+    with pytest.raises(ValueError):
+        await replay.get_content("https://example.com/never-recorded")
+
+    assert await replay.get_robots_txt("https://example.com/robots.txt") == robots_txt
+    assert await replay.get_robots_txt("https://other.com/robots.txt") is None
+    assert await replay.get_content("ftp://example.com/") is None
+    await replay.close()
+
+
+@pytest.mark.asyncio
+async def test_replay_latency_injection_is_seeded(tmp_path, mocker):
+    path = tmp_path / "crawl.warc"
+    writer = WARCWriter(path)
+    writer.write_response("https://example.com/", 200, "OK", [("Content-Type", "text/html")], b"<html></html>")
+    writer.close()
+    sleep = mocker.patch(
+        "webcrawler_arnoldkyeza.core.html_fetcher.protocol_handlers.warc_handler.asyncio.sleep",
+        new=AsyncMock(),
+    )
+
+    delays = []
+    for _ in range(2):
+        replay = WARCReplayHandler(archive=WARCArchive([path]), latency=0.1, latency_jitter=0.05, seed=42)
+        await replay.get_content("https://example.com/")
+        await replay.get_content("https://example.com/")
+        delays.append([call.args[0] for call in sleep.await_args_list[-2:]])
+        await replay.close()
+
+    assert delays[0] == delays[1]
+    assert all(0.1 <= delay <= 0.15 for delay in delays[0])
+
+
+@pytest.mark.asyncio
+async def test_streamed_resources_are_recorded_and_replayed(tmp_path):
+    path = tmp_path / "crawl.warc"
+
+    async def stream_resource(url):
+        yield b"\x1f\x8b"
+        yield b"raw bytes"
+
+    inner = MagicMock(spec=ProtocolHandler)
+    inner.stream_resource = stream_resource
+    inner.close = AsyncMock()
+
+    recorder = WARCRecordingHandler(handler=inner, writer=WARCWriter(path))
+    chunks = [chunk async for chunk in recorder.stream_resource("https://example.com/sitemap.xml.gz")]
+    await recorder.close()
+
+    replay = WARCReplayHandler(archive=WARCArchive([path]))
+    replayed = [chunk async for chunk in replay.stream_resource("https://example.com/sitemap.xml.gz")]
+    assert b"".join(replayed) == b"".join(chunks) == b"\x1f\x8braw bytes"
+
+    with pytest.raises(ValueError):
+        [chunk async for chunk in replay.stream_resource("https://example.com/sitemap.xml")]
+    await replay.close()
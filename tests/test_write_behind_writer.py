@@ -0,0 +1,79 @@
+import asyncio
+import datetime
+from pathlib import Path
+
+import pytest
+
+from webcrawler_arnoldkyeza.core.datastore.database_manager import DatabaseManager
+from webcrawler_arnoldkyeza.core.datastore.write_behind_writer import WriteBehindWriter
+from webcrawler_arnoldkyeza.core.enums.url_status_type import UrlStatusType
+from webcrawler_arnoldkyeza.core.scheduler.models.url import Url
+
+
+def make_url(normalized_url: str) -> Url:
+    return Url(url=normalized_url, normalized_url=normalized_url, priority=1, update_frequency=1,
+               last_crawled_at=None, status=UrlStatusType.PENDING, parent_url_id=None, error_message=None, depth=0)
+
+
+@pytest.fixture
+def db(tmp_path: Path) -> DatabaseManager:
+    manager = DatabaseManager(tmp_path / "test_crawler.sqlite")
+    yield manager
+    manager.close()
+
+
+@pytest.mark.asyncio
+async def test_writer_coalesces_writes_into_batched_transactions(db: DatabaseManager):
+    writer = WriteBehindWriter(database_manager=db, batch_size=10, flush_interval=1.0)
+    writer.start()
+
+    for i in range(25):
+        await writer.write_later(db.insert_url, make_url(f"https://example.com/{i}"))
+    # the flush barrier does not wait for the interval to run out
+    await asyncio.wait_for(writer.flush(), timeout=0.5)
+
+    assert writer.writes_applied == 25
+    assert writer.batches_written == 3
+    assert all(db.url_exists(f"https://example.com/{i}") for i in range(25))
+    await writer.close()
+
+
+@pytest.mark.asyncio
+async def test_waited_for_writes_share_a_batch_and_return_their_results(db: DatabaseManager):
+    db.insert_urls([make_url(f"https://example.com/{i}") for i in range(5)])
+    writer = WriteBehindWriter(database_manager=db, batch_size=100, flush_interval=0.05)
+    writer.start()
+
+    claimed = await asyncio.wait_for(
+        asyncio.gather(*(writer.write(db.claim_url, f"https://example.com/{i}") for i in range(5))), timeout=0.5
+    )
+    await writer.write(db.commit_page, "https://example.com/0", [make_url("https://example.com/a")],
+                       datetime.datetime.now())
+
+    assert [url.status for url in claimed] == [UrlStatusType.IN_PROGRESS] * 5
+    assert writer.batches_written == 2
+    assert db.get_url("https://example.com/0").status == UrlStatusType.COMPLETED
+    assert db.url_exists("https://example.com/a")
+    await writer.close()
+
+
+@pytest.mark.asyncio
+async def test_a_failing_write_does_not_roll_back_the_rest_of_its_batch(db: DatabaseManager):
+    def fail():
+        raise ValueError("broken write")
+
+    writer = WriteBehindWriter(database_manager=db, batch_size=10, flush_interval=0.1)
+    writer.start()
+
+    await writer.write_later(db.insert_url, make_url("https://example.com/a"))
+    failing = asyncio.create_task(writer.write(fail))
+    await asyncio.sleep(0)
+    await writer.write_later(db.insert_url, make_url("https://example.com/b"))
+
+    with pytest.raises(ValueError, match="broken write"):
+        await failing
+    await writer.close()
+
+    assert db.url_exists("https://example.com/a")
+    assert db.url_exists("https://example.com/b")
+    assert writer.writes_applied == 3